@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), os.pardir, 'send2ue', 'dependencies'))
+import remote_execution
+
+ITERATIONS = int(os.environ.get('REMOTE_EXECUTION_BENCHMARK_ITERATIONS', 3))
+# the sizes of the printed output in the command results, in megabytes
+RESULT_SIZES = [float(size) for size in os.environ.get('REMOTE_EXECUTION_BENCHMARK_SIZES', '1,4').split(',')]
+
+
+def get_command_result(size):
+    """
+    Gets a command result message like the one unreal sends back after a long script printed a lot of output.
+
+    :param float size: The size of the printed output in megabytes.
+    :return bytes: The message as utf-8 encoded json.
+    """
+    line = 'LogPython: Imported /Game/untitled_category/untitled_asset/SK_Mannequin in 0.25 seconds'
+    output = [{'type': 'Info', 'output': line}] * int(size * 1024 * 1024 / len(line))
+    return remote_execution._RemoteExecutionMessage(
+        remote_execution._TYPE_COMMAND_RESULT,
+        'benchmark-source',
+        'benchmark-destination',
+        {'success': True, 'command': '', 'result': 'None', 'output': output}
+    ).to_json_bytes()
+
+
+def receive_concatenated(sock):
+    """
+    Receives a message with fixed size reads that are concatenated till the data can be parsed. This is how the
+    command connection used to receive its messages.
+
+    :param socket.socket sock: The socket to read from.
+    :return tuple(dict, int): The parsed message and the number of reads.
+    """
+    data = b''
+    reads = 0
+    while True:
+        chunk = sock.recv(remote_execution.DEFAULT_RECEIVE_BUFFER_SIZE)
+        reads += 1
+        data += chunk
+        try:
+            return json.loads(data), reads
+        except ValueError:
+            continue
+
+
+def receive_buffered(reader):
+    """
+    Receives a message with the buffered reader of the command connection.
+
+    :param remote_execution._RemoteExecutionMessageReader reader: The reader of the socket.
+    :return tuple(dict, int): The parsed message and the number of reads.
+    """
+    reads = reader.stats['reads']
+    return reader.read(), reader.stats['reads'] - reads
+
+
+def benchmark(label, message, receive):
+    """
+    Sends the message over a local socket pair and times how long it takes to receive it.
+
+    :param str label: The name of the receive method.
+    :param bytes message: The message to send.
+    :param callable receive: Receives a message, and returns it with the number of reads it took.
+    """
+    seconds = 0
+    reads = 0
+    for _ in range(ITERATIONS):
+        sender = threading.Thread(target=send_socket.sendall, args=(message,))
+        start = time.perf_counter()
+        sender.start()
+        _message, reads = receive()
+        seconds += time.perf_counter() - start
+        sender.join()
+    sys.stdout.write(f'  {label:<48}{seconds / ITERATIONS * 1000:>10.3f} ms{reads:>10} reads\n')
+
+
+if __name__ == '__main__':
+    send_socket, receive_socket = socket.socketpair()
+    message_reader = remote_execution._RemoteExecutionMessageReader(receive_socket)
+    for result_size in RESULT_SIZES:
+        command_result = get_command_result(result_size)
+        sys.stdout.write(f'command result of {len(command_result)} bytes\n')
+        benchmark('concatenated reads', command_result, lambda: receive_concatenated(receive_socket))
+        benchmark('buffered reads', command_result, lambda: receive_buffered(message_reader))
+    sys.stdout.write(f'buffered reader stats {message_reader.stats}\n')
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import statistics
+import threading
+import xmlrpc.client
+sys.path.append(os.path.join(os.path.dirname(__file__), os.pardir, 'send2ue', 'dependencies'))
+import rpc
+from rpc import base_server
+
+RESOURCES_FOLDER = os.path.join(os.path.dirname(__file__), os.pardir, 'send2ue', 'resources')
+BENCHMARK_PORT = int(os.environ.get('RPC_BENCHMARK_PORT', 9990))
+THREADED_BENCHMARK_PORT = BENCHMARK_PORT + 1
+ITERATIONS = int(os.environ.get('RPC_BENCHMARK_ITERATIONS', 200))
+# the interval of the stand-in editor tick that runs the queued calls, 60 fps by default
+TICK_INTERVAL = float(os.environ.get('RPC_BENCHMARK_TICK_INTERVAL', 1 / 60))
+
+remote_blocking_decorator = rpc.factory.remote_call(port=BENCHMARK_PORT)
+remote_threaded_decorator = rpc.factory.remote_call(port=THREADED_BENCHMARK_PORT)
+
+
+@remote_blocking_decorator
+def is_running():
+    """
+    A trivial remote call.
+
+    :return bool: Always true.
+    """
+    return True
+
+
+@remote_threaded_decorator
+def is_running_in_main_thread():
+    """
+    A trivial remote call that is run by the stand-in editor tick.
+
+    :return bool: Always true.
+    """
+    return True
+
+
+class BenchmarkRPCServerThread(base_server.BaseRPCServerThread):
+    def thread_safe_call(self, callable_instance, *args):
+        """
+        Implementation of a thread safe call, the same as the editor integrations.
+        """
+        return lambda *args: base_server.run_in_main_thread(callable_instance, *args)
+
+
+def tick_editor():
+    """
+    Stands in for the editor's main thread by running the queued calls at a fixed tick interval.
+    """
+    while True:
+        base_server.execute_queued_calls()
+        time.sleep(TICK_INTERVAL)
+
+
+def start_servers():
+    """
+    Starts a local server that runs the remote calls directly on its own thread, and a threaded server
+    that runs them on a stand-in editor tick.
+    """
+    server = base_server.BaseRPCServer('BenchmarkRPCServer', BENCHMARK_PORT)
+    threading.Thread(target=server.server.serve_forever, daemon=True).start()
+
+    BenchmarkRPCServerThread('ThreadedBenchmarkRPCServer', THREADED_BENCHMARK_PORT).start()
+    threading.Thread(target=tick_editor, daemon=True).start()
+
+
+def report(label, seconds, iterations=ITERATIONS):
+    """
+    Prints the average time of an operation in milliseconds.
+
+    :param str label: The name of the operation.
+    :param float seconds: The total time that the iterations took.
+    :param int iterations: The number of iterations.
+    """
+    sys.stdout.write(f'{label:<50}{seconds / iterations * 1000:>10.3f} ms\n')
+
+
+def benchmark_client_overhead():
+    """
+    Measures the client side overhead of a decorated remote call compared to a raw call of the same
+    registered function.
+    """
+    from unreal import UnrealRemoteCalls
+
+    # time generating the code of a large remote call
+    factory = rpc.factory.RPCFactory(rpc.client.RPCClient(BENCHMARK_PORT), default_imports=['import unreal'])
+    function = UnrealRemoteCalls.import_asset.__wrapped__
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        factory._get_code(function)
+    report('code generation (import_asset)', time.perf_counter() - start)
+
+    # register the function and then time the raw and decorated calls
+    is_running()
+    proxy = rpc.client.RPCClient(BENCHMARK_PORT).proxy
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        proxy.is_running()
+    raw_time = time.perf_counter() - start
+    report('raw call', raw_time)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        is_running()
+    decorated_time = time.perf_counter() - start
+    report('decorated call', decorated_time)
+    report('client overhead per call', decorated_time - raw_time)
+
+
+def benchmark_main_thread_dispatch():
+    """
+    Measures the latency of a trivial call that the server runs on the stand-in editor tick.
+    """
+    is_running_in_main_thread()
+    latencies = []
+    for _ in range(ITERATIONS // 4):
+        start = time.perf_counter()
+        is_running_in_main_thread()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    sys.stdout.write(f'main thread dispatch ({TICK_INTERVAL * 1000:.1f} ms tick)\n')
+    report('  mean', statistics.mean(latencies), 1)
+    report('  median', statistics.median(latencies), 1)
+    report('  95th percentile', latencies[int(len(latencies) * 0.95)], 1)
+
+
+def merge_dictionaries(destination, source):
+    """
+    Recursively merges the source dictionary into the destination dictionary.
+
+    :param dict destination: The dictionary to merge into.
+    :param dict source: The dictionary to merge from.
+    :return dict: The merged dictionary.
+    """
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(destination.get(key), dict):
+            merge_dictionaries(destination[key], value)
+        else:
+            destination.setdefault(key, value)
+    return destination
+
+
+def get_import_asset_arguments():
+    """
+    Gets arguments that are representative of an import_asset call. The property data is the default settings
+    template merged with the settings definitions, like the property data of a push.
+
+    :return tuple: The file path, asset data and property data.
+    """
+    with open(os.path.join(RESOURCES_FOLDER, 'setting_templates', 'default.json')) as template_file:
+        property_data = json.load(template_file)
+    with open(os.path.join(RESOURCES_FOLDER, 'settings.json')) as settings_file:
+        merge_dictionaries(property_data, json.load(settings_file))
+
+    file_path = os.path.join('C:', os.sep, 'temp', 'send2ue', 'untitled_category', 'untitled_asset', 'SK_Mannequin.fbx')
+    asset_data = {
+        '_asset_type': 'SkeletalMesh',
+        '_mesh_object_name': 'SK_Mannequin',
+        'file_path': file_path,
+        'asset_folder': '/Game/untitled_category/untitled_asset/',
+        'asset_path': '/Game/untitled_category/untitled_asset/SK_Mannequin',
+        'skeleton_asset_path': '',
+        'lods': {str(index): file_path.replace('.fbx', f'_LOD{index}.fbx') for index in range(1, 4)},
+        'sockets': {
+            f'socket_{index}': {
+                'relative_location': [index * 1.5, 0.0, 10.25],
+                'relative_rotation': [0.0, 90.0, index * 15.0],
+                'relative_scale': [1.0, 1.0, 1.0]
+            } for index in range(8)
+        },
+        'skip': False
+    }
+    return file_path, asset_data, property_data
+
+
+def benchmark_codecs():
+    """
+    Measures the payload size and encode and decode times of the xml and json codecs for a request and
+    response with the arguments of an import_asset call.
+    """
+    params = get_import_asset_arguments()
+    codecs = {
+        'xml': (
+            lambda: xmlrpc.client.dumps(params, 'import_asset', allow_none=True).encode('utf-8'),
+            lambda data: xmlrpc.client.loads(data, use_builtin_types=True)
+        ),
+        'json': (
+            lambda: json.dumps({'method': 'import_asset', 'params': params}, separators=(',', ':')).encode('utf-8'),
+            json.loads
+        )
+    }
+    sys.stdout.write('import_asset arguments\n')
+    for name, (encode, decode) in codecs.items():
+        data = encode()
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            encode()
+        encode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            decode(data)
+        decode_time = time.perf_counter() - start
+
+        sys.stdout.write(f'  {name:<48}{len(data):>10} bytes\n')
+        report('    encode', encode_time)
+        report('    decode', decode_time)
+
+
+if __name__ == '__main__':
+    start_servers()
+    benchmark_client_overhead()
+    benchmark_main_thread_dispatch()
+    benchmark_codecs()
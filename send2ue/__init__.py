@@ -73,6 +73,9 @@ def register():
     # add a function to the event timer that will fire after the addon is enabled
     bpy.app.timers.register(utilities.addon_enabled, first_interval=0.1)
 
+    # keep track of the unreal connection in the background, so the ui never waits on it
+    unreal.ConnectionHeartbeat.get()
+
 
 def unregister():
     """
@@ -82,6 +85,10 @@ def unregister():
     if utilities.setup_project in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(utilities.setup_project)
 
+    # stop tracking the unreal connection and close the remote execution session
+    unreal.ConnectionHeartbeat.stop()
+    unreal.RemoteExecutionSession.stop()
+
     try:
         # remove the pipeline menu
         header_menu.remove_parent_menu()
@@ -4,7 +4,7 @@ import json
 import math
 import os
 import bpy
-from . import utilities, validations, settings, ingest, extension, io
+from . import utilities, validations, settings, ingest, extension, io, manifest
 from ..constants import BlenderTypes, UnrealTypes, FileTypes, PreFixToken, ToolInfo, ExtensionTasks
 
 
@@ -196,7 +196,7 @@ def get_asset_sockets(asset_name, properties):
     return socket_data
 
 
-@utilities.track_progress(message='Exporting mesh "{attribute}"...', attribute='file_path')
+@utilities.track_progress(message='Exporting mesh "{attribute}"...', attribute='file_path', parallel=True)
 def export_mesh(asset_id, mesh_object, properties, lod=0):
     """
     Exports a mesh to a file.
@@ -236,7 +236,7 @@ def export_mesh(asset_id, mesh_object, properties, lod=0):
         extension.run_extension_tasks(ExtensionTasks.POST_MESH_EXPORT.value)
 
 
-@utilities.track_progress(message='Exporting animation "{attribute}"...', attribute='file_path')
+@utilities.track_progress(message='Exporting animation "{attribute}"...', attribute='file_path', parallel=True)
 def export_animation(asset_id, rig_object, action_name, properties):
     """
     Exports a single action from a rig object to a file.
@@ -277,7 +277,11 @@ def export_animation(asset_id, rig_object, action_name, properties):
     extension.run_extension_tasks(ExtensionTasks.POST_ANIMATION_EXPORT.value)
 
 
-@utilities.track_progress(message='Exporting curves/hair particle system "{attribute}"...', attribute='file_path')
+@utilities.track_progress(
+    message='Exporting curves/hair particle system "{attribute}"...',
+    attribute='file_path',
+    parallel=True
+)
 def export_hair(asset_id, properties):
     """
     Exports a mesh to a file.
@@ -515,8 +519,12 @@ def create_asset_data(properties):
     # get the asset data for all the hair systems
     hair_data = create_groom_data(hair_objects, properties)
 
+    # skip the assets that haven't changed since the last push, before any of their queued exports run
+    asset_data = {**mesh_data, **animation_data, **hair_data}
+    manifest.skip_unchanged_assets(asset_data, properties)
+
     # update the properties with the asset data
-    bpy.context.window_manager.send2ue.asset_data.update({**mesh_data, **animation_data, **hair_data})
+    bpy.context.window_manager.send2ue.asset_data.update(asset_data)
 
 
 def send2ue(properties):
@@ -9,7 +9,7 @@ import tempfile
 from . import settings
 from abc import abstractmethod
 from ..constants import ToolInfo, Extensions, ExtensionTasks
-from . import utilities
+from . import utilities, pipeline
 
 
 def run_extension_filters(armature_objects, mesh_objects, hair_objects):
@@ -55,6 +55,10 @@ def run_extension_tasks(name_space):
 
     :param str name_space: The name space of the task to run.
     """
+    # extensions use the blender context, so tasks from the import thread of a pipelined push run on the main thread
+    if not pipeline.is_main_thread():
+        return pipeline.run_in_main_thread(run_extension_tasks, name_space)
+
     for attribute in dir(bpy.context.scene.send2ue.extensions):
         task = getattr(getattr(bpy.context.scene.send2ue.extensions, attribute, object), name_space, None)
         if task:
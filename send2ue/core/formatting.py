@@ -92,7 +92,7 @@ def auto_format_unreal_folder_path(name, properties):
             setattr(properties, name, formatted_value)
 
             # Ensure unreal editor is open
-            if not is_connected():
+            if not is_connected(cached=True):
                 error_message = f'No Unreal Editor connection. Folder path "{formatted_value}" can not be validated.'
                 set_property_error_message(
                     name,
@@ -185,7 +185,7 @@ def auto_format_unreal_asset_path(name, properties):
             setattr(properties, name, formatted_value)
 
         # Ensure unreal editor is open
-        if not is_connected():
+        if not is_connected(cached=True):
             error_message = (
                 f'No Unreal Editor connection. Asset path "{formatted_value}" can not be validated.'
             )
@@ -0,0 +1,211 @@
+# Copyright Epic Games, Inc. All Rights Reserved.
+
+import os
+import json
+from . import utilities, parallel
+
+# the asset data keys that are set while the jobs run, so they are left out when comparing the asset data of two pushes
+RUNTIME_KEYS = ['skip', '_fingerprint', 'fcurve_file_path']
+
+
+def get_journal_path():
+    """
+    Gets the path to the journal file of the last push.
+
+    :return str: A file path.
+    """
+    return os.path.join(utilities.get_temp_folder(), 'journal.jsonl')
+
+
+def has_journal():
+    """
+    Checks if the last push left a journal, which means it failed or was stopped before it finished.
+
+    :return bool: Whether there is a push to resume.
+    """
+    return os.path.exists(get_journal_path())
+
+
+def get_job_key(job):
+    """
+    Gets a key that identifies a queued job across pushes, made from its function and its arguments.
+
+    :param tuple job: A queued job.
+    :return str: The key of the job.
+    """
+    function, args, kwargs = job[:3]
+    return json.dumps([
+        function.__module__,
+        function.__name__,
+        [parallel.serialize_argument(arg) for arg in args],
+        {key: parallel.serialize_argument(value) for key, value in kwargs.items()}
+    ], sort_keys=True, default=str)
+
+
+def get_file_stats(job, asset_data):
+    """
+    Gets the size and modification time of each file that an export job writes. A lod export writes its lod file,
+    the other exports write the asset's file and its fcurve file.
+
+    :param tuple job: A queued export job.
+    :param dict asset_data: The asset data of the job's asset.
+    :return dict: The size and modification time keyed by file path.
+    """
+    lod = job[2].get('lod', 0)
+    if lod:
+        file_paths = [(asset_data.get('lods') or {}).get(str(lod))]
+    else:
+        file_paths = [asset_data.get('file_path'), asset_data.get('fcurve_file_path')]
+
+    file_stats = {}
+    for file_path in file_paths:
+        if file_path and os.path.exists(file_path):
+            stat = os.stat(file_path)
+            file_stats[file_path] = [stat.st_size, stat.st_mtime_ns]
+    return file_stats
+
+
+def is_same_asset(asset_data, journaled_asset_data):
+    """
+    Checks if an asset is the same as it was when it was journaled, by its asset data and its fingerprint when both
+    pushes have one.
+
+    :param dict asset_data: The asset data of the asset in this push.
+    :param dict journaled_asset_data: The asset data of the asset in the journaled push.
+    :return bool: Whether it is the same asset.
+    """
+    fingerprint = asset_data.get('_fingerprint')
+    journaled_fingerprint = journaled_asset_data.get('_fingerprint')
+    if fingerprint and journaled_fingerprint and fingerprint != journaled_fingerprint:
+        return False
+
+    def get_static_data(data):
+        return json.dumps(
+            {key: value for key, value in data.items() if key not in RUNTIME_KEYS},
+            sort_keys=True,
+            default=str
+        )
+
+    return get_static_data(asset_data) == get_static_data(journaled_asset_data)
+
+
+def read_journal():
+    """
+    Reads the journal of the last push. A line that was only partly written when blender stopped is ignored.
+
+    :return tuple(dict, list): The jobs and asset data the push started with, and the entries of its finished jobs.
+    """
+    header = None
+    entries = []
+    if has_journal():
+        with open(get_journal_path(), 'r') as journal_file:
+            for line in journal_file:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    break
+                if header is None:
+                    header = data
+                else:
+                    entries.append(data)
+    return header, entries
+
+
+def remove_journal():
+    """
+    Removes the journal of the last push.
+    """
+    if has_journal():
+        os.remove(get_journal_path())
+
+
+def resume_jobs(jobs, asset_data):
+    """
+    Removes the jobs that already finished in the journaled push. A job is only skipped if its asset hasn't changed
+    and the files it exported are still on disk unchanged. Once a job of an asset has to run again, all the jobs
+    after it for that asset run again too, so an asset that is exported again is also imported again. The asset data
+    that the skipped jobs set, like the fcurve file paths, is restored.
+
+    :param list[tuple] jobs: The queued jobs of this push.
+    :param dict asset_data: The asset data of all the assets keyed by asset id.
+    :return list[tuple]: The jobs that still need to run.
+    """
+    header, entries = read_journal()
+    if not header:
+        return jobs
+
+    journaled_asset_data = header['asset_data']
+    finished_jobs = {header['jobs'][entry['job']]: entry for entry in entries}
+
+    remaining_jobs = []
+    changed_asset_ids = set()
+    for job in jobs:
+        asset_id = job[4]
+        entry = finished_jobs.get(get_job_key(job))
+        if (
+            entry and asset_id not in changed_asset_ids and asset_id in journaled_asset_data and
+            is_same_asset(asset_data.get(asset_id, {}), journaled_asset_data[asset_id]) and
+            ('files' not in entry or get_file_stats(job, entry['asset_data']) == entry['files'])
+        ):
+            asset_data[asset_id].update(
+                {key: value for key, value in entry['asset_data'].items() if key != 'skip'}
+            )
+            continue
+
+        changed_asset_ids.add(asset_id)
+        remaining_jobs.append(job)
+    return remaining_jobs
+
+
+class PushJournal:
+    def __init__(self, asset_data):
+        """
+        Writes the queued jobs and asset data of a push to disk, and then adds an entry each time a job finishes, so
+        a push that fails or is stopped can be resumed. The journal is removed once the push finishes.
+
+        :param dict asset_data: The asset data of all the assets keyed by asset id.
+        """
+        self.asset_data = asset_data
+        self.job_indexes = {}
+
+    def start(self, jobs):
+        """
+        Starts a new journal with the jobs of this push.
+
+        :param list[tuple] jobs: The queued jobs.
+        """
+        self.job_indexes = {id(job): index for index, job in enumerate(jobs)}
+        journal_path = get_journal_path()
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        with open(journal_path, 'w') as journal_file:
+            journal_file.write(json.dumps({
+                'jobs': [get_job_key(job) for job in jobs],
+                'asset_data': self.asset_data
+            }, default=str) + '\n')
+
+    def complete(self, job):
+        """
+        Adds an entry for a finished job, with its asset data and the size and modification time of its exported
+        files.
+
+        :param tuple job: The queued job.
+        """
+        index = self.job_indexes.get(id(job))
+        if index is None:
+            return
+
+        asset_id = job[4]
+        asset_data = self.asset_data.get(asset_id, {})
+        entry = {'job': index, 'asset_data': asset_data}
+        if getattr(job[0], 'parallel', False):
+            entry['files'] = get_file_stats(job, asset_data)
+
+        with open(get_journal_path(), 'a') as journal_file:
+            journal_file.write(json.dumps(entry, default=str) + '\n')
+
+    @staticmethod
+    def finish():
+        """
+        Removes the journal once the push has finished.
+        """
+        remove_journal()
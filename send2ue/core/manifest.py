@@ -0,0 +1,481 @@
+# Copyright Epic Games, Inc. All Rights Reserved.
+
+import os
+import bpy
+import json
+import array
+import hashlib
+from . import utilities, settings, pipeline
+from ..constants import BlenderTypes, UnrealTypes, PathModes, ToolInfo
+from ..dependencies.unreal import UnrealRemoteCalls
+
+# the scene property that keeps the fingerprints of the pushed assets in the blend file
+MANIFEST_PROPERTY_NAME = 'send2ue_manifest'
+# the properties that only change the ui, so they are left out of the settings fingerprint
+UI_PROPERTY_NAMES = ['tab', 'active_settings_template']
+# the node properties that only change how the node editor looks, so they are left out of the fingerprint
+NODE_UI_PROPERTY_NAMES = [
+    'location', 'width', 'height', 'dimensions', 'select', 'hide', 'label', 'color', 'use_custom_color',
+    'show_options', 'show_preview', 'show_texture', 'parent'
+]
+
+# the field, item size and array type to read the values of each type of mesh attribute with
+ATTRIBUTE_FIELDS = {
+    'FLOAT': ('value', 1, 'f'),
+    'INT': ('value', 1, 'i'),
+    'INT8': ('value', 1, 'i'),
+    'BOOLEAN': ('value', 1, None),
+    'FLOAT2': ('vector', 2, 'f'),
+    'FLOAT_VECTOR': ('vector', 3, 'f'),
+    'FLOAT_COLOR': ('color', 4, 'f'),
+    'BYTE_COLOR': ('color', 4, 'f'),
+    'QUATERNION': ('value', 4, 'f'),
+}
+
+
+def read_manifest():
+    """
+    Reads the fingerprints of the pushed assets. They are kept in the scene, so they are saved with the blend file
+    and outlive the session.
+
+    :return dict: The fingerprints keyed by asset id.
+    """
+    try:
+        return json.loads(bpy.context.scene.get(MANIFEST_PROPERTY_NAME, '{}'))
+    except ValueError:
+        return {}
+
+
+def write_manifest(manifest):
+    """
+    Writes the fingerprints of the pushed assets to the scene.
+
+    :param dict manifest: The fingerprints keyed by asset id.
+    """
+    bpy.context.scene[MANIFEST_PROPERTY_NAME] = json.dumps(manifest)
+
+
+def set_fingerprint(asset_id, fingerprint):
+    """
+    Sets the fingerprint of an asset in the manifest. This changes the scene, so it must run on the main thread.
+
+    :param str asset_id: The unique id of the asset.
+    :param str fingerprint: The fingerprint of the asset.
+    """
+    manifest = read_manifest()
+    manifest[asset_id] = fingerprint
+    write_manifest(manifest)
+
+
+def is_incremental_push():
+    """
+    Checks if the incremental push addon preference is on.
+
+    :return bool: Whether unchanged assets are skipped.
+    """
+    addon = bpy.context.preferences.addons.get(ToolInfo.NAME.value)
+    return bool(addon and getattr(addon.preferences, 'incremental_push', False))
+
+
+def update_hash(file_hash, value):
+    """
+    Updates the hash with the representation of a value.
+
+    :param object file_hash: A hashlib hash object.
+    :param Any value: A value that has a stable representation.
+    """
+    file_hash.update(repr(value).encode('utf-8'))
+
+
+def update_hash_with_collection(file_hash, collection, attribute, size=1, type_code='f'):
+    """
+    Updates the hash with an attribute of every item in a blender collection. The values are read all at once, so
+    this stays fast on dense meshes.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy_prop_collection collection: A blender collection.
+    :param str attribute: The name of the attribute.
+    :param int size: The number of values the attribute has per item.
+    :param str type_code: The array type code of the values, or None for booleans.
+    """
+    if type_code:
+        values = array.array(type_code, [0]) * (len(collection) * size)
+        collection.foreach_get(attribute, values)
+        file_hash.update(values.tobytes())
+    else:
+        values = [False] * (len(collection) * size)
+        collection.foreach_get(attribute, values)
+        update_hash(file_hash, values)
+
+
+def update_hash_with_nested_collections(file_hash, collections, attribute, size=1, type_code='f'):
+    """
+    Updates the hash with an attribute of every item in a list of blender collections, like the vertex groups of
+    each vertex or the hair keys of each particle. Blender doesn't have a way to read these all at once, so each
+    collection is read with foreach_get into one buffer, which is hashed once along with the size of each collection.
+
+    :param object file_hash: A hashlib hash object.
+    :param list[bpy_prop_collection] collections: A list of blender collections.
+    :param str attribute: The name of the attribute.
+    :param int size: The number of values the attribute has per item.
+    :param str type_code: The array type code of the values.
+    """
+    counts = array.array('i', [len(collection) for collection in collections])
+    values = array.array(type_code, [0]) * (sum(counts) * size)
+    offset = 0
+    with memoryview(values) as view:
+        for collection, count in zip(collections, counts):
+            if count:
+                collection.foreach_get(attribute, view[offset:offset + count * size])
+                offset += count * size
+    file_hash.update(counts.tobytes())
+    file_hash.update(values.tobytes())
+
+
+def update_hash_with_properties(file_hash, rna_struct, visited, ignored_property_names=None):
+    """
+    Updates the hash with the values of the properties of a blender struct, like a modifier or a node. The data
+    blocks its pointers point to, like a modifier's target object or node group, are hashed by their contents. The
+    custom properties, like the inputs of a geometry nodes modifier, are hashed too.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy_struct rna_struct: A blender struct.
+    :param set visited: The data blocks that have already been hashed.
+    :param list[str] ignored_property_names: The names of the properties to leave out.
+    """
+    for rna_property in rna_struct.bl_rna.properties:
+        if (
+            rna_property.identifier == 'rna_type' or rna_property.type == 'COLLECTION' or
+            rna_property.identifier in (ignored_property_names or [])
+        ):
+            continue
+
+        value = getattr(rna_struct, rna_property.identifier, None)
+        if rna_property.type == 'POINTER':
+            if isinstance(value, bpy.types.ID):
+                update_hash(file_hash, rna_property.identifier)
+                update_hash_with_data_block(file_hash, value, visited)
+            continue
+        elif getattr(rna_property, 'is_array', False):
+            value = tuple(value)
+        update_hash(file_hash, (rna_property.identifier, value))
+
+    if hasattr(rna_struct, 'keys'):
+        for key in rna_struct.keys():
+            value = rna_struct[key]
+            if isinstance(value, bpy.types.ID):
+                update_hash(file_hash, key)
+                update_hash_with_data_block(file_hash, value, visited)
+            else:
+                update_hash(file_hash, (key, value.to_list() if hasattr(value, 'to_list') else value))
+
+
+def update_hash_with_data_block(file_hash, data_block, visited):
+    """
+    Updates the hash with the contents of a data block that is used by an asset, like a modifier's target object,
+    a node group or a material. Each data block is only hashed once, so data blocks that point to each other don't
+    recurse forever.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy.types.ID data_block: A data block.
+    :param set visited: The data blocks that have already been hashed.
+    """
+    update_hash(file_hash, (type(data_block).__name__, data_block.name))
+    if data_block in visited:
+        return
+    visited.add(data_block)
+
+    if isinstance(data_block, bpy.types.Object):
+        update_hash_with_object(file_hash, data_block, visited)
+    elif isinstance(data_block, bpy.types.NodeTree):
+        update_hash_with_node_tree(file_hash, data_block, visited)
+    elif isinstance(data_block, bpy.types.Material):
+        update_hash_with_material(file_hash, data_block, visited)
+    elif isinstance(data_block, bpy.types.Collection):
+        for scene_object in data_block.all_objects:
+            update_hash_with_data_block(file_hash, scene_object, visited)
+    elif isinstance(data_block, bpy.types.Image):
+        update_hash(file_hash, data_block.filepath)
+    elif isinstance(data_block, bpy.types.Texture):
+        update_hash_with_properties(file_hash, data_block, visited)
+
+
+def update_hash_with_node_tree(file_hash, node_tree, visited):
+    """
+    Updates the hash with the nodes of a node tree, their settings and input values, and the links between them.
+    Group nodes are hashed with the contents of their node groups.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy.types.NodeTree node_tree: A node tree.
+    :param set visited: The data blocks that have already been hashed.
+    """
+    for node in node_tree.nodes:
+        update_hash(file_hash, (node.bl_idname, node.name))
+        update_hash_with_properties(file_hash, node, visited, NODE_UI_PROPERTY_NAMES)
+        for node_input in node.inputs:
+            value = getattr(node_input, 'default_value', None)
+            if isinstance(value, bpy.types.ID):
+                update_hash_with_data_block(file_hash, value, visited)
+            else:
+                update_hash(file_hash, tuple(value) if hasattr(value, '__len__') else value)
+
+    for link in node_tree.links:
+        update_hash(file_hash, (link.from_node.name, link.from_socket.identifier, link.to_node.name,
+                                link.to_socket.identifier))
+
+
+def update_hash_with_mesh(file_hash, mesh):
+    """
+    Updates the hash with the geometry, attributes, vertex weights and shape keys of a mesh.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy.types.Mesh mesh: A mesh.
+    """
+    update_hash_with_collection(file_hash, mesh.vertices, 'co', 3)
+    update_hash_with_collection(file_hash, mesh.loops, 'vertex_index', 1, 'i')
+    update_hash_with_collection(file_hash, mesh.polygons, 'loop_total', 1, 'i')
+    update_hash_with_collection(file_hash, mesh.polygons, 'material_index', 1, 'i')
+    for uv_layer in mesh.uv_layers:
+        update_hash(file_hash, uv_layer.name)
+        update_hash_with_collection(file_hash, uv_layer.data, 'uv', 2)
+
+    for attribute in mesh.attributes:
+        field, size, type_code = ATTRIBUTE_FIELDS.get(attribute.data_type, (None, 0, None))
+        if field:
+            update_hash(file_hash, (attribute.name, attribute.domain, attribute.data_type))
+            update_hash_with_collection(file_hash, attribute.data, field, size, type_code)
+
+    vertex_groups = [vertex.groups for vertex in mesh.vertices]
+    update_hash_with_nested_collections(file_hash, vertex_groups, 'group', 1, 'i')
+    update_hash_with_nested_collections(file_hash, vertex_groups, 'weight', 1, 'f')
+
+    if mesh.shape_keys:
+        for key_block in mesh.shape_keys.key_blocks:
+            update_hash(file_hash, (key_block.name, key_block.relative_key.name, key_block.value, key_block.mute))
+            update_hash_with_collection(file_hash, key_block.data, 'co', 3)
+
+
+def update_hash_with_material(file_hash, material, visited):
+    """
+    Updates the hash with a material's settings and its shader nodes.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy.types.Material material: A material.
+    :param set visited: The data blocks that have already been hashed.
+    """
+    update_hash(file_hash, (material.name, tuple(material.diffuse_color)))
+    if material.node_tree:
+        update_hash_with_node_tree(file_hash, material.node_tree, visited)
+
+
+def update_hash_with_object(file_hash, scene_object, visited=None):
+    """
+    Updates the hash with an object's transforms, modifiers, materials and data.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy.types.Object scene_object: An object.
+    :param set visited: The data blocks that have already been hashed.
+    """
+    if visited is None:
+        visited = set()
+    visited.add(scene_object)
+
+    update_hash(file_hash, (scene_object.name, scene_object.type, [tuple(row) for row in scene_object.matrix_world]))
+    update_hash(file_hash, scene_object.parent.name if scene_object.parent else None)
+    update_hash(file_hash, [vertex_group.name for vertex_group in scene_object.vertex_groups])
+
+    for modifier in scene_object.modifiers:
+        update_hash_with_properties(file_hash, modifier, visited)
+
+    for material_slot in scene_object.material_slots:
+        update_hash(file_hash, material_slot.link)
+        if material_slot.material:
+            update_hash_with_data_block(file_hash, material_slot.material, visited)
+
+    if scene_object.type == BlenderTypes.MESH:
+        update_hash_with_mesh(file_hash, scene_object.data)
+
+    if scene_object.type == BlenderTypes.SKELETON:
+        bones = scene_object.data.bones
+        update_hash(file_hash, [(bone.name, bone.parent.name if bone.parent else None) for bone in bones])
+        update_hash_with_collection(file_hash, bones, 'head_local', 3)
+        update_hash_with_collection(file_hash, bones, 'tail_local', 3)
+        update_hash_with_collection(file_hash, bones, 'matrix_local', 16)
+        update_hash_with_collection(file_hash, scene_object.pose.bones, 'matrix_basis', 16)
+
+
+def update_hash_with_action(file_hash, action):
+    """
+    Updates the hash with an action's frame range and the keyframes of its fcurves.
+
+    :param object file_hash: A hashlib hash object.
+    :param bpy.types.Action action: An action.
+    """
+    update_hash(file_hash, (action.name, tuple(action.frame_range)))
+    for fcurve in action.fcurves:
+        update_hash(file_hash, (fcurve.data_path, fcurve.array_index, fcurve.mute, fcurve.extrapolation))
+        keyframe_points = fcurve.keyframe_points
+        update_hash_with_collection(file_hash, keyframe_points, 'co', 2)
+        update_hash_with_collection(file_hash, keyframe_points, 'handle_left', 2)
+        update_hash_with_collection(file_hash, keyframe_points, 'handle_right', 2)
+        update_hash(file_hash, [keyframe_point.interpolation for keyframe_point in keyframe_points])
+
+
+def get_settings_fingerprint(properties):
+    """
+    Gets a fingerprint of the tool's settings, so every asset is pushed again when the export or import settings
+    change.
+
+    :param object properties: The property group that contains variables that maintain the addon's correct state.
+    :return str: The hex digest of the settings.
+    """
+    property_data = settings.get_property_group_as_dictionary(properties)
+    for property_name in UI_PROPERTY_NAMES:
+        property_data.pop(property_name, None)
+    return hashlib.sha256(json.dumps(property_data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def get_fingerprint(asset_data, properties, settings_fingerprint):
+    """
+    Gets a fingerprint of everything that goes into an asset's files and its import, so it can be skipped when
+    it hasn't changed since the last push.
+
+    :param dict asset_data: The asset data of the asset.
+    :param object properties: The property group that contains variables that maintain the addon's correct state.
+    :param str settings_fingerprint: The fingerprint of the tool's settings.
+    :return str: The hex digest of the asset, or None if its source objects can't be found.
+    """
+    file_hash = hashlib.sha256()
+    file_hash.update(settings_fingerprint.encode('utf-8'))
+    update_hash(file_hash, json.dumps(
+        {key: value for key, value in asset_data.items() if key not in ['skip', '_fingerprint']},
+        sort_keys=True,
+        default=str
+    ))
+
+    asset_type = asset_data.get('_asset_type')
+    if asset_type in [UnrealTypes.STATIC_MESH, UnrealTypes.SKELETAL_MESH]:
+        mesh_object = bpy.data.objects.get(asset_data.get('_mesh_object_name', ''))
+        if not mesh_object:
+            return None
+
+        # the lods, collisions and rigs are exported in the same files as the mesh
+        asset_name = utilities.get_asset_name(mesh_object.name, properties)
+        scene_objects = [mesh_object]
+        if properties.import_lods:
+            scene_objects.extend(
+                lod_object for lod_object in utilities.get_from_collection(BlenderTypes.MESH)
+                if lod_object != mesh_object and utilities.is_lod_of(asset_name, lod_object.name, properties)
+            )
+        scene_objects.extend(utilities.get_asset_collisions(asset_name, properties))
+        rig_object = utilities.get_armature_modifier_rig_object(mesh_object) or mesh_object.parent
+        while rig_object:
+            scene_objects.append(rig_object)
+            rig_object = rig_object.parent
+
+        for scene_object in scene_objects:
+            update_hash_with_object(file_hash, scene_object)
+
+    elif asset_type == UnrealTypes.ANIM_SEQUENCE:
+        rig_object = bpy.data.objects.get(asset_data.get('_armature_object_name', ''))
+        action = bpy.data.actions.get(asset_data.get('_action_name', ''))
+        if not rig_object or not action:
+            return None
+
+        update_hash_with_object(file_hash, rig_object)
+        update_hash_with_action(file_hash, action)
+        update_hash(file_hash, utilities.get_custom_property_fcurve_data(action.name))
+
+    elif asset_type == UnrealTypes.GROOM:
+        object_name = asset_data.get('_object_name', '')
+        mesh_object = utilities.get_mesh_object_for_groom_name(object_name)
+        if not mesh_object:
+            return None
+
+        update_hash_with_object(file_hash, mesh_object)
+        if asset_data.get('_object_type') == BlenderTypes.CURVES:
+            curves_object = bpy.data.objects.get(object_name)
+            update_hash(file_hash, [tuple(row) for row in curves_object.matrix_world])
+            for attribute in curves_object.data.attributes:
+                field, size, type_code = ATTRIBUTE_FIELDS.get(attribute.data_type, (None, 0, None))
+                if field:
+                    update_hash(file_hash, (attribute.name, attribute.domain, attribute.data_type))
+                    update_hash_with_collection(file_hash, attribute.data, field, size, type_code)
+        else:
+            particle_system = mesh_object.particle_systems.get(object_name)
+            if not particle_system:
+                return None
+
+            update_hash_with_properties(file_hash, particle_system.settings, set())
+            hair_keys = [particle.hair_keys for particle in particle_system.particles]
+            update_hash_with_nested_collections(file_hash, hair_keys, 'co', 3)
+    else:
+        return None
+
+    return file_hash.hexdigest()
+
+
+def get_file_paths(asset_data):
+    """
+    Gets the paths of all the files that are exported for an asset.
+
+    :param dict asset_data: The asset data of the asset.
+    :return list[str]: A list of file paths.
+    """
+    file_paths = [asset_data.get('file_path')]
+    file_paths.extend((asset_data.get('lods') or {}).values())
+    return [file_path for file_path in file_paths if file_path]
+
+
+def skip_unchanged_assets(asset_data, properties):
+    """
+    Marks the assets that haven't changed since they were last pushed to be skipped, so they are not exported or
+    imported again. Assets are only skipped if their files are still on disk, and if they are still in the unreal
+    project when they are imported. When sending to the project only, the exported files are temporary, so only the
+    unreal project is checked.
+
+    :param dict asset_data: The asset data of all the assets keyed by asset id.
+    :param object properties: The property group that contains variables that maintain the addon's correct state.
+    """
+    if not is_incremental_push():
+        return
+
+    manifest = read_manifest()
+    settings_fingerprint = get_settings_fingerprint(properties)
+    check_files = properties.path_mode != PathModes.SEND_TO_PROJECT.value
+    unchanged_asset_ids = []
+    for asset_id, data in asset_data.items():
+        data['_fingerprint'] = get_fingerprint(data, properties, settings_fingerprint)
+        if (
+            not data.get('skip') and data['_fingerprint'] and manifest.get(asset_id) == data['_fingerprint'] and
+            (not check_files or all(os.path.exists(file_path) for file_path in get_file_paths(data)))
+        ):
+            unchanged_asset_ids.append(asset_id)
+
+    # check that the unchanged assets were not removed from the unreal project since they were last pushed
+    if unchanged_asset_ids and properties.path_mode in [
+        PathModes.SEND_TO_PROJECT.value,
+        PathModes.SEND_TO_DISK_THEN_PROJECT.value
+    ]:
+        with UnrealRemoteCalls.batch():
+            asset_exists = {
+                asset_id: UnrealRemoteCalls.asset_exists(asset_data[asset_id]['asset_path'])
+                for asset_id in unchanged_asset_ids
+            }
+        unchanged_asset_ids = [asset_id for asset_id, exists in asset_exists.items() if exists.result()]
+
+    for asset_id in unchanged_asset_ids:
+        asset_data[asset_id]['skip'] = True
+
+
+@utilities.track_progress(message='Saving the fingerprint of "{attribute}"...', attribute='file_path', pipelined=True)
+def save_fingerprint(asset_id):
+    """
+    Saves the fingerprint of an asset once it has been pushed, so the next push can skip it if it doesn't change.
+
+    :param str asset_id: The unique id of the asset.
+    """
+    asset_data = pipeline.get_asset_data(asset_id)
+    fingerprint = asset_data.get('_fingerprint')
+    if fingerprint and not asset_data.get('skip'):
+        pipeline.run_in_main_thread(set_fingerprint, asset_id, fingerprint)
@@ -0,0 +1,340 @@
+# Copyright Epic Games, Inc. All Rights Reserved.
+
+import os
+import bpy
+import sys
+import json
+import queue
+import shutil
+import tempfile
+import importlib
+import threading
+import subprocess
+import collections
+from . import utilities
+from ..constants import ToolInfo
+
+# the line a worker prints with the asset data of its asset each time it finishes an export job, so its progress can
+# be followed and the job journaled right away
+JOB_DONE_TOKEN = 'send2ue-export-worker-job-done'
+# the number of output lines kept from each worker to report why it failed
+WORKER_OUTPUT_LINES = 30
+
+
+def get_export_worker_count():
+    """
+    Gets the number of headless blender processes the assets are exported with, from the addon preferences.
+
+    :return int: The number of processes.
+    """
+    addon = bpy.context.preferences.addons.get(ToolInfo.NAME.value)
+    return max(1, int(getattr(addon.preferences, 'export_workers', 1))) if addon else 1
+
+
+def is_parallel_export():
+    """
+    Checks if the assets are exported by more than one headless blender process.
+
+    :return bool: Whether the exports run in parallel.
+    """
+    return get_export_worker_count() > 1
+
+
+def serialize_argument(value):
+    """
+    Serializes an argument of a queued job, so it can be passed to a worker. Objects are passed by name, and the tool
+    properties are looked up again in the worker.
+
+    :param Any value: The argument.
+    :return Any: A json serializable value.
+    """
+    if isinstance(value, bpy.types.Object):
+        return {'_object_name': value.name}
+    if isinstance(value, bpy.types.PropertyGroup):
+        return {'_properties': True}
+    return value
+
+
+def deserialize_argument(value):
+    """
+    Gets an argument of a queued job back from its serialized value.
+
+    :param Any value: The serialized argument.
+    :return Any: The argument.
+    """
+    if isinstance(value, dict):
+        if '_object_name' in value:
+            return bpy.data.objects[value['_object_name']]
+        if value.get('_properties'):
+            return bpy.context.scene.send2ue
+    return value
+
+
+def partition_jobs(jobs, count):
+    """
+    Splits the export jobs between the workers. The jobs of an asset, like a mesh and its lods, stay together and in
+    order, and each asset goes to the worker with the fewest jobs so far.
+
+    :param list[tuple] jobs: The queued export jobs.
+    :param int count: The number of workers.
+    :return list[list[tuple]]: The jobs of each worker, leaving out workers without jobs.
+    """
+    asset_jobs = collections.OrderedDict()
+    for job in jobs:
+        asset_jobs.setdefault(job[4], []).append(job)
+
+    partitions = [[] for _ in range(count)]
+    for jobs_of_asset in asset_jobs.values():
+        min(partitions, key=len).extend(jobs_of_asset)
+
+    # keep the order the jobs were queued in within each worker, since exports can depend on the ones before them
+    order = {id(job): index for index, job in enumerate(jobs)}
+    return [sorted(partition, key=lambda job: order[id(job)]) for partition in partitions if partition]
+
+
+def get_worker_command(plan_path):
+    """
+    Gets the command that starts a headless blender worker with this addon enabled.
+
+    :param str plan_path: The path to the worker's plan file.
+    :return list[str]: The command.
+    """
+    package_name = __package__.split('.')[0]
+    addon_folder = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return [
+        bpy.app.binary_path,
+        '--background',
+        '--python-exit-code', '1',
+        '--python-expr', (
+            f'import sys, addon_utils; sys.path.append({addon_folder!r}); addon_utils.enable({package_name!r}); '
+            f'from {package_name}.core import parallel; parallel.run_worker({plan_path!r})'
+        )
+    ]
+
+
+def run_worker(plan_path):
+    """
+    Runs the export jobs of a plan. This is called in a headless blender worker process. It opens the copy of the
+    scene, runs the jobs in order and then writes the asset data of its assets back to disk.
+
+    :param str plan_path: The path to the worker's plan file.
+    """
+    from ..dependencies import unreal
+
+    with open(plan_path, 'r') as plan_file:
+        plan = json.load(plan_file)
+
+    # the worker doesn't talk to unreal, and must not clear the temp folder that the other processes export to
+    unreal.ConnectionHeartbeat.stop()
+    if utilities.setup_project in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(utilities.setup_project)
+    if bpy.app.timers.is_registered(utilities.addon_enabled):
+        bpy.app.timers.unregister(utilities.addon_enabled)
+
+    bpy.ops.wm.open_mainfile(filepath=plan['file_path'], load_ui=False)
+    bpy.ops.send2ue.reload_extensions()
+
+    bpy.context.window_manager.send2ue.asset_data.clear()
+    bpy.context.window_manager.send2ue.asset_data.update(plan['asset_data'])
+    execution_queue = bpy.app.driver_namespace[ToolInfo.EXECUTION_QUEUE.value] = queue.Queue()
+
+    for job in plan['jobs']:
+        # calling the decorated function queues the job just like in the interactive process
+        module = importlib.import_module(job['module'])
+        args = [deserialize_argument(arg) for arg in job['args']]
+        kwargs = {key: deserialize_argument(value) for key, value in job['kwargs'].items()}
+        getattr(module, job['function'])(*args, **kwargs)
+
+        while not execution_queue.empty():
+            function, args, kwargs, message, asset_id, attribute = execution_queue.get()
+            # set the current asset id
+            bpy.context.window_manager.send2ue.asset_id = asset_id
+            # run the function
+            function(*args, **kwargs)
+        asset_data = bpy.context.window_manager.send2ue.asset_data[job['asset_id']]
+        sys.stdout.write(f'\n{JOB_DONE_TOKEN} {json.dumps(asset_data)}\n')
+        sys.stdout.flush()
+
+    with open(plan['result_path'], 'w') as result_file:
+        json.dump({
+            asset_id: bpy.context.window_manager.send2ue.asset_data[asset_id] for asset_id in plan['asset_data']
+        }, result_file)
+
+
+class ExportWorker:
+    def __init__(self, index, command, jobs):
+        """
+        Starts a headless blender process and follows its output.
+
+        :param int index: The index of the worker.
+        :param list[str] command: The command that starts the process.
+        :param list[tuple] jobs: The queued export jobs the worker runs, in order.
+        """
+        self.index = index
+        self.jobs = jobs
+        self.finished_jobs = 0
+        # the jobs the worker finished with the asset data of their asset, till they are journaled
+        self.done_jobs = collections.deque()
+        self.output = collections.deque(maxlen=WORKER_OUTPUT_LINES)
+        self.process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace'
+        )
+        # the output is always read, so the process never blocks on a full pipe
+        self.reader = threading.Thread(target=self.read_output, daemon=True)
+        self.reader.start()
+
+    def read_output(self):
+        """
+        Reads the output of the process, collecting the jobs it finished.
+        """
+        for line in self.process.stdout:
+            if line.startswith(JOB_DONE_TOKEN):
+                asset_data = json.loads(line[len(JOB_DONE_TOKEN):])
+                self.done_jobs.append((self.jobs[self.finished_jobs], asset_data))
+                self.finished_jobs += 1
+            elif line.strip():
+                self.output.append(line.rstrip())
+        self.process.stdout.close()
+
+    def is_done(self):
+        """
+        Checks if the process has exited and all of its output has been read.
+
+        :return bool: Whether the worker is done.
+        """
+        return self.process.poll() is not None and not self.reader.is_alive()
+
+    def check(self):
+        """
+        Raises an error with the last lines of the worker's output if its process failed.
+        """
+        if self.process.returncode:
+            output = '\n'.join(self.output)
+            raise RuntimeError(
+                f'Export worker {self.index} failed with exit code {self.process.returncode}:\n{output}'
+            )
+
+    def terminate(self):
+        """
+        Stops the process if it is still running.
+        """
+        if self.process.poll() is None:
+            self.process.terminate()
+
+
+class ParallelExport:
+    def __init__(self, jobs, asset_data, worker_count):
+        """
+        Exports the assets of the queued export jobs with a pool of headless blender processes. Each worker opens a
+        copy of the current scene and runs its share of the jobs.
+
+        :param list[tuple] jobs: The queued export jobs.
+        :param dict asset_data: The asset data of all the assets keyed by asset id.
+        :param int worker_count: The maximum number of workers.
+        """
+        self.jobs = jobs
+        self.asset_data = asset_data
+        self.worker_count = worker_count
+        self.temp_folder = None
+        self.workers = []
+
+    @property
+    def pending(self):
+        """
+        Gets the number of export jobs that are not done yet.
+
+        :return int: The number of jobs.
+        """
+        return len(self.jobs) - sum(worker.finished_jobs for worker in self.workers)
+
+    def start(self):
+        """
+        Saves a copy of the current scene, writes a plan for each worker and starts them.
+        """
+        self.temp_folder = tempfile.mkdtemp(prefix=f'{ToolInfo.NAME.value}_export_')
+        file_path = os.path.join(self.temp_folder, 'scene.blend')
+        bpy.ops.wm.save_as_mainfile(filepath=file_path, copy=True, check_existing=False)
+
+        for index, jobs in enumerate(partition_jobs(self.jobs, self.worker_count)):
+            plan_path = os.path.join(self.temp_folder, f'plan_{index}.json')
+            asset_ids = list(dict.fromkeys(job[4] for job in jobs))
+            with open(plan_path, 'w') as plan_file:
+                json.dump({
+                    'file_path': file_path,
+                    'result_path': os.path.join(self.temp_folder, f'result_{index}.json'),
+                    'asset_data': {asset_id: self.asset_data[asset_id] for asset_id in asset_ids},
+                    'jobs': [{
+                        'module': function.__module__,
+                        'function': function.__name__,
+                        'args': [serialize_argument(arg) for arg in args],
+                        'kwargs': {key: serialize_argument(value) for key, value in kwargs.items()},
+                        'asset_id': asset_id
+                    } for function, args, kwargs, message, asset_id, attribute in jobs]
+                }, plan_file)
+            self.workers.append(ExportWorker(index, get_worker_command(plan_path), jobs))
+
+    def pop_done_jobs(self):
+        """
+        Removes the jobs that the workers have finished since this was last called, and collects the asset data the
+        workers changed for them into the asset data.
+
+        :return list[tuple]: The finished jobs.
+        """
+        done_jobs = []
+        for worker in self.workers:
+            while worker.done_jobs:
+                job, asset_data = worker.done_jobs.popleft()
+                self.asset_data[job[4]].update(asset_data)
+                done_jobs.append(job)
+        return done_jobs
+
+    def is_done(self):
+        """
+        Checks if all the workers are done.
+
+        :return bool: Whether the parallel export is done.
+        """
+        return all(worker.is_done() for worker in self.workers)
+
+    def wait(self):
+        """
+        Waits for all the workers to finish.
+        """
+        for worker in self.workers:
+            worker.process.wait()
+            worker.reader.join()
+
+    def finish(self):
+        """
+        Collects the output paths and other asset data the workers changed into the asset data, then removes the
+        temp files. If a worker failed, its error is raised.
+        """
+        try:
+            for worker in self.workers:
+                worker.check()
+                with open(os.path.join(self.temp_folder, f'result_{worker.index}.json'), 'r') as result_file:
+                    for asset_id, asset_data in json.load(result_file).items():
+                        self.asset_data[asset_id].update(asset_data)
+        finally:
+            self.cleanup()
+
+    def terminate(self):
+        """
+        Stops the workers that are still running and removes the temp files.
+        """
+        for worker in self.workers:
+            worker.terminate()
+        self.wait()
+        self.cleanup()
+
+    def cleanup(self):
+        """
+        Removes the copy of the scene and the plans.
+        """
+        if self.temp_folder:
+            shutil.rmtree(self.temp_folder, ignore_errors=True)
+            self.temp_folder = None
@@ -0,0 +1,235 @@
+# Copyright Epic Games, Inc. All Rights Reserved.
+
+import bpy
+import queue
+import threading
+import collections
+from concurrent import futures
+from ..constants import ToolInfo
+
+# the pipeline, asset data and asset id of the job that the import thread is running
+JOB_CONTEXT = threading.local()
+
+
+def is_pipelined_push():
+    """
+    Checks if the pipelined push addon preference is on.
+
+    :return bool: Whether the imports run on their own thread while the next assets are exported.
+    """
+    addon = bpy.context.preferences.addons.get(ToolInfo.NAME.value)
+    return bool(addon and getattr(addon.preferences, 'pipelined_push', False))
+
+
+def is_main_thread():
+    """
+    Checks if this is blender's main thread.
+
+    :return bool: Whether this is the main thread.
+    """
+    return threading.current_thread() is threading.main_thread()
+
+
+def get_asset_data(asset_id):
+    """
+    Gets the asset data of an asset. The import thread gets it without going through the blender context, since
+    that is only safe to use on the main thread.
+
+    :param str asset_id: The unique id of the asset.
+    :return dict: The asset data.
+    """
+    asset_data = getattr(JOB_CONTEXT, 'asset_data', None)
+    if asset_data is None:
+        asset_data = bpy.context.window_manager.send2ue.asset_data
+    return asset_data[asset_id]
+
+
+def run_in_main_thread(function, *args):
+    """
+    Runs a function on the main thread and waits for its result. The main thread runs these calls in between its
+    own jobs. When this is called on the main thread, the function is run right away.
+
+    :param callable function: The function.
+    :return Any: The function's return value.
+    """
+    if is_main_thread():
+        return function(*args)
+
+    import_pipeline = getattr(JOB_CONTEXT, 'pipeline', None)
+    if not import_pipeline:
+        raise RuntimeError(f'"{function.__name__}" can only be called on the main thread or an import thread.')
+    return import_pipeline.call_in_main_thread(function, args)
+
+
+def order_jobs_by_asset(jobs):
+    """
+    Orders the queued jobs so each asset's imports come right after its exports, instead of all the imports coming
+    after all the exports. The assets keep the order they were first queued in, and each asset keeps the order of its
+    own jobs, so meshes are still imported before their lods, sockets and animations.
+
+    :param list[tuple] jobs: The queued jobs.
+    :return list[tuple]: The ordered jobs.
+    """
+    asset_order = {}
+    for job in jobs:
+        asset_order.setdefault(job[4], len(asset_order))
+    return sorted(jobs, key=lambda job: asset_order[job[4]])
+
+
+class ImportPipeline:
+    def __init__(self, asset_data, on_job_done=None):
+        """
+        Runs the pipelined import jobs on a single thread in the order they are submitted, while the main thread
+        carries on exporting the next assets.
+
+        :param dict asset_data: The asset data of all the assets keyed by asset id.
+        :param callable on_job_done: An optional function that is called on the main thread with each job that
+        finished.
+        """
+        self.asset_data = asset_data
+        self.on_job_done = on_job_done
+        # the calls the import thread is waiting on the main thread for, like the extension tasks
+        self.calls = queue.Queue()
+        self.closed = False
+        self.lock = threading.Lock()
+        self.executor = futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='Send2UeImport')
+        self.futures = collections.deque()
+
+    @property
+    def pending(self):
+        """
+        Gets the number of submitted jobs that are not done yet.
+
+        :return int: The number of jobs.
+        """
+        return len(self.futures)
+
+    def run_job(self, function, args, kwargs, asset_id):
+        """
+        Runs a job on the import thread.
+
+        :param callable function: The job's function.
+        :param tuple args: The job's arguments.
+        :param dict kwargs: The job's keyword arguments.
+        :param str asset_id: The unique id of the job's asset.
+        """
+        JOB_CONTEXT.pipeline = self
+        JOB_CONTEXT.asset_data = self.asset_data
+        JOB_CONTEXT.asset_id = asset_id
+        try:
+            function(*args, **kwargs)
+        finally:
+            JOB_CONTEXT.pipeline = None
+            JOB_CONTEXT.asset_data = None
+            JOB_CONTEXT.asset_id = None
+
+    def call_in_main_thread(self, function, args):
+        """
+        Queues a call for the main thread and waits for its result. This is called on the import thread.
+
+        :param callable function: The function.
+        :param tuple args: The function's arguments.
+        :return Any: The function's return value.
+        """
+        future = futures.Future()
+        with self.lock:
+            # once the pipeline is shut down nothing runs the calls anymore, so the job stops here
+            if self.closed:
+                raise RuntimeError('The import pipeline was shut down.')
+            self.calls.put((future, JOB_CONTEXT.asset_id, function, args))
+        return future.result()
+
+    def execute_main_thread_calls(self):
+        """
+        Runs the calls that the import thread is waiting on the main thread for. The asset id of the job that made each
+        call is set first, so extensions see the same asset id as they would without the pipeline.
+        """
+        while True:
+            try:
+                future, asset_id, function, args = self.calls.get_nowait()
+            except queue.Empty:
+                return
+
+            if future.set_running_or_notify_cancel():
+                bpy.context.window_manager.send2ue.asset_id = asset_id
+                try:
+                    future.set_result(function(*args))
+                except Exception as error:
+                    future.set_exception(error)
+
+    def cancel_main_thread_calls(self):
+        """
+        Cancels the calls that the import thread is waiting on the main thread for, so it doesn't wait forever.
+        """
+        while True:
+            try:
+                future = self.calls.get_nowait()[0]
+            except queue.Empty:
+                return
+            future.cancel()
+
+    def submit(self, job):
+        """
+        Submits a job to run on the import thread after the jobs that were submitted before it.
+
+        :param tuple job: The queued job.
+        """
+        function, args, kwargs, message, asset_id, attribute = job
+        self.futures.append((self.executor.submit(self.run_job, function, args, kwargs, asset_id), job))
+
+    def pop_finished(self):
+        """
+        Removes the jobs that are done. If a job failed, its error is raised.
+
+        :return int: The number of jobs that were removed.
+        """
+        count = 0
+        while self.futures and self.futures[0][0].done():
+            future, job = self.futures.popleft()
+            future.result()
+            if self.on_job_done:
+                self.on_job_done(job)
+            count += 1
+        return count
+
+    def wait(self):
+        """
+        Waits for all the submitted jobs, running the calls they need the main thread for in the meantime.
+        """
+        while self.futures:
+            self.execute_main_thread_calls()
+            futures.wait([self.futures[0][0]], timeout=0.01)
+            self.pop_finished()
+
+    def is_running(self):
+        """
+        Checks if the import thread is still running a job.
+
+        :return bool: Whether a job is running.
+        """
+        return any(future.running() for future, job in self.futures)
+
+    def close(self):
+        """
+        Stops the pipeline without waiting on the import thread. The jobs that haven't started are cancelled, and so
+        are the calls the running job makes on the main thread, so it stops at its next call.
+        """
+        with self.lock:
+            self.closed = True
+        for future, job in self.futures:
+            future.cancel()
+        self.cancel_main_thread_calls()
+
+    def shutdown(self):
+        """
+        Closes the pipeline and waits for the import thread to finish its current job.
+        """
+        self.close()
+
+        # a call can be queued right before the pipeline is closed, so keep cancelling them till the job is done
+        running_futures = [future for future, job in self.futures if not future.done()]
+        while futures.wait(running_futures, timeout=0.01).not_done:
+            self.cancel_main_thread_calls()
+        self.cancel_main_thread_calls()
+        self.executor.shutdown(wait=True)
+        self.futures.clear()
@@ -249,7 +249,7 @@ def set_rpc_response_timeout(self, value):
     Overrides setter method on rpc_response_timeout property to update the
     environment variable on the rpc instance as well.
     """
-    if unreal.is_connected():
+    if unreal.is_connected(cached=True):
         unreal.set_rpc_env('RPC_TIME_OUT', value)
     os.environ['RPC_TIME_OUT'] = str(value)
     self['rpc_response_timeout'] = value
@@ -15,15 +15,22 @@ from ..constants import BlenderTypes, UnrealTypes, ToolInfo, PreFixToken, PathMo
 from mathutils import Vector, Quaternion
 
 
-def track_progress(message='', attribute=''):
+def track_progress(message='', attribute='', pipelined=False, parallel=False):
     """
     A decorator that makes its wrapped function a queued job.
 
     :param str message: A the progress message.
     :param str attribute: The asset attribute to use in as the message.
+    :param bool pipelined: Whether the job can run on the import thread of a pipelined push. These jobs must only
+    use the blender context through the extension tasks.
+    :param bool parallel: Whether the job can run in a headless worker process of a parallel export. The arguments of
+    these jobs must be objects, the tool properties or json serializable values.
     """
 
     def decorator(function):
+        function.pipelined = pipelined
+        function.parallel = parallel
+
         def wrapper(*args, **kwargs):
             asset_id = args[0]
             bpy.app.driver_namespace[ToolInfo.EXECUTION_QUEUE.value].put(
@@ -930,6 +937,17 @@ def remove_unpacked_files(unpacked_files):
             remove_from_disk(folder, directory=True)
 
 
+def get_job_time_budget():
+    """
+    Gets how long a push runs its queued jobs for before it lets blender handle events and redraw, from the addon
+    preferences.
+
+    :return float: The time budget in seconds.
+    """
+    addon = bpy.context.preferences.addons.get(ToolInfo.NAME.value)
+    return getattr(addon.preferences, 'job_time_budget', 50) / 1000 if addon else 0.05
+
+
 def refresh_all_areas():
     """
     Iterates of all windows and screens and tags them for a redraw
@@ -1,6 +1,7 @@
 # Copyright Epic Games, Inc. All Rights Reserved.
 
 import os
+import re as _re
 import sys as _sys
 import json as _json
 import uuid as _uuid
@@ -27,6 +28,8 @@ DEFAULT_MULTICAST_GROUP_ENDPOINT = ('239.0.0.1', 6766)  # The multicast group en
 DEFAULT_MULTICAST_BIND_ADDRESS = '127.0.0.1'            # The adapter address that the UDP multicast socket should bind to, or 127.0.0.1 to bind to all adapters (must match the "Multicast Bind Address" setting in the Python plugin)
 DEFAULT_COMMAND_ENDPOINT = ('127.0.0.1', 6776)          # The endpoint tuple for the TCP command connection hosted by this client (that the remote client will connect to)
 DEFAULT_RECEIVE_BUFFER_SIZE = 8192                      # The default receive buffer size
+MAX_RETAINED_RECEIVE_BUFFER_SIZE = 1048576              # The largest receive buffer a command connection keeps between messages, larger buffers are released once their message is read
+DEFAULT_RECEIVE_TIMEOUT = 600                           # The number of seconds to wait for data on the TCP command connection before giving up on the remote party
 
 # Execution modes (these must match the names given to LexToString for EPythonCommandExecutionMode in IPythonScriptPlugin.h)
 MODE_EXEC_FILE = 'ExecuteFile'                          # Execute the Python command as a file. This allows you to execute either a literal Python script containing multiple statements, or a file with optional arguments
@@ -42,6 +45,7 @@ class RemoteExecutionConfig(object):
         self.multicast_group_endpoint = DEFAULT_MULTICAST_GROUP_ENDPOINT
         self.multicast_bind_address = DEFAULT_MULTICAST_BIND_ADDRESS
         self.command_endpoint = DEFAULT_COMMAND_ENDPOINT
+        self.receive_timeout = DEFAULT_RECEIVE_TIMEOUT
 
 class RemoteExecution(object):
     '''
@@ -66,6 +70,20 @@ class RemoteExecution(object):
         '''
         return self._broadcast_connection.remote_nodes if self._broadcast_connection else []
 
+    def wait_for_remote_nodes(self, timeout=None):
+        '''
+        Wait until at least one remote "node" (UE4 instance running Python) has been discovered. This returns as soon as the first "pong" response is received, rather than polling `remote_nodes`.
+
+        Args:
+            timeout (float): The number of seconds to wait, or None to wait forever.
+
+        Returns:
+            list: A list of dicts containg the node ID and the other data, which is empty if the wait timed out.
+        '''
+        if self._broadcast_connection and self._broadcast_connection.wait_for_remote_nodes(timeout):
+            return self.remote_nodes
+        return []
+
     def start(self):
         '''
         Start the remote execution session. This will begin the discovey process for remote "nodes" (UE4 instances running Python).
@@ -109,6 +127,15 @@ class RemoteExecution(object):
             self._command_connection.close(self._broadcast_connection)
             self._command_connection = None
 
+    def get_command_connection_stats(self):
+        '''
+        Get the receive statistics of the current command connection.
+
+        Returns:
+            dict: The number of messages, reads and bytes received, and the size of the largest message in bytes. This is empty if there is no command connection.
+        '''
+        return dict(self._command_connection.stats) if self._command_connection else {}
+
     def run_command(self, command, unattended=True, exec_mode=MODE_EXEC_FILE, raise_on_failure=False):
         '''
         Run a command remotely based on the current command connection.
@@ -158,6 +185,7 @@ class _RemoteExecutionBroadcastNodes(object):
     def __init__(self):
         self._remote_nodes = {}
         self._remote_nodes_lock = _threading.RLock()
+        self._remote_nodes_found = _threading.Event()
 
     @property
     def remote_nodes(self):
@@ -189,6 +217,19 @@ class _RemoteExecutionBroadcastNodes(object):
             if node_id not in self._remote_nodes:
                 _logger.debug('Found Node {0}: {1}'.format(node_id, node_data))
             self._remote_nodes[node_id] = _RemoteExecutionNode(node_data, now)
+            self._remote_nodes_found.set()
+
+    def wait_for_remote_nodes(self, timeout=None):
+        '''
+        Wait until this set has at least one remote node.
+
+        Args:
+            timeout (float): The number of seconds to wait, or None to wait forever.
+
+        Returns:
+            bool: True if there is a remote node, False if the wait timed out.
+        '''
+        return self._remote_nodes_found.wait(timeout)
 
     def timeout_remote_nodes(self, now=None):
         '''
@@ -203,6 +244,8 @@ class _RemoteExecutionBroadcastNodes(object):
                 if node.should_timeout(now):
                     _logger.debug('Lost Node {0}: {1}'.format(node_id, node.data))
                     del self._remote_nodes[node_id]
+            if not self._remote_nodes:
+                self._remote_nodes_found.clear()
 
 class _RemoteExecutionBroadcastConnection(object):
     '''
@@ -230,6 +273,19 @@ class _RemoteExecutionBroadcastConnection(object):
         '''
         return self._nodes.remote_nodes if self._nodes else []
 
+    def wait_for_remote_nodes(self, timeout=None):
+        '''
+        Wait until at least one remote "node" (UE4 instance running Python) has been discovered.
+
+        Args:
+            timeout (float): The number of seconds to wait, or None to wait forever.
+
+        Returns:
+            bool: True if a remote node has been discovered, False if the wait timed out.
+        '''
+        nodes = self._nodes
+        return nodes.wait_for_remote_nodes(timeout) if nodes else False
+
     def open(self):
         '''
         Open the UDP based messaging and discovery connection. This will begin the discovey process for remote "nodes" (UE4 instances running Python).
@@ -281,7 +337,11 @@ class _RemoteExecutionBroadcastConnection(object):
         Main loop for the listen thread that handles processing discovery messages.
         '''
         while self._running:
-            # Receive and process all pending data
+            # Run tick logic first, so the first "ping" goes out as soon as the connection is opened
+            now = _time_now()
+            self._broadcast_ping(now)
+            self._nodes.timeout_remote_nodes(now)
+            # Receive and process all pending data, the socket timeout paces the loop when there is none
             while True:
                 try:
                     data = self._broadcast_socket.recv(DEFAULT_RECEIVE_BUFFER_SIZE)
@@ -291,11 +351,6 @@ class _RemoteExecutionBroadcastConnection(object):
                     self._handle_data(data)
                 else:
                     break
-            # Run tick logic
-            now = _time_now()
-            self._broadcast_ping(now)
-            self._nodes.timeout_remote_nodes(now)
-            _time.sleep(0.1)
 
     def _broadcast_message(self, message):
         '''
@@ -388,6 +443,17 @@ class _RemoteExecutionCommandConnection(object):
         self._remote_node_id = remote_node_id
         self._command_listen_socket = None
         self._command_channel_socket = _socket.socket() # This type is only here to appease PyLint
+        self._reader = None
+
+    @property
+    def stats(self):
+        '''
+        Get the receive statistics of this command connection.
+
+        Returns:
+            dict: The number of messages, reads and bytes received, and the size of the largest message in bytes.
+        '''
+        return self._reader.stats if self._reader else {}
 
     def open(self, broadcast_connection):
         '''
@@ -454,10 +520,10 @@ class _RemoteExecutionCommandConnection(object):
         Returns:
             The message that was received.
         '''
-        data = self._command_channel_socket.recv(DEFAULT_RECEIVE_BUFFER_SIZE)
-        if data:
+        json_obj = self._reader.read()
+        if json_obj is not None:
             message = _RemoteExecutionMessage(None, None)
-            if message.from_json_bytes(data) and message.passes_receive_filter(self._node_id) and message.type_ == expected_type:
+            if message.from_json_obj(json_obj) and message.passes_receive_filter(self._node_id) and message.type_ == expected_type:
                 return message
         raise RuntimeError('Remote party failed to send a valid response!')
 
@@ -485,12 +551,131 @@ class _RemoteExecutionCommandConnection(object):
             broadcast_connection.broadcast_open_connection(self._remote_node_id)
             try:
                 self._command_channel_socket = self._command_listen_socket.accept()[0]
-                self._command_channel_socket.setblocking(True)
+                self._command_channel_socket.settimeout(self._config.receive_timeout)
+                self._reader = _RemoteExecutionMessageReader(self._command_channel_socket)
                 return
             except _socket.timeout:
                 continue
         raise RuntimeError('Remote party failed to attempt the command socket connection!')
 
+class _RemoteExecutionMessageReader(object):
+    '''
+    A buffered reader for the JSON messages received over a TCP command connection. The messages are not length prefixed, so data is received into a reusable buffer that grows as needed. Each byte is scanned once to find where the JSON object ends, and the message is only decoded once it is complete.
+
+    Args:
+        sock (socket.socket): The connected socket to read from.
+        buffer_size (int): The initial size of the receive buffer.
+    '''
+    _STRUCTURE_PATTERN = _re.compile(rb'[{}"\\]')
+    _STRING_PATTERN = _re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', _re.DOTALL)
+
+    def __init__(self, sock, buffer_size=DEFAULT_RECEIVE_BUFFER_SIZE):
+        self._socket = sock
+        self._buffer_size = buffer_size
+        self._buffer = bytearray(buffer_size)
+        self._length = 0
+        # The state of the scan of the current message, so data is not scanned again when more of it is received
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._decoder = _json.JSONDecoder()
+        self.stats = {
+            'messages': 0,
+            'reads': 0,
+            'bytes': 0,
+            'max_message_size': 0,
+            }
+
+    def read(self):
+        '''
+        Read the next complete message from the socket. This raises a RuntimeError if the remote party sent data that isn't a JSON object, and a socket.timeout if the socket times out while waiting for data.
+
+        Returns:
+            dict: The parsed JSON object of the message, or None if the remote party closed the connection.
+        '''
+        while True:
+            json_obj = self._parse()
+            if json_obj is not None:
+                return json_obj
+            # Double the buffer once it is full, so a large message only takes a few reads
+            if self._length == len(self._buffer):
+                self._buffer.extend(bytes(len(self._buffer)))
+            with memoryview(self._buffer)[self._length:] as view:
+                size = self._socket.recv_into(view)
+            if not size:
+                return None
+            self._length += size
+            self.stats['reads'] += 1
+            self.stats['bytes'] += size
+
+    def _scan(self):
+        '''
+        Scan the data received since the last scan for the end of the JSON object at the start of the buffer.
+
+        Returns:
+            int: The size of the message in bytes, or 0 if the buffer doesn't hold a complete message yet.
+        '''
+        # Skip the whitespace before the message, anything else must start a JSON object
+        if not self._depth:
+            while self._scanned < self._length and self._buffer[self._scanned] in b' \t\r\n':
+                self._scanned += 1
+            if self._scanned == self._length:
+                return 0
+            if self._buffer[self._scanned] != ord('{'):
+                raise RuntimeError('Remote party sent invalid data!')
+
+        # Only the braces and quotes outside of strings change the depth, the bytes of multibyte UTF-8 characters never match them
+        while True:
+            if self._in_string:
+                # Skip to the closing quote, stopping before an escape that hasn't been fully received yet
+                self._scanned = self._STRING_PATTERN.match(self._buffer, self._scanned, self._length).end()
+                if self._scanned == self._length or self._buffer[self._scanned] != ord('"'):
+                    return 0
+                self._scanned += 1
+                self._in_string = False
+                continue
+
+            match = self._STRUCTURE_PATTERN.search(self._buffer, self._scanned, self._length)
+            if not match:
+                self._scanned = self._length
+                return 0
+            self._scanned = match.end()
+            character = self._buffer[match.start()]
+            if character == ord('"'):
+                self._in_string = True
+            elif character == ord('\\'):
+                raise RuntimeError('Remote party sent invalid data!')
+            else:
+                self._depth += 1 if character == ord('{') else -1
+                if not self._depth:
+                    return self._scanned
+
+    def _parse(self):
+        '''
+        Parse a complete message from the start of the buffer, and remove it from the buffer.
+
+        Returns:
+            dict: The parsed JSON object of the message, or None if the buffer doesn't hold a complete message yet.
+        '''
+        size = self._scan()
+        if not size:
+            return None
+        try:
+            json_obj = self._decoder.decode(self._buffer[:size].decode('utf-8'))
+        except ValueError:
+            raise RuntimeError('Remote party sent invalid data!')
+
+        self.stats['messages'] += 1
+        self.stats['max_message_size'] = max(self.stats['max_message_size'], size)
+        # Keep any data that was received after this message, and release a buffer that grew for a large message
+        remainder = self._buffer[size:self._length]
+        if len(self._buffer) > MAX_RETAINED_RECEIVE_BUFFER_SIZE:
+            self._buffer = bytearray(max(self._buffer_size, len(remainder)))
+        self._buffer[:len(remainder)] = remainder
+        self._length = len(remainder)
+        self._scanned = 0
+        return json_obj
+
 class _RemoteExecutionMessage(object):
     '''
     A message sent or received by remote execution (on either the UDP or TCP connection), as UTF-8 encoded JSON.
@@ -564,6 +749,22 @@ class _RemoteExecutionMessage(object):
         '''
         try:
             json_obj = _json.loads(json_str)
+        except Exception as e:
+            _logger.error('Failed to deserialize JSON "{0}": {1}'.format(json_str, str(e)))
+            return False
+        return self.from_json_obj(json_obj)
+
+    def from_json_obj(self, json_obj):
+        '''
+        Parse this message from its parsed JSON object.
+
+        Args:
+            json_obj (dict): The parsed JSON object of this message.
+
+        Returns:
+            bool: True if this message could be parsed, False otherwise.
+        '''
+        try:
             # Read and validate required protocol version information
             if json_obj['version'] != _PROTOCOL_VERSION:
                 raise ValueError('"version" is incorrect (got {0}, expected {1})!'.format(json_obj['version'], _PROTOCOL_VERSION))
@@ -578,7 +779,7 @@ class _RemoteExecutionMessage(object):
             self.dest = json_obj.get('dest')
             self.data = json_obj.get('data')
         except Exception as e:
-            _logger.error('Failed to deserialize JSON "{0}": {1}'.format(json_str, str(e)))
+            _logger.error('Failed to deserialize JSON "{0}": {1}'.format(json_obj, str(e)))
             return False
         return True
 
@@ -1,11 +1,27 @@
 import os
+import io
 import sys
 import abc
-import queue
+import json
+import base64
+import shutil
+import string
+import hashlib
+import pstats
+import cProfile
 import time
+import uuid
+import queue
+import inspect
+import itertools
 import logging
+import functools
+import tempfile
 import threading
+import collections
+from concurrent import futures
 from http import HTTPStatus
+from socketserver import ThreadingMixIn
 from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
 
 # importlib machinery needs to be available for importing client modules
@@ -14,8 +30,88 @@ from importlib.machinery import SourceFileLoader
 logger = logging.getLogger(__name__)
 
 EXECUTION_QUEUE = queue.Queue()
-RETURN_VALUE_NAME = 'RPC_SERVER_RETURN_VALUE'
-ERROR_VALUE_NAME = 'RPC_SERVER_ERROR_VALUE'
+# the id and deadline of the request that the current thread is handling
+REQUEST_CONTEXT = threading.local()
+# the futures of the queued calls by the id of their request, so they can be cancelled
+PENDING_CALLS = {}
+PENDING_CALLS_LOCK = threading.Lock()
+# the path that requests encoded as json are sent to, the other paths use xml
+JSON_RPC_PATH = '/json'
+# the key of the dictionaries that the client sends in place of large arguments that are stored on the server
+STORED_ARGUMENT_KEY = '__rpc_stored_argument__'
+# the key of the dictionaries that are returned in place of the results of generators, so they can be streamed
+STREAM_KEY = '__rpc_stream__'
+# the most streams that are kept open, the least recently opened streams are closed first
+MAX_OPEN_STREAMS = 64
+# the timings of the rpc calls in this process as chrome trace events, these are recorded when RPC_TELEMETRY is set
+TELEMETRY = collections.deque(maxlen=100000)
+# the extension of the files that are still being uploaded
+PARTIAL_UPLOAD_EXTENSION = '.part'
+
+
+def default_json_encoding(value):
+    """
+    Encodes objects that json doesn't support the same way the xml marshaller does, as a dictionary of their attributes.
+
+    :param object value: The object to encode.
+    :return dict: A dictionary of the object's attributes.
+    """
+    if hasattr(value, '__dict__'):
+        return vars(value)
+    raise TypeError(f'cannot marshal {type(value)} objects')
+
+
+def record_telemetry(phase, name, start, end=None, **kwargs):
+    """
+    Records the timing of a phase of an rpc call as a chrome trace event, if telemetry is enabled.
+
+    :param str phase: The name of the phase, i.e. request, queue, execute.
+    :param str name: The name of the function that was called.
+    :param float start: The time the phase started, from time.time().
+    :param float end: The time the phase ended. Defaults to now.
+    :param kwargs: Additional details of the phase, like payload sizes.
+    """
+    if not os.environ.get('RPC_TELEMETRY'):
+        return
+
+    end = time.time() if end is None else end
+    TELEMETRY.append({
+        'name': f'{phase} {name}',
+        'cat': phase,
+        'ph': 'X',
+        # these are floats since xml-rpc integers are only 32 bit
+        'ts': start * 1000000,
+        'dur': (end - start) * 1000000,
+        'pid': os.getpid(),
+        'tid': threading.get_native_id(),
+        'args': dict(function=name, **kwargs)
+    })
+
+
+def get_telemetry_events(process_name, clear=False):
+    """
+    Gets the recorded telemetry of this process as chrome trace events.
+
+    :param str process_name: The name the process is shown with in the trace.
+    :param bool clear: Whether to clear the recorded telemetry.
+    :return list[dict]: A list of chrome trace events.
+    """
+    events = list(TELEMETRY)
+    if clear:
+        TELEMETRY.clear()
+    return [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': process_name}}] + events
+
+
+def get_hashed_callable_name(callable_name, code_hash):
+    """
+    Gets the name that a callable is registered under for the hash of its code. Clients that register different
+    code under the same function name get different names, so they never run each other's code.
+
+    :param str callable_name: The name of the callable.
+    :param str code_hash: The hash of the callable's code.
+    :return str: The name of the callable with its hash.
+    """
+    return f'{callable_name}_{code_hash[:16]}'
 
 
 def run_in_main_thread(callable_instance, *args):
@@ -28,42 +124,100 @@ def run_in_main_thread(callable_instance, *args):
     """
     timeout = int(os.environ.get('RPC_TIME_OUT', 60))
 
-    globals().pop(RETURN_VALUE_NAME, None)
-    globals().pop(ERROR_VALUE_NAME, None)
-    EXECUTION_QUEUE.put((callable_instance, args))
-
-    for attempt in range(timeout * 10):
-        if RETURN_VALUE_NAME in globals():
-            return globals().get(RETURN_VALUE_NAME)
-        elif ERROR_VALUE_NAME in globals():
-            raise globals()[ERROR_VALUE_NAME]
-        else:
-            time.sleep(0.1)
-
-    if RETURN_VALUE_NAME not in globals():
+    # don't wait any longer than the client will
+    deadline = getattr(REQUEST_CONTEXT, 'deadline', None)
+    if deadline:
+        timeout = min(timeout, max(deadline - time.time(), 0))
+
+    # each call gets its own future, which is resolved as soon as the main thread has run it. This lets many
+    # requests wait on the queue at the same time, while the main thread runs them in the order they came in.
+    future = futures.Future()
+    request_id = getattr(REQUEST_CONTEXT, 'request_id', None)
+    if request_id:
+        with PENDING_CALLS_LOCK:
+            PENDING_CALLS[request_id] = future
+
+    EXECUTION_QUEUE.put((future, callable_instance, args, time.time(), deadline))
+    try:
+        return future.result(timeout)
+    except futures.CancelledError:
+        raise RuntimeError(f'The call "{callable_instance.__name__}" was cancelled by the client.')
+    except futures.TimeoutError:
+        # the call itself raised the timeout error
+        if future.done():
+            raise
+
+        # otherwise make sure the call doesn't run after the client has stopped waiting for it
+        future.cancel()
         raise TimeoutError(
             f'The call "{callable_instance.__name__}" timed out because it hit the timeout limit'
-            f' of {timeout} seconds.'
+            f' of {round(timeout, 2)} seconds.'
         )
+    finally:
+        if request_id:
+            with PENDING_CALLS_LOCK:
+                PENDING_CALLS.pop(request_id, None)
+
+
+def cancel_pending_calls(request_ids):
+    """
+    Cancels the queued calls of the given requests, so they are skipped instead of run.
+
+    :param list[str] request_ids: The ids of the requests.
+    :return int: The number of calls that were cancelled.
+    """
+    cancelled = 0
+    with PENDING_CALLS_LOCK:
+        for request_id in request_ids:
+            future = PENDING_CALLS.get(request_id)
+            if future and future.cancel():
+                cancelled += 1
+    return cancelled
 
 
 def execute_queued_calls(*extra_args):
     """
-    Runs calls in the execution que till they are gone. Designed to be passed to a
-    recurring event in an integration like a timer.
+    Runs calls in the execution que till they are gone, or till the time budget for this tick is used up. At least
+    one call is run each time. Designed to be passed to a recurring event in an integration like a timer.
+
+    :return int: The number of calls that were run.
     """
-    while not EXECUTION_QUEUE.empty():
-        if RETURN_VALUE_NAME not in globals():
-            callable_instance, args = EXECUTION_QUEUE.get()
-            try:
-                globals()[RETURN_VALUE_NAME] = callable_instance(*args)
-            except Exception as error:
-                # store the error in the globals and re-raise it
-                globals()[ERROR_VALUE_NAME] = error
-                raise error
+    budget = float(os.environ.get('RPC_EXECUTION_BUDGET', 8)) / 1000
+    start = time.perf_counter()
+    executed = 0
+
+    while not executed or time.perf_counter() - start < budget:
+        try:
+            future, callable_instance, args, queued_time, deadline = EXECUTION_QUEUE.get_nowait()
+        except queue.Empty:
+            break
+
+        # drop calls that the client has stopped waiting for
+        if deadline and time.time() > deadline:
+            future.cancel()
+
+        # skip calls that were cancelled while they were queued
+        if not future.set_running_or_notify_cancel():
+            continue
+
+        executed += 1
+        execute_time = time.time()
+        record_telemetry('queue', callable_instance.__name__, queued_time, execute_time)
+        try:
+            future.set_result(callable_instance(*args))
+        except Exception as error:
+            # pass the error to the waiting request and re-raise it
+            future.set_exception(error)
+            raise error
+        finally:
+            record_telemetry('execute', callable_instance.__name__, execute_time)
+
+    return executed
 
 
 class AuthenticatedRequestHandler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ('/', '/RPC2', JSON_RPC_PATH)
+
     def is_authorized(self):
         """
         Checks if the Authorization header matches the key generated by the server.
@@ -90,21 +244,83 @@ class AuthenticatedRequestHandler(SimpleXMLRPCRequestHandler):
         self.end_headers()
         self.wfile.write(response)
 
+    def send_header(self, keyword, value):
+        """
+        Overrides the send header method so json responses have the correct content type.
+        """
+        if keyword.lower() == 'content-type' and self.path == JSON_RPC_PATH:
+            value = 'application/json'
+        super(AuthenticatedRequestHandler, self).send_header(keyword, value)
+
     def do_POST(self):
         """
         Overrides the post method to implement authentication.
         """
         if self.is_authorized():
+            # keep track of the request, so its calls can be cancelled and dropped once the client stops waiting. The
+            # deadline is relative to when the request is read, so the machines' clocks don't have to agree, but the
+            # time the request spent in the listen backlog is not counted
+            timeout = self.headers.get('X-RPC-Timeout')
+            REQUEST_CONTEXT.request_id = self.headers.get('X-RPC-Request-Id')
+            REQUEST_CONTEXT.deadline = time.time() + float(timeout) if timeout else None
             super(AuthenticatedRequestHandler, self).do_POST()
         else:
             self.report_401()
 
 
+class KeepAliveRequestHandler(AuthenticatedRequestHandler):
+    # keep the connection open between requests so clients don't reconnect on every call
+    protocol_version = 'HTTP/1.1'
+    # close connections that have been idle for this many seconds
+    timeout = 60
+    # send the responses right away instead of waiting to coalesce the headers and body
+    disable_nagle_algorithm = True
+
+
 class BaseServer(SimpleXMLRPCServer):
     def __init__(self, *args, **kwargs):
-        kwargs['requestHandler'] = AuthenticatedRequestHandler
+        kwargs.setdefault('requestHandler', AuthenticatedRequestHandler)
         super(BaseServer, self).__init__(*args, **kwargs)
 
+    def _marshaled_dispatch(self, data, dispatch_method=None, path=None):
+        """
+        Overrides the marshaled dispatch so requests sent to the json path are decoded and encoded as json.
+
+        :param bytes data: The request body.
+        :param callable dispatch_method: An optional dispatch method.
+        :param str path: The path the request was sent to.
+        :return bytes: The response body.
+        """
+        start = time.time()
+        if path != JSON_RPC_PATH:
+            response = super(BaseServer, self)._marshaled_dispatch(data, dispatch_method, path)
+        else:
+            try:
+                request = json.loads(data)
+                response = {'result': self._dispatch(request['method'], request['params'])}
+                response = json.dumps(response, separators=(',', ':'), default=default_json_encoding).encode('utf-8')
+            except Exception as error:
+                response = {'fault': {'faultCode': 1, 'faultString': f'{type(error)}:{error}'}}
+                response = json.dumps(response, separators=(',', ':')).encode('utf-8')
+
+        record_telemetry('request', path, start, request_size=len(data), response_size=len(response))
+        return response
+
+    def _dispatch(self, method, params):
+        """
+        Overrides the dispatch to record how long each method takes. Calls that start after the request's deadline
+        are dropped.
+        """
+        start = time.time()
+        deadline = getattr(REQUEST_CONTEXT, 'deadline', None)
+        if deadline and start > deadline:
+            raise TimeoutError(f'The call "{method}" was dropped because the client stopped waiting for it.')
+
+        try:
+            return super(BaseServer, self)._dispatch(method, params)
+        finally:
+            record_telemetry('dispatch', method, start)
+
     def serve_until_killed(self):
         """
         Serves till killed by the client.
@@ -114,6 +330,17 @@ class BaseServer(SimpleXMLRPCServer):
             self.handle_request()
 
 
+class ThreadedServer(ThreadingMixIn, BaseServer):
+    """
+    Handles each connection in its own thread, so kept alive connections don't block other clients.
+    """
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        kwargs['requestHandler'] = KeepAliveRequestHandler
+        super(ThreadedServer, self).__init__(*args, **kwargs)
+
+
 class BaseRPCServer:
     def __init__(self, name, port, is_thread=False):
         """
@@ -123,18 +350,46 @@ class BaseRPCServer:
         :param int port: The number of the server port.
         :param bool is_thread: Whether the server is encapsulated in a thread.
         """
-        self.server = BaseServer(
+        # the blocking server runs the calls on the thread that handles the request, so it must stay single threaded
+        server_class = ThreadedServer if is_thread else BaseServer
+        self.server = server_class(
             (os.environ.get('RPC_HOST', '127.0.0.1'), port),
             logRequests=False,
             allow_none=True
         )
+        self.name = name
         self.is_thread = is_thread
+        self.callables = {}
+        self.stored_arguments = collections.OrderedDict()
+        self.stored_arguments_lock = threading.Lock()
+        # the generators that are being streamed to clients. Thread safe generators are opened on the request
+        # threads while other streams are read on the main thread, so the streams are only changed under the lock
+        self.streams = collections.OrderedDict()
+        self.streams_lock = threading.Lock()
+        # the accumulated profiler stats and call counts of each callable, these are recorded when RPC_PROFILE is set
+        self.profile_stats = {}
+        self.profile_lock = threading.Lock()
+        # requests are handled on their own threads, so callables are registered one at a time
+        self.register_lock = threading.Lock()
+        # uploaded files are stored in a folder per content hash, and written one chunk at a time
+        self.upload_folder = os.environ.get('RPC_UPLOAD_FOLDER', os.path.join(tempfile.gettempdir(), 'rpc_uploads'))
+        self.upload_lock = threading.Lock()
         self.server.register_function(self.add_new_callable)
         self.server.register_function(self.kill)
         self.server.register_function(self.is_running)
         self.server.register_function(self.set_env)
+        self.server.register_function(self.get_codecs)
+        self.server.register_function(self.get_telemetry)
+        self.server.register_function(self.get_profile_stats)
+        self.server.register_function(self.cancel)
+        self.server.register_function(self.clear_profile_stats)
+        self.server.register_function(self.start_upload)
+        self.server.register_function(self.upload_chunk)
+        self.server.register_function(self.finish_upload)
+        for function in (self.profile(self.next_chunk), self.close_stream):
+            self.server.register_function(self.thread_safe_call(function) if is_thread else function, function.__name__)
         self.server.register_introspection_functions()
-        self.server.register_multicall_functions()
+        self.server.register_function(self.multicall, 'system.multicall')
         logger.info(f'Started RPC server "{name}".')
 
     @staticmethod
@@ -144,6 +399,90 @@ class BaseRPCServer:
         """
         return True
 
+    @staticmethod
+    def get_codecs():
+        """
+        Responds with the codecs the server can decode requests with.
+
+        :return list[str]: The names of the codecs.
+        """
+        return ['xml', 'json']
+
+    def get_telemetry(self, clear=False):
+        """
+        Responds with the timings of the rpc calls that this server's process has recorded as chrome trace events.
+        Telemetry is recorded when the RPC_TELEMETRY environment variable is set.
+
+        :param bool clear: Whether to clear the recorded telemetry.
+        :return list[dict]: A list of chrome trace events.
+        """
+        return get_telemetry_events(self.name, clear)
+
+    def get_profile_stats(self, sort='cumulative', limit=30):
+        """
+        Responds with the profiler stats of the callables that were run while the RPC_PROFILE environment variable
+        was set. The stats of each callable are accumulated over all of its calls.
+
+        :param str sort: The key to sort the stats by, i.e. cumulative, tottime, ncalls.
+        :param int limit: The number of lines of each report.
+        :return dict: A dictionary of the number of calls, total time and stats report of each callable.
+        """
+        profile_stats = {}
+        with self.profile_lock:
+            for name, (calls, stats) in self.profile_stats.items():
+                report = io.StringIO()
+                stats.stream = report
+                stats.sort_stats(sort).print_stats(limit)
+                profile_stats[name] = {'calls': calls, 'total_time': stats.total_tt, 'report': report.getvalue()}
+        return profile_stats
+
+    def clear_profile_stats(self):
+        """
+        Clears the accumulated profiler stats.
+        """
+        with self.profile_lock:
+            self.profile_stats.clear()
+        return True
+
+    def profile(self, callable_instance):
+        """
+        Wraps the callable so it is run under cProfile when the RPC_PROFILE environment variable is set. The variable
+        can be set to a comma separated list of callable names to only profile those.
+
+        :param callable callable_instance: The callable.
+        :return callable: The wrapped callable.
+        """
+        name = callable_instance.__name__
+
+        @functools.wraps(callable_instance)
+        def wrapper(*args):
+            names = os.environ.get('RPC_PROFILE', '')
+            if not names or (names not in ('1', 'true', 'True') and name not in names.split(',')):
+                return callable_instance(*args)
+
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(callable_instance, *args)
+            finally:
+                with self.profile_lock:
+                    calls, stats = self.profile_stats.get(name, (0, None))
+                    if stats:
+                        stats.add(profiler)
+                    else:
+                        stats = pstats.Stats(profiler)
+                    self.profile_stats[name] = (calls + 1, stats)
+        return wrapper
+
+    @staticmethod
+    def cancel(request_id):
+        """
+        Cancels the queued calls of one or more requests, so the main thread doesn't run them.
+
+        :param str | list[str] request_id: The id of a request, or a list of them.
+        :return int: The number of calls that were cancelled.
+        """
+        return cancel_pending_calls([request_id] if isinstance(request_id, str) else request_id)
+
     @staticmethod
     def set_env(name, value):
         """
@@ -161,9 +500,266 @@ class BaseRPCServer:
         self.server.quit = True
         return True
 
-    def add_new_callable(self, callable_name, code, client_system_path, remap_pairs=None):
+    def multicall(self, calls):
+        """
+        Runs a list of calls in a single request. When the server is in a thread, all the calls are run together
+        in a single call on the main thread.
+
+        :param list[dict] calls: A list of dictionaries with the method name and params of each call.
+        :return list: A list with a result for each call. Successful results are a list with the return value, and
+        failed results are a fault dictionary. The calls that start after the request's deadline are dropped.
+        """
+        # the deadline is read on the request thread, since the calls may run on the main thread
+        deadline = getattr(REQUEST_CONTEXT, 'deadline', None)
+
+        def run_multicall():
+            results = []
+            for call in calls:
+                try:
+                    method_name = call['methodName']
+                    if deadline and time.time() > deadline:
+                        raise TimeoutError(
+                            f'The call "{method_name}" was dropped because the client stopped waiting for it.'
+                        )
+                    if method_name == 'system.multicall':
+                        raise ValueError('Recursive system.multicall calls are not supported')
+
+                    # get the callable as it was defined, since this is already running on the main thread
+                    function = self.callables.get(method_name, self.server.funcs.get(method_name))
+                    if function is None:
+                        raise Exception(f'method "{method_name}" is not supported')
+
+                    results.append([function(*call['params'])])
+                except Exception as error:
+                    results.append({'faultCode': 1, 'faultString': f'{type(error)}:{error}'})
+            return results
+
+        if self.is_thread:
+            return run_in_main_thread(run_multicall)
+        return run_multicall()
+
+    def get_stored_argument(self, arg):
         """
-        Adds a new callable defined in the client to the server.
+        Gets the value of an argument that the client sent by reference. The first time a large argument is sent, its
+        value is sent with its hash and stored. After that, the client only sends the hash. The least recently used
+        arguments are evicted once the store is full.
+
+        :param Any arg: An argument from the client.
+        :return Any: The value of the argument.
+        """
+        if not isinstance(arg, dict) or STORED_ARGUMENT_KEY not in arg:
+            return arg
+
+        digest = arg[STORED_ARGUMENT_KEY]
+        with self.stored_arguments_lock:
+            if 'value' in arg:
+                # store the serialized value so each call gets its own copy that it can safely modify
+                self.stored_arguments[digest] = json.dumps(arg['value'])
+                while len(self.stored_arguments) > int(os.environ.get('RPC_ARGUMENT_STORE_SIZE', 32)):
+                    self.stored_arguments.popitem(last=False)
+
+            data = self.stored_arguments.get(digest)
+            if data is None:
+                raise LookupError(f'The argument "{digest}" is not in the argument store')
+            self.stored_arguments.move_to_end(digest)
+        return json.loads(data)
+
+    def resolve_stored_arguments(self, callable_instance):
+        """
+        Wraps the callable so that any arguments the client sent by reference are replaced with their stored values.
+
+        :param callable callable_instance: The callable.
+        :return callable: The wrapped callable.
+        """
+        @functools.wraps(callable_instance)
+        def wrapper(*args):
+            return callable_instance(*[self.get_stored_argument(arg) for arg in args])
+        return wrapper
+
+    def next_chunk(self, stream_id):
+        """
+        Gets the next chunk of items from a stream. The stream is only advanced when the client asks for the next
+        chunk, so a slow client never has more than one chunk waiting for it.
+
+        :param str stream_id: The id of the stream.
+        :return dict: A dictionary with the stream id, the items, and whether the stream is done.
+        """
+        with self.streams_lock:
+            stream = self.streams.get(stream_id)
+        if stream is None:
+            raise LookupError(f'The stream "{stream_id}" is not open')
+
+        chunk_size = int(os.environ.get('RPC_STREAM_CHUNK_SIZE', 100))
+        try:
+            items = list(itertools.islice(stream, chunk_size))
+        except Exception:
+            with self.streams_lock:
+                self.streams.pop(stream_id, None)
+            raise
+
+        done = len(items) < chunk_size
+        if done:
+            with self.streams_lock:
+                self.streams.pop(stream_id, None)
+        return {STREAM_KEY: stream_id, 'items': items, 'done': done}
+
+    def close_stream(self, stream_id):
+        """
+        Closes a stream that the client stopped reading before it was done.
+
+        :param str stream_id: The id of the stream.
+        """
+        with self.streams_lock:
+            stream = self.streams.pop(stream_id, None)
+        if stream is not None:
+            self.close_generator(stream)
+        return True
+
+    @staticmethod
+    def close_generator(generator):
+        """
+        Closes a generator, unless it is being advanced on another thread, in which case it is left to finish.
+
+        :param Generator generator: The generator.
+        """
+        try:
+            generator.close()
+        except ValueError:
+            pass
+
+    def stream_results(self, callable_instance):
+        """
+        Wraps the callable so that if it returns a generator, it is streamed to the client in chunks. The first chunk
+        is returned right away, so short generators don't need any more requests.
+
+        :param callable callable_instance: The callable.
+        :return callable: The wrapped callable.
+        """
+        @functools.wraps(callable_instance)
+        def wrapper(*args):
+            result = callable_instance(*args)
+            if not inspect.isgenerator(result):
+                return result
+
+            stream_id = uuid.uuid4().hex
+            with self.streams_lock:
+                self.streams[stream_id] = result
+                closed_streams = [
+                    self.streams.popitem(last=False)[1] for _ in range(len(self.streams) - MAX_OPEN_STREAMS)
+                ]
+            for stream in closed_streams:
+                self.close_generator(stream)
+            return self.next_chunk(stream_id)
+        return wrapper
+
+    def get_upload_path(self, file_name, digest):
+        """
+        Gets the path that an uploaded file is stored at. Files are stored in a folder named after their content hash,
+        so files with the same name but different content don't overwrite each other, and they keep their name.
+
+        :param str file_name: The name of the file.
+        :param str digest: The sha256 hex digest of the file's content.
+        :return str: The path of the file on the server.
+        """
+        if len(digest) != 64 or not set(digest).issubset(string.hexdigits):
+            raise ValueError(f'"{digest}" is not a sha256 digest')
+        if not file_name or os.path.basename(file_name) != file_name or file_name in (os.curdir, os.pardir):
+            raise ValueError(f'"{file_name}" is not a file name')
+        return os.path.join(self.upload_folder, digest.lower(), file_name)
+
+    def start_upload(self, file_name, digest, size):
+        """
+        Starts or resumes the upload of a file. If the server already has a file with the same content, it is reused
+        and nothing needs to be uploaded.
+
+        :param str file_name: The name of the file.
+        :param str digest: The sha256 hex digest of the file's content.
+        :param int size: The size of the file in bytes.
+        :return dict: A dictionary with the path of the file on the server, the offset to upload the next chunk at,
+        and whether the upload is done.
+        """
+        file_path = self.get_upload_path(file_name, digest)
+        with self.upload_lock:
+            if not os.path.isfile(file_path):
+                # copy a file with the same content that was uploaded with another name
+                folder = os.path.dirname(file_path)
+                for name in os.listdir(folder) if os.path.isdir(folder) else []:
+                    if not name.endswith(PARTIAL_UPLOAD_EXTENSION):
+                        shutil.copyfile(os.path.join(folder, name), file_path)
+                        break
+
+            if os.path.isfile(file_path) and os.path.getsize(file_path) == size:
+                return {'path': file_path, 'offset': size, 'done': True}
+
+            # resume from the end of a partial upload
+            partial_file_path = file_path + PARTIAL_UPLOAD_EXTENSION
+            offset = os.path.getsize(partial_file_path) if os.path.isfile(partial_file_path) else 0
+            if offset > size:
+                os.remove(partial_file_path)
+                offset = 0
+        return {'path': file_path, 'offset': offset, 'done': False}
+
+    def upload_chunk(self, file_name, digest, offset, data):
+        """
+        Writes a chunk of an upload. Chunks must be sent in order, so the offset is checked against the data that was
+        already uploaded.
+
+        :param str file_name: The name of the file.
+        :param str digest: The sha256 hex digest of the file's content.
+        :param int offset: The offset of the chunk in the file.
+        :param str data: The chunk's bytes encoded as base64.
+        :return int: The offset to upload the next chunk at.
+        """
+        partial_file_path = self.get_upload_path(file_name, digest) + PARTIAL_UPLOAD_EXTENSION
+        with self.upload_lock:
+            uploaded_size = os.path.getsize(partial_file_path) if os.path.isfile(partial_file_path) else 0
+            if uploaded_size != offset:
+                raise ValueError(f'The upload of "{file_name}" is at offset {uploaded_size} not {offset}')
+
+            os.makedirs(os.path.dirname(partial_file_path), exist_ok=True)
+            with open(partial_file_path, 'ab') as partial_file:
+                partial_file.write(base64.b64decode(data))
+                return partial_file.tell()
+
+    def finish_upload(self, file_name, digest):
+        """
+        Finishes an upload once all its chunks are written. The content is checked against its digest before the
+        file is moved into place.
+
+        :param str file_name: The name of the file.
+        :param str digest: The sha256 hex digest of the file's content.
+        :return str: The path of the file on the server.
+        """
+        file_path = self.get_upload_path(file_name, digest)
+        partial_file_path = file_path + PARTIAL_UPLOAD_EXTENSION
+        with self.upload_lock:
+            if os.path.isfile(file_path) and not os.path.isfile(partial_file_path):
+                return file_path
+
+            file_hash = hashlib.sha256()
+            with open(partial_file_path, 'rb') as partial_file:
+                for chunk in iter(lambda: partial_file.read(1024 * 1024), b''):
+                    file_hash.update(chunk)
+
+            if file_hash.hexdigest() != digest.lower():
+                os.remove(partial_file_path)
+                raise ValueError(f'The upload of "{file_name}" does not match its digest')
+            os.replace(partial_file_path, file_path)
+        return file_path
+
+    def add_new_callable(
+            self,
+            callable_name,
+            code,
+            client_system_path,
+            remap_pairs=None,
+            code_hash=None,
+            thread_safe=False
+    ):
+        """
+        Adds a new callable defined in the client to the server. If a code hash is given, the callable is also
+        registered under its name with the hash, which is the name the client calls it by. If that name is already
+        registered, the code is not run again.
 
         :param str callable_name: The name of the function that will be added to the server.
         :param str code: The code of the callable that will be added to the server.
@@ -171,36 +767,50 @@ class BaseRPCServer:
         :param list(tuple) remap_pairs: A list of tuples with first value being the client python path root and the
         second being the new server path root. This can be useful if the client and server are on two different file
         systems and the root of the import paths need to be dynamically replaced.
+        :param str code_hash: The hash of the code that the client generated.
+        :param bool thread_safe: Whether the callable is safe to run on the thread that handles the request. These
+        callables are run right away instead of waiting in the queue for the main thread.
         :return str: A response message back to the client.
         """
-        for path in client_system_path:
-            # if a list of remap pairs are provided, they will be remapped before being added to the system path
-            for client_path_root, matching_server_path_root in remap_pairs or []:
-                if path.startswith(client_path_root):
-                    path = os.path.join(
-                        matching_server_path_root,
-                        path.replace(client_path_root, '').replace(os.sep, '/').strip('/')
-                    )
-
-            if path not in sys.path:
-                sys.path.append(path)
-
-        # run the function code
-        exec(code)
-        callable_instance = locals().copy().get(callable_name)
-
-        # grab it from the locals and register it with the server
-        if callable_instance:
-            if self.is_thread:
-                self.server.register_function(
-                    self.thread_safe_call(callable_instance),
-                    callable_name
-                )
-            else:
-                self.server.register_function(
-                    callable_instance,
-                    callable_name
-                )
+        with self.register_lock:
+            # the plain name is kept for clients that don't send a hash
+            callable_names = [callable_name]
+            if code_hash:
+                callable_names.append(get_hashed_callable_name(callable_name, code_hash))
+                if callable_names[-1] in self.callables:
+                    return f'The function "{callable_name}" is already registered with the server.'
+
+            for path in client_system_path:
+                # if a list of remap pairs are provided, they will be remapped before being added to the system path
+                for client_path_root, matching_server_path_root in remap_pairs or []:
+                    if path.startswith(client_path_root):
+                        path = os.path.join(
+                            matching_server_path_root,
+                            path.replace(client_path_root, '').replace(os.sep, '/').strip('/')
+                        )
+
+                if path not in sys.path:
+                    sys.path.append(path)
+
+            # run the function code
+            exec(code)
+            callable_instance = locals().copy().get(callable_name)
+
+            # grab it from the locals and register it with the server
+            if callable_instance:
+                callable_instance = self.profile(self.stream_results(self.resolve_stored_arguments(callable_instance)))
+                for name in callable_names:
+                    if self.is_thread and not thread_safe:
+                        self.server.register_function(
+                            self.thread_safe_call(callable_instance),
+                            name
+                        )
+                    else:
+                        self.server.register_function(
+                            callable_instance,
+                            name
+                        )
+                    self.callables[name] = callable_instance
         return f'The function "{callable_name}" has been successfully registered with the server!'
 
 
@@ -5,17 +5,29 @@ import sys
 from . import base_server
 from .base_server import BaseRPCServerThread, BaseRPCServerManager
 
+# the timer runs at the shortest interval while calls are coming in, and backs off to the longest when idle
+MIN_TIMER_INTERVAL = 0.01
+MAX_TIMER_INTERVAL = 0.1
+timer_interval = MAX_TIMER_INTERVAL
+
 
 def execute_queued_calls():
     """
     Adds calls in the execution que that get picked up by blender app timer.
     :return float: The amount of time between timer calls.
     """
+    global timer_interval
     try:
-        base_server.execute_queued_calls()
+        executed = base_server.execute_queued_calls()
     except Exception as error:
         sys.stderr.write(str(error))
-    return 0.1
+        executed = 1
+
+    if executed or not base_server.EXECUTION_QUEUE.empty():
+        timer_interval = MIN_TIMER_INTERVAL
+    else:
+        timer_interval = min(timer_interval * 2, MAX_TIMER_INTERVAL)
+    return timer_interval
 
 
 class BlenderRPCServerThread(BaseRPCServerThread):
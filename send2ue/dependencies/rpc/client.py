@@ -1,37 +1,97 @@
 import os
 import re
+import gzip
+import json
+import time
+import base64
+import hashlib
+import uuid
+import weakref
+import asyncio
 import logging
 import inspect
+import builtins
+import threading
+import contextlib
+import urllib.parse
 from xmlrpc.client import (
     ServerProxy,
     Unmarshaller,
     Transport,
     ExpatParser,
     Fault,
-    ResponseError
+    ResponseError,
+    ProtocolError,
+    dumps,
+    _Method
 )
+from .base_server import record_telemetry, default_json_encoding
 logger = logging.getLogger(__package__)
 
+# the transports that are shared by every client, keyed by the server address
+TRANSPORTS = {}
+TRANSPORTS_LOCK = threading.Lock()
+# the asynchronous transports that are shared by every client, keyed by the server address
+ASYNC_TRANSPORTS = {}
+# the most connections each event loop opens to a server at once, this stays below the server's listen backlog of 5
+# so a blocking server, which accepts one connection at a time, doesn't drop any
+MAX_ASYNC_CONNECTIONS = 4
+# the path that requests encoded as json are sent to
+JSON_RPC_PATH = '/json'
+# the ids of the requests that are waiting on a response, keyed by the server host
+PENDING_REQUESTS = {}
+PENDING_REQUESTS_LOCK = threading.Lock()
+# the content hashes of the files that were uploaded, keyed by their path, with the modified time and size they had
+FILE_DIGESTS = {}
+
+
+@contextlib.contextmanager
+def track_request(host):
+    """
+    Tracks a request as pending while it waits on a response, so it can be cancelled.
+
+    :param str host: The host of the server.
+    :return str: The id of the request.
+    """
+    request_id = uuid.uuid4().hex
+    with PENDING_REQUESTS_LOCK:
+        PENDING_REQUESTS.setdefault(host, set()).add(request_id)
+    try:
+        yield request_id
+    finally:
+        with PENDING_REQUESTS_LOCK:
+            PENDING_REQUESTS[host].discard(request_id)
+
+
+def get_request_headers(request_id):
+    """
+    Gets the headers that tell the server the id of a request and how long the client will wait for it. The server
+    drops queued calls once the client has stopped waiting for them.
+
+    :param str request_id: The id of the request.
+    :return list[tuple]: A list of header names and values.
+    """
+    return [('X-RPC-Request-Id', request_id), ('X-RPC-Timeout', os.environ.get('RPC_TIME_OUT', '60'))]
+
 
 class RPCUnmarshaller(Unmarshaller):
-    def __init__(self, *args, **kwargs):
-        Unmarshaller.__init__(self, *args, **kwargs)
-        self.error_pattern = re.compile(r'(?P<exception>[^:]*):(?P<exception_message>.*$)')
-        self.builtin_exceptions = self._get_built_in_exceptions()
+    # these are shared by every unmarshaller, so they are only built once
+    error_pattern = re.compile(r'(?P<exception>[^:]*):(?P<exception_message>.*$)')
+    builtin_exceptions = {}
 
-    @staticmethod
-    def _get_built_in_exceptions():
+    @classmethod
+    def _get_built_in_exceptions(cls):
         """
-        Gets a list of the built-in exception classes in python.
+        Gets the built-in exception classes in python.
 
-        :return list[BaseException] A list of the built in exception classes in python:
+        :return dict[str, BaseException] A dictionary of the built in exception classes in python by name:
         """
-        builtin_exceptions = []
-        for builtin_name, builtin_class in globals().get('__builtins__').items():
-            if builtin_class and inspect.isclass(builtin_class) and issubclass(builtin_class, BaseException):
-                builtin_exceptions.append(builtin_class)
+        if not cls.builtin_exceptions:
+            for builtin_name, builtin_class in vars(builtins).items():
+                if builtin_class and inspect.isclass(builtin_class) and issubclass(builtin_class, BaseException):
+                    cls.builtin_exceptions[builtin_class.__name__] = builtin_class
 
-        return builtin_exceptions
+        return cls.builtin_exceptions
 
     def close(self):
         """
@@ -43,23 +103,73 @@ class RPCUnmarshaller(Unmarshaller):
             raise ResponseError()
 
         if self._type == 'fault':
-            marshallables = self._stack[0]
-            match = self.error_pattern.match(marshallables.get('faultString', ''))
-            if match:
-                exception_name = match.group('exception').strip("<class '").strip("'>")
-                exception_message = match.group('exception_message')
-
-                if exception_name:
-                    for exception in self.builtin_exceptions:
-                        if exception.__name__ == exception_name:
-                            raise exception(exception_message)
-
-            # if all else fails just raise the fault
-            raise Fault(**marshallables)
+            raise self.get_exception(self._stack[0])
         return tuple(self._stack)
 
+    @classmethod
+    def get_exception(cls, marshallables):
+        """
+        Gets the exception for a fault. This is the matching built-in exception if there is one.
+
+        :param dict marshallables: A dictionary with the fault code and fault string.
+        :return Exception: The exception instance.
+        """
+        match = cls.error_pattern.match(marshallables.get('faultString', ''))
+        if match:
+            exception_name = match.group('exception').strip("<class '").strip("'>")
+            exception_message = match.group('exception_message')
+
+            if exception_name:
+                exception = cls._get_built_in_exceptions().get(exception_name)
+                if exception:
+                    return exception(exception_message)
+
+        # if all else fails just return the fault
+        return Fault(**marshallables)
+
 
 class RPCTransport(Transport):
+    def __init__(self, *args, **kwargs):
+        """
+        Override so each thread keeps its own connection to the server open between requests.
+        """
+        self._local = threading.local()
+        # the codec used to talk to the server, this is negotiated on the first request
+        self.codec = None
+        Transport.__init__(self, *args, **kwargs)
+
+    @property
+    def _connection(self):
+        """
+        Gets the connection of the current thread.
+
+        :return tuple: The host and its connection.
+        """
+        return getattr(self._local, 'connection', (None, None))
+
+    @_connection.setter
+    def _connection(self, value):
+        """
+        Sets the connection of the current thread.
+
+        :param tuple value: The host and its connection.
+        """
+        self._local.connection = value
+
+    def set_request_headers(self, headers):
+        """
+        Sets additional headers to send with the requests of the current thread.
+
+        :param list[tuple] headers: A list of header names and values.
+        """
+        self._local.request_headers = headers
+
+    def send_headers(self, connection, headers):
+        """
+        Override so the additional headers of the current thread are sent.
+        """
+        Transport.send_headers(self, connection, headers + getattr(self._local, 'request_headers', []))
+
     def getparser(self):
         """
         Override so we can redefine our transport to use its own custom unmarshaller.
@@ -70,6 +180,222 @@ class RPCTransport(Transport):
         parser = ExpatParser(unmarshaller)
         return parser, unmarshaller
 
+    def parse_response(self, response):
+        """
+        Override so json responses are decoded as json.
+
+        :param HTTPResponse response: The response from the server.
+        :return tuple: A tuple with the return value.
+        """
+        start = time.time()
+        try:
+            if not response.getheader('Content-Type', '').startswith('application/json'):
+                return Transport.parse_response(self, response)
+
+            return self.decode_response(
+                response.read(),
+                response.getheader('Content-Type', ''),
+                response.getheader('Content-Encoding', '')
+            )
+        finally:
+            record_telemetry('parse', 'response', start, response_size=int(response.getheader('Content-Length', 0)))
+
+    def decode_response(self, data, content_type, content_encoding=''):
+        """
+        Decodes the body of a response with the codec of its content type.
+
+        :param bytes data: The body of the response.
+        :param str content_type: The content type of the response.
+        :param str content_encoding: The content encoding of the response.
+        :return tuple: A tuple with the return value.
+        """
+        if content_encoding == 'gzip':
+            data = gzip.decompress(data)
+
+        if content_type.startswith('application/json'):
+            data = json.loads(data)
+            if 'fault' in data:
+                raise RPCUnmarshaller.get_exception(data['fault'])
+            return data['result'],
+
+        parser, unmarshaller = self.getparser()
+        parser.feed(data)
+        parser.close()
+        return unmarshaller.close()
+
+    @staticmethod
+    def encode_request(handler, method_name, params, codec):
+        """
+        Encodes a request with the given codec.
+
+        :param str handler: The path that xml requests are sent to.
+        :param str method_name: The name of the method to call.
+        :param tuple params: The method's parameters.
+        :param str codec: The name of the codec.
+        :return tuple(str, bytes): The path to send the request to and the body of the request.
+        """
+        if codec == 'json':
+            request_body = json.dumps(
+                {'method': method_name, 'params': params},
+                separators=(',', ':'),
+                default=default_json_encoding
+            )
+            return JSON_RPC_PATH, request_body.encode('utf-8')
+        return handler, dumps(tuple(params), method_name, allow_none=True).encode('utf-8', 'xmlcharrefreplace')
+
+
+class AsyncRPCTransport(RPCTransport):
+    def __init__(self, *args, **kwargs):
+        """
+        A transport that sends requests with asyncio streams. Each event loop keeps its own pool of connections to
+        the server, so concurrent requests are sent over separate connections.
+        """
+        self._pools = weakref.WeakKeyDictionary()
+        RPCTransport.__init__(self, *args, **kwargs)
+
+    def _get_pool(self):
+        """
+        Gets the connection pool of the running event loop.
+
+        :return tuple(asyncio.Semaphore, list): A semaphore that limits the open connections and the idle connections.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if not pool:
+            pool = self._pools[loop] = (asyncio.Semaphore(MAX_ASYNC_CONNECTIONS), [])
+        return pool
+
+    async def _send_request(self, host, handler, request_body, connection, idle_connections, request_headers=()):
+        """
+        Sends a request over a connection and reads the response. The connection is returned to the idle connections
+        if the server keeps it open.
+
+        :param str host: The host of the server.
+        :param str handler: The path to send the request to.
+        :param bytes request_body: The body of the request.
+        :param tuple(asyncio.StreamReader, asyncio.StreamWriter) connection: The connection to the server.
+        :param list idle_connections: The idle connections of the pool.
+        :param list[tuple] request_headers: Additional header names and values to send.
+        :return tuple: A tuple with the return value.
+        """
+        reader, writer = connection
+        additional_headers = ''.join(f'{key}: {value}\r\n' for key, value in request_headers)
+        writer.write(
+            f'POST {handler} HTTP/1.1\r\n'
+            f'Host: {host}\r\n'
+            f'User-Agent: {self.user_agent}\r\n'
+            f'Content-Type: text/xml\r\n'
+            f'Accept-Encoding: gzip\r\n'
+            f'{additional_headers}'
+            f'Content-Length: {len(request_body)}\r\n\r\n'.encode('latin-1') + request_body
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('The server closed the connection')
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            data = await reader.readexactly(int(headers['content-length']))
+        else:
+            data = await reader.read()
+
+        if version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close':
+            idle_connections.append(connection)
+        else:
+            writer.close()
+
+        if status != '200':
+            raise ProtocolError(host + handler, int(status), reason, headers)
+
+        start = time.time()
+        try:
+            return self.decode_response(data, headers.get('content-type', ''), headers.get('content-encoding', ''))
+        finally:
+            record_telemetry('parse', 'response', start, response_size=len(data))
+
+    async def request_async(self, host, handler, request_body, request_headers=()):
+        """
+        Sends a request to the server. If a kept alive connection was closed by the server, the request is sent again
+        over a new connection.
+
+        :param str host: The host of the server.
+        :param str handler: The path to send the request to.
+        :param bytes request_body: The body of the request.
+        :param list[tuple] request_headers: Additional header names and values to send.
+        :return tuple: A tuple with the return value.
+        """
+        semaphore, idle_connections = self._get_pool()
+        async with semaphore:
+            for attempt in range(2):
+                reused = bool(idle_connections)
+                if reused:
+                    connection = idle_connections.pop()
+                else:
+                    server_ip, _, port = host.rpartition(':')
+                    connection = await asyncio.open_connection(server_ip, int(port))
+
+                try:
+                    return await self._send_request(
+                        host,
+                        handler,
+                        request_body,
+                        connection,
+                        idle_connections,
+                        request_headers
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection[1].close()
+                    if attempt or not reused:
+                        raise
+                except asyncio.CancelledError:
+                    # the response of a cancelled request could still arrive, so the connection can't be reused
+                    connection[1].close()
+                    raise
+
+
+def get_transport(server_ip, port):
+    """
+    Gets the transport for the given server. The transport is shared by all clients of the server, so their
+    connections are kept alive between calls.
+
+    :param str server_ip: The ip address of the server.
+    :param int port: The port of the server.
+    :return RPCTransport: The transport instance.
+    """
+    with TRANSPORTS_LOCK:
+        transport = TRANSPORTS.get((server_ip, port))
+        if not transport:
+            transport = RPCTransport()
+            TRANSPORTS[(server_ip, port)] = transport
+        return transport
+
+
+def get_async_transport(server_ip, port):
+    """
+    Gets the asynchronous transport for the given server. The transport is shared by all clients of the server, so
+    their connections are kept alive between calls.
+
+    :param str server_ip: The ip address of the server.
+    :param int port: The port of the server.
+    :return AsyncRPCTransport: The transport instance.
+    """
+    with TRANSPORTS_LOCK:
+        transport = ASYNC_TRANSPORTS.get((server_ip, port))
+        if not transport:
+            transport = AsyncRPCTransport()
+            ASYNC_TRANSPORTS[(server_ip, port)] = transport
+        return transport
+
 
 class RPCServerProxy(ServerProxy):
     auth_key = None
@@ -78,9 +404,156 @@ class RPCServerProxy(ServerProxy):
         """
         Override so we can redefine the ServerProxy to use our custom transport.
         """
-        kwargs['transport'] = RPCTransport()
+        kwargs.setdefault('transport', RPCTransport())
         ServerProxy.__init__(self, *args, **kwargs)
 
+    def _get_codec(self):
+        """
+        Gets the codec to talk to the server with. Json is used if it is preferred and the server supports it,
+        otherwise it falls back to xml.
+
+        :return str: The name of the codec.
+        """
+        if os.environ.get('RPC_CODEC', 'json') != 'json':
+            return 'xml'
+
+        try:
+            codecs = ServerProxy._ServerProxy__request(self, 'get_codecs', ())
+        except OSError:
+            raise
+        except Exception:
+            # older servers don't know how to respond with their codecs
+            codecs = []
+
+        return 'json' if 'json' in codecs else 'xml'
+
+    def _ServerProxy__request(self, method_name, params):
+        """
+        Override so requests are sent with the codec that was negotiated with the server.
+        """
+        transport = self._ServerProxy__transport
+        if transport.codec is None:
+            transport.codec = self._get_codec()
+
+        start = time.time()
+        handler, request_body = transport.encode_request(
+            self._ServerProxy__handler,
+            method_name,
+            params,
+            transport.codec
+        )
+        request_start = time.time()
+        record_telemetry('marshal', method_name, start, request_start, request_size=len(request_body))
+        with track_request(self._ServerProxy__host) as request_id:
+            transport.set_request_headers(get_request_headers(request_id))
+            try:
+                response = transport.request(
+                    self._ServerProxy__host,
+                    handler,
+                    request_body,
+                    verbose=self._ServerProxy__verbose
+                )
+            finally:
+                transport.set_request_headers([])
+                record_telemetry('request', method_name, request_start)
+
+        if len(response) == 1:
+            return response[0]
+        return response
+
+
+class AsyncRPCServerProxy:
+    def __init__(self, uri, transport=None):
+        """
+        A server proxy whose methods return awaitables instead of blocking until the server responds.
+
+        :param str uri: The uri of the server.
+        :param AsyncRPCTransport transport: The transport to send requests with.
+        """
+        uri = urllib.parse.urlsplit(uri)
+        self.host = uri.netloc
+        self.handler = uri.path or '/RPC2'
+        self.transport = transport or AsyncRPCTransport()
+
+    def __getattr__(self, name):
+        """
+        Gets a method of the server. Calling it returns an awaitable of its return value.
+        """
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _Method(self.request, name)
+
+    async def _request(self, method_name, params, codec):
+        """
+        Sends a request encoded with the given codec.
+
+        :param str method_name: The name of the method to call.
+        :param tuple params: The method's parameters.
+        :param str codec: The name of the codec.
+        :return Any: The return value.
+        """
+        start = time.time()
+        handler, request_body = self.transport.encode_request(self.handler, method_name, params, codec)
+        request_start = time.time()
+        record_telemetry('marshal', method_name, start, request_start, request_size=len(request_body))
+        with track_request(self.host) as request_id:
+            try:
+                return (await self.transport.request_async(
+                    self.host,
+                    handler,
+                    request_body,
+                    get_request_headers(request_id)
+                ))[0]
+            except asyncio.CancelledError:
+                # the server would still run the call, so cancel it there too
+                asyncio.ensure_future(self._cancel(request_id, codec))
+                raise
+            finally:
+                record_telemetry('request', method_name, request_start)
+
+    async def _cancel(self, request_id, codec):
+        """
+        Cancels a request on the server, ignoring any errors since nothing is waiting on it.
+
+        :param str request_id: The id of the request.
+        :param str codec: The name of the codec.
+        """
+        try:
+            await self._request('cancel', (request_id,), codec)
+        except Exception as error:
+            logger.debug(f'Failed to cancel the request "{request_id}": {error}')
+
+    async def _get_codec(self):
+        """
+        Gets the codec to talk to the server with, the same way as the synchronous proxy.
+
+        :return str: The name of the codec.
+        """
+        if os.environ.get('RPC_CODEC', 'json') != 'json':
+            return 'xml'
+
+        try:
+            codecs = await self._request('get_codecs', (), 'xml')
+        except OSError:
+            raise
+        except Exception:
+            # older servers don't know how to respond with their codecs
+            codecs = []
+
+        return 'json' if 'json' in codecs else 'xml'
+
+    async def request(self, method_name, params):
+        """
+        Sends a request with the codec that was negotiated with the server.
+
+        :param str method_name: The name of the method to call.
+        :param tuple params: The method's parameters.
+        :return Any: The return value.
+        """
+        if self.transport.codec is None:
+            self.transport.codec = await self._get_codec()
+        return await self._request(method_name, params, self.transport.codec)
+
 
 class RPCClient:
     def __init__(self, port, marshall_exceptions=True):
@@ -95,6 +568,81 @@ class RPCClient:
         self.proxy = RPCServerProxy(
             f"http://{server_ip}:{port}",
             allow_none=True,
+            transport=get_transport(server_ip, port)
         )
         self.marshall_exceptions = marshall_exceptions
+        self.server_ip = server_ip
         self.port = port
+
+    def cancel_pending_requests(self):
+        """
+        Cancels the calls that this process is waiting on from the server, so the server doesn't run them if they
+        are still queued.
+
+        :return list[str]: The ids of the requests that were cancelled.
+        """
+        with PENDING_REQUESTS_LOCK:
+            request_ids = list(PENDING_REQUESTS.get(f'{self.server_ip}:{self.port}', []))
+
+        if request_ids:
+            self.proxy.cancel(request_ids)
+        return request_ids
+
+    @staticmethod
+    def get_file_digest(file_path):
+        """
+        Gets the sha256 digest of a file's content. The file is read in chunks, and the digest is cached till the
+        file is modified.
+
+        :param str file_path: The path to the file.
+        :return str: The hex digest.
+        """
+        stat = os.stat(file_path)
+        cached_digest = FILE_DIGESTS.get(file_path)
+        if cached_digest and cached_digest[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached_digest[2]
+
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                file_hash.update(chunk)
+        FILE_DIGESTS[file_path] = (stat.st_mtime_ns, stat.st_size, file_hash.hexdigest())
+        return file_hash.hexdigest()
+
+    def upload_file(self, file_path):
+        """
+        Uploads a file to the server, so it can be used when the server is on another file system. The file is
+        streamed from disk in chunks. An interrupted upload resumes where it stopped, and nothing is uploaded if the
+        server already has a file with the same content.
+
+        :param str file_path: The path to the file.
+        :return str: The path of the uploaded file on the server.
+        """
+        chunk_size = int(os.environ.get('RPC_UPLOAD_CHUNK_SIZE', 1024 * 1024))
+        file_name = os.path.basename(file_path)
+        digest = self.get_file_digest(file_path)
+        upload = self.proxy.start_upload(file_name, digest, os.path.getsize(file_path))
+        if upload['done']:
+            return upload['path']
+
+        offset = upload['offset']
+        with open(file_path, 'rb') as file:
+            file.seek(offset)
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                offset = self.proxy.upload_chunk(file_name, digest, offset, base64.b64encode(chunk).decode('ascii'))
+        return self.proxy.finish_upload(file_name, digest)
+
+
+class AsyncRPCClient(RPCClient):
+    def __init__(self, port, marshall_exceptions=True):
+        """
+        Initializes the rpc client with an additional proxy whose calls can be awaited.
+
+        :param int port: A port number the client should connect to.
+        :param bool marshall_exceptions: Whether the exceptions should be marshalled.
+        """
+        super(AsyncRPCClient, self).__init__(port, marshall_exceptions)
+        self.async_proxy = AsyncRPCServerProxy(
+            f"http://{self.server_ip}:{self.port}",
+            transport=get_async_transport(self.server_ip, self.port)
+        )
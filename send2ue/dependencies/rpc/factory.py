@@ -1,14 +1,25 @@
 import os
 import re
 import sys
+import queue
+import atexit
+import json
+import time
+import hashlib
 import logging
+import ast
 import types
 import inspect
+import asyncio
+import functools
 import textwrap
 import unittest
+import threading
+from concurrent import futures
 from xmlrpc.client import Fault
 
-from .client import RPCClient
+from .client import RPCClient, AsyncRPCClient, RPCUnmarshaller
+from .base_server import record_telemetry, get_telemetry_events, get_hashed_callable_name
 from .validations import (
     validate_key_word_parameters,
     validate_class_method,
@@ -20,79 +31,170 @@ from .validations import (
 
 logger = logging.getLogger(__package__)
 
+# the hashed names of the callables that have been registered with each server, keyed by the server address
+REGISTERED_CALLABLES = {}
+# the batches that are collecting calls on each thread
+BATCHES = threading.local()
+# the hashes of the large arguments that have been stored on each server, keyed by the server address
+STORED_ARGUMENTS = {}
+# the key of the dictionaries that replace large arguments with their hash
+STORED_ARGUMENT_KEY = '__rpc_stored_argument__'
+# the key of the dictionaries that are returned in place of the results of generators
+STREAM_KEY = '__rpc_stream__'
 
-class RPCFactory:
-    def __init__(self, rpc_client, remap_pairs=None, default_imports=None):
-        self.rpc_client = rpc_client
-        self.file_path = None
-        self.remap_pairs = remap_pairs
-        self.default_imports = default_imports or []
 
-    @staticmethod
-    def _get_docstring(code, function_name):
+class ExecutionHistoryWriter(threading.Thread):
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        A background thread that writes the execution history, so the calls don't wait on the file.
         """
-        Gets the docstring value from the functions code.
+        super(ExecutionHistoryWriter, self).__init__(name='RPCExecutionHistoryWriter', daemon=True)
+        # the queue is bounded so the history can't use up memory if the file can't be written fast enough
+        self.queue = queue.Queue(maxsize=1000)
+        # the hashes of the function code that has been written to each file, by function name
+        self.written_code = {}
 
-        :param list code: A list of code lines.
-        :param str function_name: The name of the function.
-        :returns: The docstring text.
-        :rtype: str
+    @classmethod
+    def get(cls):
         """
-        # run the function code
-        exec('\n'.join(code))
-        # get the function from the locals
-        function_instance = locals().copy().get(function_name)
-        # get the doc strings from the function
-        return function_instance.__doc__
+        Gets the running history writer, starting it if it is not running yet.
 
-    @staticmethod
-    def _save_execution_history(code, function, args):
+        :return ExecutionHistoryWriter: The history writer.
+        """
+        with cls.instance_lock:
+            if not cls.instance:
+                cls.instance = cls()
+                cls.instance.start()
+                # write out what is left in the queue before the process exits
+                atexit.register(cls.instance.flush)
+            return cls.instance
+
+    def add(self, file_path, function_name, code, code_hash, call):
         """
-        Saves out the executed code to a file.
+        Adds a call to be written to the history. This only blocks if the queue is full.
 
+        :param str file_path: The file path of the history file.
+        :param str function_name: The name of the function.
         :param list code: A list of code lines.
-        :param callable function: A function.
-        :param list args: A list of function arguments.
+        :param str code_hash: The hash of the code.
+        :param str call: The call of the function with its arg values.
         """
-        history_file_path = os.environ.get('RPC_EXECUTION_HISTORY_FILE')
+        self.queue.put((file_path, function_name, code, code_hash, call))
 
-        if history_file_path and os.path.exists(os.path.dirname(history_file_path)):
+    def flush(self):
+        """
+        Waits till all the queued calls have been written to the history.
+        """
+        self.queue.join()
+
+    def write(self, entries):
+        """
+        Writes calls to their history files.
+
+        :param list[tuple] entries: The file path, function name, code, code hash and call of each call.
+        """
+        entries_by_file = {}
+        for file_path, *entry in entries:
+            entries_by_file.setdefault(file_path, []).append(entry)
+
+        for file_path, file_entries in entries_by_file.items():
             file_size = 0
-            if os.path.exists(history_file_path):
-                file_size = os.path.getsize(history_file_path)
+            if os.path.exists(file_path):
+                file_size = os.path.getsize(file_path)
+
+            with open(file_path, 'a') as history_file:
+                written_code = self.written_code.setdefault(file_path, {})
 
-            with open(history_file_path, 'a') as history_file:
                 # add the import for SourceFileLoader if the file is empty
                 if file_size == 0:
+                    written_code.clear()
                     history_file.write('from importlib.machinery import SourceFileLoader\n')
 
-                # space out the functions
-                history_file.write(f'\n\n')
+                for function_name, code, code_hash, call in file_entries:
+                    # only write the function code if it hasn't been written yet or it has changed
+                    if written_code.get(function_name) != code_hash:
+                        # space out the functions
+                        history_file.write(f'\n\n')
+                        for line in code:
+                            history_file.write(f'{line}\n')
+                        written_code[function_name] = code_hash
 
-                for line in code:
-                    history_file.write(f'{line}\n')
+                    history_file.write(f'{call}\n')
 
-                # convert the args to strings
-                formatted_args = []
-                for arg in args:
-                    if isinstance(arg, str):
-                        formatted_args.append(f'r"{arg}"')
-                    else:
-                        formatted_args.append(str(arg))
+    def run(self):
+        """
+        Writes the queued calls to the history, writing all the calls that are waiting at once.
+        """
+        while True:
+            entries = [self.queue.get()]
+            while True:
+                try:
+                    entries.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.write(entries)
+            except Exception as error:
+                logger.error(f'Failed to write the rpc execution history: {error}')
+            finally:
+                for _ in entries:
+                    self.queue.task_done()
+
+
+class RPCFactory:
+    def __init__(self, rpc_client, remap_pairs=None, default_imports=None):
+        self.rpc_client = rpc_client
+        self.file_path = None
+        self.remap_pairs = remap_pairs
+        self.default_imports = default_imports or []
+
+    @staticmethod
+    def _save_execution_history(code, function, args, code_hash=None):
+        """
+        Saves out the executed code to a file. The code of each function is only written the first time it is
+        called, after that only its calls are written. The file is written by a background thread.
+
+        :param list code: A list of code lines.
+        :param callable function: A function.
+        :param list args: A list of function arguments.
+        :param str code_hash: The hash of the code.
+        """
+        history_file_path = os.environ.get('RPC_EXECUTION_HISTORY_FILE')
 
-                # write the call with the arg values
-                params = ", ".join(formatted_args) if formatted_args else ''
-                history_file.write(f'{function.__name__}({params})\n')
+        if history_file_path and os.path.exists(os.path.dirname(history_file_path)):
+            # convert the args to strings now, in case they are changed after the call
+            formatted_args = []
+            for arg in args:
+                if isinstance(arg, str):
+                    formatted_args.append(f'r"{arg}"')
+                else:
+                    formatted_args.append(str(arg))
+
+            # the call with the arg values
+            params = ", ".join(formatted_args) if formatted_args else ''
+            call = f'{function.__name__}({params})'
+
+            ExecutionHistoryWriter.get().add(
+                history_file_path,
+                function.__name__,
+                code,
+                code_hash or RPCFactory._get_code_hash(code),
+                call
+            )
 
     def _get_callstack_references(self, code, function):
         """
         Gets all references for the given code.
 
-        :param list[str] code: The code of the callable.
+        :param list[str] code: The body code of the callable.
         :param callable function: A callable.
-        :return str: The new code of the callable with all its references added.
+        :return list[str]: The import code needed for all the references in the callable.
         """
-        import_code = self.default_imports
+        import_code = list(self.default_imports)
 
         client_module = inspect.getmodule(function)
         self.file_path = get_source_file_path(function)
@@ -108,66 +210,234 @@ class RPCFactory:
                 )
                 break
 
-        for key in dir(client_module):
-            for line_number, line in enumerate(code):
-                if line.startswith('def '):
-                    continue
+        if os.path.basename(self.file_path) == '__init__.py':
+            base_name = os.path.basename(os.path.dirname(self.file_path))
+        else:
+            base_name = os.path.basename(self.file_path)
+        module_name, file_extension = os.path.splitext(base_name)
 
-                if key in re.split('\.|\(| ', line.strip()):
-                    if os.path.basename(self.file_path) == '__init__.py':
-                        base_name = os.path.basename(os.path.dirname(self.file_path))
-                    else:
-                        base_name = os.path.basename(self.file_path)
+        # split each line into its names once, rather than once per name in the module
+        names = set()
+        for line in code:
+            names.update(re.split(r'\.|\(| ', line.strip()))
 
-                    module_name, file_extension = os.path.splitext(base_name)
-
-                    # add the source file to the import code
-                    source_import_code = f'{module_name} = SourceFileLoader("{module_name}", r"{server_module_path}").load_module()'
-                    if source_import_code not in import_code:
-                        import_code.append(source_import_code)
+        for key in dir(client_module):
+            if key in names:
+                # add the source file to the import code
+                source_import_code = f'{module_name} = SourceFileLoader("{module_name}", r"{server_module_path}").load_module()'
+                if source_import_code not in import_code:
+                    import_code.append(source_import_code)
 
-                    # relatively import the module from the source file
-                    relative_import_code = f'from {module_name} import {key}'
-                    if relative_import_code not in import_code:
-                        import_code.append(relative_import_code)
+                # relatively import the module from the source file
+                relative_import_code = f'from {module_name} import {key}'
+                if relative_import_code not in import_code:
+                    import_code.append(relative_import_code)
 
-                    break
-
-        return textwrap.indent('\n'.join(import_code), ' ' * 4)
+        return import_code
 
     def _get_code(self, function):
         """
-        Gets the code from a callable.
+        Gets the code from a callable. The decorators and docstring are removed and the imports the callable
+        references are added to the top of its body.
 
         :param callable function: A callable.
-        :return str: The code of the callable.
+        :return list[str]: The code of the callable.
         """
         code = textwrap.dedent(inspect.getsource(function)).split('\n')
         code = [line for line in code if not line.startswith(('@', '#'))]
 
-        # get the docstring from the code
-        doc_string = self._get_docstring(code, function.__name__)
+        # find where the body starts, and if it has a docstring where the docstring ends
+        function_node = ast.parse('\n'.join(code)).body[0]
+        body_start = function_node.body[0].lineno - 1
+        body_end = body_start
+        first_node = function_node.body[0]
+        if body_start > 0 and isinstance(first_node, ast.Expr) and isinstance(first_node.value, ast.Constant):
+            if isinstance(first_node.value.value, str):
+                body_end = first_node.end_lineno
+
+        signature = code[:body_start]
+        body = code[body_end:]
+        indent = re.match(r'\s*', code[body_start]).group()
+
+        # get import code and insert them at the top of the function body
+        import_code = self._get_callstack_references(body, function)
+        return signature + [textwrap.indent('\n'.join(import_code), indent)] + body
+
+    def _get_registered_callables(self):
+        """
+        Gets the callables that this client has registered with its server.
+
+        :return set: A set of the hashed names of the callables.
+        """
+        return REGISTERED_CALLABLES.setdefault((self.rpc_client.server_ip, self.rpc_client.port), set())
+
+    @staticmethod
+    def _get_code_hash(code):
+        """
+        Gets the hash of the given code.
 
-        # get import code and insert them inside the function
-        import_code = self._get_callstack_references(code, function)
-        code.insert(1, import_code)
+        :param list code: A list of code lines.
+        :return str: The hex digest of the code.
+        """
+        return hashlib.sha256('\n'.join(code).encode('utf-8')).hexdigest()
 
-        # remove the doc string
-        if doc_string:
-            code = '\n'.join(code).replace(doc_string, '')
-            code = [line for line in code.split('\n') if not all([char == '"' or char == "'" for char in line.strip()])]
+    @staticmethod
+    def _is_unregistered_error(exception, function, code_hash):
+        """
+        Checks if the given exception was raised because the function is not registered with the server under the
+        hash of its code. This happens when the server has been restarted since the function was registered.
 
-        return code
+        :param Exception exception: The exception raised by the remote call.
+        :param callable function: A callable.
+        :param str code_hash: The hash of the code.
+        :return bool: Whether the function is not registered with the server.
+        """
+        message = f'method "{get_hashed_callable_name(function.__name__, code_hash)}" is not supported'
+        if isinstance(exception, Fault):
+            return message in exception.faultString
+        return message in str(exception)
 
-    def _register(self, function):
+    def get_code(self, function):
         """
-        Registers a given callable with the server.
+        Gets the code of a callable and its hash.
 
-        :param  callable function: A callable.
-        :return: The code of the function.
-        :rtype: list
+        :param callable function: A callable.
+        :return tuple(list, str): The code of the callable and its hash.
         """
+        start = time.time()
+        validate_file_is_saved(function)
         code = self._get_code(function)
+        # thread safe functions are registered differently, so they must not share a hash with the same code
+        code_hash = self._get_code_hash(code + ['# thread safe'] if is_thread_safe(function) else code)
+        record_telemetry('codegen', function.__name__, start)
+        return code, code_hash
+
+    @staticmethod
+    def _is_missing_argument_error(exception):
+        """
+        Checks if the given exception was raised because an argument was sent by its hash, but the server no longer
+        has it stored. This happens when the server has been restarted or the argument was evicted.
+
+        :param Exception exception: The exception raised by the remote call.
+        :return bool: Whether an argument is missing from the server's argument store.
+        """
+        message = 'is not in the argument store'
+        if isinstance(exception, Fault):
+            return message in exception.faultString
+        return message in str(exception)
+
+    def _get_stored_arguments(self):
+        """
+        Gets the hashes of the large arguments that this client has stored on its server.
+
+        :return set: A set of argument hashes.
+        """
+        return STORED_ARGUMENTS.setdefault((self.rpc_client.server_ip, self.rpc_client.port), set())
+
+    def _get_stored_argument_references(self, args, force=False):
+        """
+        Replaces large arguments with a reference to their hash. The first time an argument is sent, the value is sent
+        along with its hash so the server can store it. After that, only the hash is sent.
+
+        :param tuple(Any) args: The function's arguments.
+        :param bool force: Whether to send the values of the large arguments even if they were already stored.
+        :return list: The arguments to send to the server.
+        """
+        threshold = int(os.environ.get('RPC_ARGUMENT_STORE_THRESHOLD', 4096))
+        stored_arguments = self._get_stored_arguments()
+
+        references = []
+        for arg in args:
+            if isinstance(arg, (dict, list)):
+                try:
+                    data = json.dumps(arg, sort_keys=True, separators=(',', ':'))
+                except TypeError:
+                    # arguments that json can't serialize are always sent by value
+                    data = ''
+                if len(data) >= threshold:
+                    digest = hashlib.sha256(data.encode('utf-8')).hexdigest()
+                    if force or digest not in stored_arguments:
+                        stored_arguments.add(digest)
+                        arg = {STORED_ARGUMENT_KEY: digest, 'value': arg}
+                    else:
+                        arg = {STORED_ARGUMENT_KEY: digest}
+            references.append(arg)
+        return references
+
+    def _iterate_stream(self, chunk):
+        """
+        Iterates over the items of a stream, requesting the next chunk from the server once the items of the
+        current chunk are used up. The stream is closed on the server if the iteration stops before it is done.
+
+        :param dict chunk: The first chunk of the stream.
+        :return Generator: The items of the stream.
+        """
+        proxy = self.rpc_client.proxy
+        try:
+            while True:
+                yield from chunk['items']
+                if chunk['done']:
+                    return
+                chunk = proxy.next_chunk(chunk[STREAM_KEY])
+        finally:
+            if not chunk['done']:
+                try:
+                    proxy.close_stream(chunk[STREAM_KEY])
+                except OSError:
+                    pass
+
+    async def _iterate_stream_async(self, chunk):
+        """
+        Iterates over the items of a stream without blocking the event loop.
+
+        :param dict chunk: The first chunk of the stream.
+        :return AsyncGenerator: The items of the stream.
+        """
+        proxy = self.rpc_client.async_proxy
+        try:
+            while True:
+                for item in chunk['items']:
+                    yield item
+                if chunk['done']:
+                    return
+                chunk = await proxy.next_chunk(chunk[STREAM_KEY])
+        finally:
+            if not chunk['done']:
+                try:
+                    await proxy.close_stream(chunk[STREAM_KEY])
+                except OSError:
+                    pass
+
+    def _get_result(self, result, is_async=False):
+        """
+        Gets the return value of a remote function. If the remote function is a generator, its results are streamed
+        from the server and this is an iterator over them.
+
+        :param Any result: The result from the server.
+        :param bool is_async: Whether the stream should be iterated with `async for`.
+        :return Any: The return value.
+        """
+        if isinstance(result, dict) and STREAM_KEY in result:
+            if is_async:
+                return self._iterate_stream_async(result)
+            return self._iterate_stream(result)
+        return result
+
+    def _register(self, function, code, code_hash):
+        """
+        Registers a given callable with the server, unless the server already has the same code registered. The
+        server registers it under its name with the hash of its code, so another client that registers different
+        code with the same name doesn't replace it.
+
+        :param callable function: A callable.
+        :param list code: A list of code lines.
+        :param str code_hash: The hash of the code.
+        """
+        registered_callables = self._get_registered_callables()
+        hashed_name = get_hashed_callable_name(function.__name__, code_hash)
+        if hashed_name in registered_callables:
+            return
+
         try:
             # if additional paths are explicitly set, then use them. This is useful with the client is on another
             # machine and the python paths are different
@@ -178,9 +448,14 @@ class RPCFactory:
                 additional_paths = sys.path
 
             response = self.rpc_client.proxy.add_new_callable(
-                function.__name__, '\n'.join(code),
-                additional_paths
+                function.__name__,
+                '\n'.join(code),
+                additional_paths,
+                None,
+                code_hash,
+                is_thread_safe(function)
             )
+            registered_callables.add(hashed_name)
             if os.environ.get('RPC_DEBUG'):
                 logger.debug(response)
 
@@ -188,42 +463,328 @@ class RPCFactory:
             server_name = os.environ.get(f'RPC_SERVER_{self.rpc_client.port}', self.rpc_client.port)
             raise ConnectionRefusedError(f'No connection could be made with "{server_name}"')
 
-        return code
+    def _call_remote_function(self, function, code, code_hash, args):
+        """
+        Calls the registered function on the server. If the server no longer has the function registered or is missing
+        one of its stored arguments, it is registered again and the call is retried with the values of its arguments.
 
-    def run_function_remotely(self, function, args):
+        :param callable function: A function reference.
+        :param list code: A list of code lines.
+        :param str code_hash: The hash of the code.
+        :param tuple(Any) args: The function's arguments.
+        :return Any: The return value of the remote function.
+        """
+        remote_function = getattr(self.rpc_client.proxy, get_hashed_callable_name(function.__name__, code_hash))
+        try:
+            result = remote_function(*self._get_stored_argument_references(args))
+        except Exception as exception:
+            if self._is_unregistered_error(exception, function, code_hash):
+                self._get_registered_callables().discard(get_hashed_callable_name(function.__name__, code_hash))
+                self._register(function, code, code_hash)
+            elif not self._is_missing_argument_error(exception):
+                raise
+
+            result = remote_function(*self._get_stored_argument_references(args, force=True))
+        return self._get_result(result)
+
+    async def _register_async(self, function, code, code_hash):
+        """
+        Registers a given callable with the server without blocking the event loop.
+
+        :param callable function: A callable.
+        :param list code: A list of code lines.
+        :param str code_hash: The hash of the code.
+        """
+        if get_hashed_callable_name(function.__name__, code_hash) not in self._get_registered_callables():
+            await asyncio.get_running_loop().run_in_executor(None, self._register, function, code, code_hash)
+
+    async def _call_remote_function_async(self, function, code, code_hash, args):
+        """
+        Calls the registered function on the server without blocking the event loop. It is retried the same way as
+        a synchronous call.
+
+        :param callable function: A function reference.
+        :param list code: A list of code lines.
+        :param str code_hash: The hash of the code.
+        :param tuple(Any) args: The function's arguments.
+        :return Any: The return value of the remote function.
+        """
+        remote_function = getattr(
+            self.rpc_client.async_proxy,
+            get_hashed_callable_name(function.__name__, code_hash)
+        )
+        try:
+            result = await remote_function(*self._get_stored_argument_references(args))
+        except Exception as exception:
+            if self._is_unregistered_error(exception, function, code_hash):
+                self._get_registered_callables().discard(get_hashed_callable_name(function.__name__, code_hash))
+                await self._register_async(function, code, code_hash)
+            elif not self._is_missing_argument_error(exception):
+                raise
+
+            result = await remote_function(*self._get_stored_argument_references(args, force=True))
+        return self._get_result(result, is_async=True)
+
+    @staticmethod
+    def _get_marshalled_exception(exception, function):
+        """
+        Gets the exception to raise in the client for an exception that was raised by a remote function.
+
+        :param Exception exception: The exception raised by the remote call.
+        :param callable function: A function reference.
+        :return Exception: The exception with a line link to the function.
+        """
+        if isinstance(exception, Fault):
+            return Fault(exception.faultCode, exception.faultString)
+        return exception.__class__(str(exception) + get_line_link(function))
+
+    def run_function_remotely(self, function, args, code=None, code_hash=None):
         """
         Handles running the given function on remotely.
 
         :param callable function: A function reference.
         :param tuple(Any) args: The function's arguments.
+        :param list code: The code of the function. If not given, it will be generated from the function.
+        :param str code_hash: The hash of the code.
         :return callable: A remote callable.
         """
         validate_arguments(function, args)
 
-        # get the remote function instance
-        code = self._register(function)
-        remote_function = getattr(self.rpc_client.proxy, function.__name__)
-        self._save_execution_history(code, function, args)
-
-        current_frame = inspect.currentframe()
-        outer_frame_info = inspect.getouterframes(current_frame)
-        # step back 2 frames in the callstack
-        caller_frame = outer_frame_info[2][0]
-        # create a trace back that is relevant to the remote code rather than the code transporting it
-        call_traceback = types.TracebackType(None, caller_frame, caller_frame.f_lasti, caller_frame.f_lineno)
-        # call the remote function
-        if not self.rpc_client.marshall_exceptions:
-            # if exceptions are not marshalled then receive the default Fault
-            return remote_function(*args)
-
-        # otherwise catch them and add a line link to them
+        if code is None:
+            code, code_hash = self.get_code(function)
+
+        start = time.time()
         try:
-            return remote_function(*args)
-        except Exception as exception:
-            stack_trace = str(exception) + get_line_link(function)
-            if isinstance(exception, Fault):
-                raise Fault(exception.faultCode, exception.faultString)
-            raise exception.__class__(stack_trace).with_traceback(call_traceback)
+            # register the function if the server does not have it yet
+            self._register(function, code, code_hash)
+            self._save_execution_history(code, function, args, code_hash)
+
+            # step back 2 frames in the callstack
+            caller_frame = inspect.currentframe().f_back.f_back
+            # create a trace back that is relevant to the remote code rather than the code transporting it
+            call_traceback = types.TracebackType(None, caller_frame, caller_frame.f_lasti, caller_frame.f_lineno)
+            # call the remote function
+            if not self.rpc_client.marshall_exceptions:
+                # if exceptions are not marshalled then receive the default Fault
+                return self._call_remote_function(function, code, code_hash, args)
+
+            # otherwise catch them and add a line link to them
+            try:
+                return self._call_remote_function(function, code, code_hash, args)
+            except Exception as exception:
+                marshalled_exception = self._get_marshalled_exception(exception, function)
+                if isinstance(marshalled_exception, Fault):
+                    raise marshalled_exception
+                raise marshalled_exception.with_traceback(call_traceback)
+        finally:
+            record_telemetry('call', function.__name__, start, port=self.rpc_client.port)
+
+    async def run_function_remotely_async(self, function, args, code=None, code_hash=None):
+        """
+        Handles running the given function remotely without blocking the event loop. The client must be an
+        AsyncRPCClient.
+
+        :param callable function: A function reference.
+        :param tuple(Any) args: The function's arguments.
+        :param list code: The code of the function. If not given, it will be generated from the function.
+        :param str code_hash: The hash of the code.
+        :return Any: The return value of the remote function.
+        """
+        validate_arguments(function, args)
+
+        if code is None:
+            code, code_hash = self.get_code(function)
+
+        start = time.time()
+        try:
+            # register the function if the server does not have it yet
+            await self._register_async(function, code, code_hash)
+            self._save_execution_history(code, function, args, code_hash)
+
+            if not self.rpc_client.marshall_exceptions:
+                return await self._call_remote_function_async(function, code, code_hash, args)
+
+            try:
+                return await self._call_remote_function_async(function, code, code_hash, args)
+            except Exception as exception:
+                raise self._get_marshalled_exception(exception, function)
+        finally:
+            record_telemetry('call', function.__name__, start, port=self.rpc_client.port)
+
+
+class RPCBatch:
+    """
+    Collects the remote calls made inside a with statement and sends them to the server in a single round trip
+    when the with statement exits. Each call returns a future that holds its result once the batch is sent.
+    """
+    def __init__(self, port):
+        """
+        Initializes the batch.
+
+        :param int port: The port of the server that the calls are sent to.
+        """
+        self.port = port
+        self.calls = []
+        self.futures = []
+
+    def __enter__(self):
+        get_batches().append(self)
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        get_batches().remove(self)
+
+        # don't send the calls if the with statement failed
+        if exception_type:
+            for future in self.futures:
+                future.cancel()
+            return False
+
+        self.send()
+
+        # raise the first error like the calls would have if they were run one by one
+        for future in self.futures:
+            error = future.exception()
+            if error:
+                raise error
+
+    def add(self, rpc_factory, function, args, code, code_hash):
+        """
+        Adds a call to the batch. The function is registered with the server right away if it needs to be.
+
+        :param RPCFactory rpc_factory: The factory of the call.
+        :param callable function: A function reference.
+        :param tuple(Any) args: The function's arguments.
+        :param list code: The code of the function.
+        :param str code_hash: The hash of the code.
+        :return Future: A future that will hold the result of the call.
+        """
+        validate_arguments(function, args)
+        rpc_factory._register(function, code, code_hash)
+        future = futures.Future()
+        self.calls.append((rpc_factory, function, args, code, code_hash, future))
+        self.futures.append(future)
+        return future
+
+    def send(self):
+        """
+        Sends all the calls to the server as a single multicall and sets the results on their futures. If the server
+        was restarted and no longer has some of the functions registered or arguments stored, those calls are
+        registered again and retried with the values of their arguments. If the round trip fails, its error is set on
+        the futures that are left and raised.
+        """
+        calls = self.calls
+        self.calls = []
+        try:
+            for attempt in range(2):
+                if not calls:
+                    break
+
+                rpc_client = calls[0][0].rpc_client
+                results = rpc_client.proxy.system.multicall([
+                    {
+                        'methodName': get_hashed_callable_name(function.__name__, code_hash),
+                        'params': rpc_factory._get_stored_argument_references(args, force=bool(attempt))
+                    } for rpc_factory, function, args, code, code_hash, future in calls
+                ])
+                retry_calls = []
+                for call, result in zip(calls, results):
+                    rpc_factory, function, args, code, code_hash, future = call
+                    if not isinstance(result, dict):
+                        future.set_result(rpc_factory._get_result(result[0]))
+                        continue
+
+                    exception = RPCUnmarshaller.get_exception(result)
+                    if not attempt and rpc_factory._is_unregistered_error(exception, function, code_hash):
+                        hashed_name = get_hashed_callable_name(function.__name__, code_hash)
+                        rpc_factory._get_registered_callables().discard(hashed_name)
+                        retry_calls.append(call)
+                        continue
+
+                    if not attempt and rpc_factory._is_missing_argument_error(exception):
+                        retry_calls.append(call)
+                        continue
+
+                    if rpc_factory.rpc_client.marshall_exceptions:
+                        exception = rpc_factory._get_marshalled_exception(exception, function)
+                    future.set_exception(exception)
+
+                for rpc_factory, function, args, code, code_hash, future in retry_calls:
+                    rpc_factory._register(function, code, code_hash)
+                calls = retry_calls
+        except Exception as error:
+            # the round trip failed, so resolve the calls that are left with its error instead of leaving them waiting
+            for rpc_factory, function, args, code, code_hash, future in calls:
+                if not future.done():
+                    future.set_exception(error)
+            raise
+
+
+def export_telemetry(file_path, ports=None, clear=False):
+    """
+    Exports the telemetry that was recorded by this process and the servers on the given ports to a chrome trace
+    file, so the rpc calls of both processes can be viewed on one timeline in chrome://tracing or Perfetto.
+    Telemetry is recorded when the RPC_TELEMETRY environment variable is set.
+
+    :param str file_path: The file path of the trace file.
+    :param list[int] ports: The ports of the servers to get the telemetry from.
+    :param bool clear: Whether to clear the telemetry once it has been exported.
+    """
+    events = get_telemetry_events('rpc client', clear)
+    for port in ports or []:
+        events.extend(RPCClient(port).proxy.get_telemetry(clear))
+
+    with open(file_path, 'w') as trace_file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+
+def get_batches():
+    """
+    Gets the batches that are collecting calls on the current thread.
+
+    :return list[RPCBatch]: A list of batches, with the innermost batch last.
+    """
+    if not hasattr(BATCHES, 'stack'):
+        BATCHES.stack = []
+    return BATCHES.stack
+
+
+def get_batch(port):
+    """
+    Gets the innermost batch that is collecting calls for the given port on the current thread.
+
+    :param int port: The port of the server.
+    :return RPCBatch: The batch instance if there is one.
+    """
+    for batch in reversed(get_batches()):
+        if batch.port == port:
+            return batch
+
+
+def thread_safe(function):
+    """
+    A decorator that marks a remote function as safe to run off the main thread. Use it for read-only queries that
+    don't touch the editor's state. When the server is running in a thread, these calls are run right away on the
+    thread that handles the request, so they never wait behind other calls in the main thread queue. Such functions
+    must not touch editor or `unreal` state, like assets, actors or the asset registry, since the editor is not thread
+    safe. They can only read fixed values, like the project's paths and files. It must be applied before the function
+    is made remote, i.e. below `@staticmethod` on a remote class.
+
+    :param callable function: A function.
+    :return callable: The same function.
+    """
+    function.thread_safe = True
+    return function
+
+
+def is_thread_safe(function):
+    """
+    Checks if the function was marked as thread safe.
+
+    :param callable function: A function.
+    :return bool: Whether the function is thread safe.
+    """
+    return getattr(function, 'thread_safe', False)
 
 
 def remote_call(port, default_imports=None, remap_pairs=None):
@@ -237,15 +798,62 @@ def remote_call(port, default_imports=None, remap_pairs=None):
     systems and the root of the import paths need to be dynamically replaced.
     """
     def decorator(function):
+        @functools.wraps(function)
         def wrapper(*args, **kwargs):
-            validate_file_is_saved(function)
             validate_key_word_parameters(function, kwargs)
             rpc_factory = RPCFactory(
                 rpc_client=RPCClient(port),
                 remap_pairs=remap_pairs,
                 default_imports=default_imports
             )
-            return rpc_factory.run_function_remotely(function, args)
+            # the code only needs to be generated the first time the function is called
+            if wrapper.code is None:
+                wrapper.code, wrapper.code_hash = rpc_factory.get_code(function)
+
+            # if calls are being batched, add it to the batch instead of calling it now
+            batch = get_batch(port)
+            if batch:
+                return batch.add(rpc_factory, function, args, wrapper.code, wrapper.code_hash)
+            return rpc_factory.run_function_remotely(function, args, wrapper.code, wrapper.code_hash)
+
+        wrapper.code = None
+        wrapper.code_hash = None
+        # lets the call be awaited with `await function.async_call()`
+        wrapper.async_call = remote_call_async(port, default_imports, remap_pairs)(function)
+        return wrapper
+
+    # calls made to this port inside a `with decorator.batch():` statement are sent together
+    decorator.batch = functools.partial(RPCBatch, port)
+    return decorator
+
+
+def remote_call_async(port, default_imports=None, remap_pairs=None):
+    """
+    A decorator that makes this function run remotely when it is awaited. Independent calls can be awaited together
+    with `asyncio.gather`.
+
+    :param Enum port: The name of the port application i.e. maya, blender, unreal.
+    :param list[str] default_imports: A list of import commands that include modules in every call.
+    :param list(tuple) remap_pairs: A list of tuples with first value being the client file path root and the
+    second being the matching server path root. This can be useful if the client and server are on two different file
+    systems and the root of the import paths need to be dynamically replaced.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            validate_key_word_parameters(function, kwargs)
+            rpc_factory = RPCFactory(
+                rpc_client=AsyncRPCClient(port),
+                remap_pairs=remap_pairs,
+                default_imports=default_imports
+            )
+            # the code only needs to be generated the first time the function is called
+            if wrapper.code is None:
+                wrapper.code, wrapper.code_hash = rpc_factory.get_code(function)
+            return await rpc_factory.run_function_remotely_async(function, args, wrapper.code, wrapper.code_hash)
+
+        wrapper.code = None
+        wrapper.code_hash = None
         return wrapper
     return decorator
 
@@ -262,6 +870,10 @@ def remote_class(decorator):
             validate_class_method(cls, value)
             if callable(getattr(cls, attribute)):
                 setattr(cls, attribute, decorator(getattr(cls, attribute)))
+
+        # lets the calls on the class be batched with `with cls.batch():`
+        if hasattr(decorator, 'batch'):
+            cls.batch = staticmethod(decorator.batch)
         return cls
     return decorate
 
@@ -273,6 +885,7 @@ class RPCTestCase(unittest.TestCase):
     port = None
     remap_pairs = None
     default_imports = None
+    code_cache = {}
 
     @classmethod
     def run_remotely(cls, method, args):
@@ -289,7 +902,12 @@ class RPCTestCase(unittest.TestCase):
             default_imports=default_imports,
             remap_pairs=remap_pairs
         )
-        return rpc_factory.run_function_remotely(method, args)
+        # the code of each method only needs to be generated once per test case, since it has its own imports
+        key = (cls, getattr(method, '__func__', method))
+        if key not in cls.code_cache:
+            cls.code_cache[key] = rpc_factory.get_code(method)
+        code, code_hash = cls.code_cache[key]
+        return rpc_factory.run_function_remotely(method, args, code, code_hash)
 
     def _callSetUp(self):
         """
@@ -40,12 +40,12 @@ def validate_arguments(function, args):
     :param tuple(Any) args: A list of arguments.
     """
     supported_types = [str, int, float, tuple, list, dict, bool]
-    line_link = get_line_link(function)
     for arg in args:
         if arg is None:
             continue
 
         if type(arg) not in supported_types:
+            line_link = get_line_link(function)
             raise UnsupportedArgumentType(function, arg, supported_types, line_link=line_link)
 
 
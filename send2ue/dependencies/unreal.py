@@ -5,6 +5,7 @@ import json
 import time
 import sys
 import inspect
+import threading
 from xmlrpc.client import ProtocolError
 from http.client import RemoteDisconnected
 
@@ -33,6 +34,17 @@ remote_unreal_decorator = rpc.factory.remote_call(
 )
 rpc_client = rpc.client.RPCClient(port=UNREAL_PORT)
 unreal_response = ''
+# how often the heartbeat checks the connection to the unreal rpc server in seconds
+HEARTBEAT_INTERVAL = float(os.environ.get('UNREAL_HEARTBEAT_INTERVAL', 2))
+# how old the last heartbeat check can be before the heartbeat is woken to check it again in seconds
+HEARTBEAT_STALE_TIME = HEARTBEAT_INTERVAL * 3
+# how long to wait for an unreal editor with remote execution enabled in seconds
+REMOTE_EXECUTION_TIMEOUT = float(os.environ.get('UNREAL_REMOTE_EXECUTION_TIMEOUT', 5))
+# the first delay between reconnection attempts in seconds, this doubles after each failed attempt
+REMOTE_EXECUTION_RETRY_DELAY = 0.1
+# the first delay before an editor that a connection failed to is tried again in seconds, this doubles after each
+# failed connection to it
+REMOTE_EXECUTION_NODE_RETRY_DELAY = 1
 
 
 def get_response():
@@ -102,47 +114,149 @@ def print_python(commands):
         sys.stdout.write(f'{dashes}{"-" * len(label)}{dashes}\n')
 
 
-def run_unreal_python_commands(remote_exec, commands, failed_connection_attempts=0):
-    """
-    Finds the open unreal editor with remote connection enabled, and sends it python commands.
+class RemoteExecutionSession:
+    instance = None
+    instance_lock = threading.Lock()
 
-    :param object remote_exec: A RemoteExecution instance.
-    :param list commands: A list of python commands that will be run by unreal engine.
-    :param int failed_connection_attempts: A counter that keeps track of how many times an editor connection attempt
-    was made.
-    """
-    if failed_connection_attempts == 0:
-        print_python(commands)
+    def __init__(self):
+        """
+        A long-lived remote execution session. Node discovery and the command connection are kept open and reused
+        across commands, so only the first command waits on discovery.
+        """
+        self.remote_exec = None
+        self.node_id = None
+        # the editors that a connection failed to, keyed by node id with the time they can be tried again and the
+        # delay before the next retry. They stay discovered for a few seconds after they close
+        self.failed_nodes = {}
+        self.lock = threading.Lock()
 
-    # wait a tenth of a second before attempting to connect
-    time.sleep(0.1)
-    try:
-        # try to connect to an editor
-        for node in remote_exec.remote_nodes:
-            remote_exec.open_command_connection(node.get("node_id"))
+    @classmethod
+    def get(cls):
+        """
+        Gets the remote execution session, creating it if it doesn't exist yet.
 
-        # if a connection is made
-        if remote_exec.has_command_connection():
-            # run the import commands and save the response in the global unreal_response variable
-            global unreal_response
-            unreal_response = remote_exec.run_command('\n'.join(commands), unattended=False)
+        :return RemoteExecutionSession: The session.
+        """
+        with cls.instance_lock:
+            if not cls.instance:
+                cls.instance = cls()
+            return cls.instance
 
-        # otherwise make an other attempt to connect to the engine
-        else:
-            if failed_connection_attempts < 50:
-                run_unreal_python_commands(remote_exec, commands, failed_connection_attempts + 1)
-            else:
-                remote_exec.stop()
-                raise ConnectionError("Could not find an open Unreal Editor instance!")
+    @classmethod
+    def stop(cls):
+        """
+        Stops the remote execution session and closes its connections.
+        """
+        with cls.instance_lock:
+            if cls.instance:
+                with cls.instance.lock:
+                    cls.instance.disconnect(stop=True)
+                cls.instance = None
+
+    def disconnect(self, stop=False):
+        """
+        Closes the command connection.
+
+        :param bool stop: Whether to also stop the node discovery.
+        """
+        if self.remote_exec:
+            try:
+                if stop:
+                    self.remote_exec.stop()
+                else:
+                    self.remote_exec.close_command_connection()
+            except OSError:
+                pass
+            if stop:
+                self.remote_exec = None
+        self.node_id = None
 
-    # catch all errors
-    except:
-        raise ConnectionError("Could not find an open Unreal Editor instance!")
+    def connect(self, timeout):
+        """
+        Opens a command connection to an unreal editor, unless the current one is still to a discovered editor.
 
-    # shutdown the connection
-    finally:
-        remote_exec.stop()
+        :param float timeout: The number of seconds to wait for an editor to be discovered.
+        :return bool: Whether there is a command connection.
+        """
+        if not self.remote_exec:
+            self.remote_exec = remote_execution.RemoteExecution()
+            self.remote_exec.start()
 
+        node_ids = [node.get('node_id') for node in self.remote_exec.wait_for_remote_nodes(timeout)]
+        if self.remote_exec.has_command_connection() and self.node_id in node_ids:
+            return True
+
+        self.disconnect()
+        now = time.time()
+        self.failed_nodes = {
+            node_id: failure for node_id, failure in self.failed_nodes.items() if node_id in node_ids
+        }
+        for node_id in node_ids:
+            if self.failed_nodes.get(node_id, (0, 0))[0] <= now:
+                self.node_id = node_id
+                self.remote_exec.open_command_connection(node_id)
+                return True
+        return False
+
+    def fail_node(self):
+        """
+        Closes the command connection to the current editor, and skips that editor till its retry delay has passed.
+        """
+        if self.node_id:
+            delay = REMOTE_EXECUTION_NODE_RETRY_DELAY
+            if self.node_id in self.failed_nodes:
+                delay = self.failed_nodes[self.node_id][1] * 2
+            self.failed_nodes[self.node_id] = (time.time() + delay, delay)
+        self.disconnect()
+
+    def run_command(self, command):
+        """
+        Runs a python command in the unreal editor. If there is no editor or the connection to it can't be opened,
+        this reconnects with an exponential backoff till the connection timeout is reached. The command is never sent
+        twice, so if the connection is lost after it was sent, an error is raised since it may have already run.
+
+        :param str command: The python command that will be run by unreal engine.
+        :return dict: The result from running the remote command.
+        """
+        delay = REMOTE_EXECUTION_RETRY_DELAY
+        deadline = time.time() + REMOTE_EXECUTION_TIMEOUT
+        with self.lock:
+            while True:
+                try:
+                    if self.connect(max(deadline - time.time(), 0)):
+                        break
+                except (OSError, RuntimeError):
+                    # the editor closed or restarted, so the connection has to be opened again
+                    self.fail_node()
+
+                if time.time() + delay > deadline:
+                    raise ConnectionError("Could not find an open Unreal Editor instance!")
+                time.sleep(delay)
+                delay *= 2
+
+            try:
+                result = self.remote_exec.run_command(command, unattended=False)
+            except (OSError, RuntimeError) as error:
+                self.fail_node()
+                raise ConnectionError(
+                    "The connection to the Unreal Editor was lost while running a command, it may have already run!"
+                ) from error
+            self.failed_nodes.pop(self.node_id, None)
+            return result
+
+
+def run_unreal_python_commands(commands):
+    """
+    Finds the open unreal editor with remote connection enabled, and sends it python commands.
+
+    :param list commands: A list of python commands that will be run by unreal engine.
+    :return str: The stdout produced by the remote python command.
+    """
+    print_python(commands)
+
+    # run the commands and save the response in the global unreal_response variable
+    global unreal_response
+    unreal_response = RemoteExecutionSession.get().run_command('\n'.join(commands))
     return get_response()
 
 
@@ -156,22 +270,110 @@ def run_commands(commands):
     # wrap the commands in a try except so that all exceptions can be logged in the output
     commands = ['try:'] + add_indent(commands, '\t') + ['except Exception as error:', '\tprint(error)']
 
-    # start a connection to the engine that lets you send python-commands.md strings
-    remote_exec = remote_execution.RemoteExecution()
-    remote_exec.start()
-
     # send over the python code as a string and run it
-    return run_unreal_python_commands(remote_exec, commands)
+    return run_unreal_python_commands(commands)
+
 
+class ConnectionHeartbeat(threading.Thread):
+    instance = None
+    instance_lock = threading.Lock()
 
-def is_connected():
+    def __init__(self):
+        """
+        A background thread that regularly checks the connection to the unreal rpc server, so the connection state
+        can be read without waiting on the network.
+        """
+        super(ConnectionHeartbeat, self).__init__(name='UnrealConnectionHeartbeat', daemon=True)
+        self.connected = False
+        # the time of the last check, this is None till the first check is done
+        self.checked_time = None
+        self.wake = threading.Event()
+        self.stopped = False
+
+    @classmethod
+    def get(cls):
+        """
+        Gets the running heartbeat, starting it if it is not running yet.
+
+        :return ConnectionHeartbeat: The heartbeat.
+        """
+        with cls.instance_lock:
+            if not cls.instance:
+                cls.instance = cls()
+                cls.instance.start()
+            return cls.instance
+
+    @classmethod
+    def stop(cls):
+        """
+        Stops the running heartbeat.
+        """
+        with cls.instance_lock:
+            if cls.instance:
+                cls.instance.stopped = True
+                cls.instance.wake.set()
+                cls.instance = None
+
+    def set_state(self, connected):
+        """
+        Sets the connection state and when it was checked.
+
+        :param bool connected: Whether the server is connected.
+        """
+        self.connected = connected
+        self.checked_time = time.time()
+
+    def run(self):
+        """
+        Checks the connection every heartbeat interval, or sooner when woken.
+        """
+        while not self.stopped:
+            try:
+                self.set_state(is_connected())
+            except Exception:
+                # any other error, like a socket timeout, must not stop the heartbeat
+                self.set_state(False)
+            self.wake.wait(HEARTBEAT_INTERVAL)
+            self.wake.clear()
+
+
+def get_connection_state():
+    """
+    Gets the last known connection state of the unreal rpc server without waiting on the network. The state is
+    kept up to date by a background heartbeat, which is started if it isn't running yet.
+
+    :return tuple(bool, float): Whether the server is connected, and the time it was last checked. The time is None if
+    it hasn't been checked yet, in which case it is reported as not connected.
+    """
+    heartbeat = ConnectionHeartbeat.get()
+    return heartbeat.connected, heartbeat.checked_time
+
+
+def is_connected(cached=False):
     """
     Checks the rpc server connection
+
+    :param bool cached: Whether to return the last state from the connection heartbeat instead of checking the
+    connection now, so it is meant for the UI and never waits on the network. If the heartbeat hasn't checked the
+    connection recently, it is woken to check it now, and the last known state is returned in the meantime, which is
+    not connected if it was never checked.
+    :return bool: Whether the server is connected.
     """
+    if cached:
+        connected, checked_time = get_connection_state()
+        if checked_time is None or time.time() - checked_time >= HEARTBEAT_STALE_TIME:
+            ConnectionHeartbeat.get().wake.set()
+        return connected
+
     try:
-        return rpc_client.proxy.is_running()
+        connected = rpc_client.proxy.is_running()
     except (RemoteDisconnected, ConnectionRefusedError, ProtocolError):
-        return False
+        connected = False
+
+    # a live check is also the freshest state for the heartbeat
+    if ConnectionHeartbeat.instance:
+        ConnectionHeartbeat.instance.set_state(connected)
+    return connected
 
 
 def set_rpc_env(key, value):
@@ -181,6 +383,30 @@ def set_rpc_env(key, value):
     rpc_client.proxy.set_env(key, value)
 
 
+def get_server_file_path(file_path):
+    """
+    Gets the path that the unreal editor can read a file from. When the UNREAL_UPLOAD_FILES environment variable is
+    set, the editor is on another host, so the file is uploaded to its RPC server first. Files that the server
+    already has are not uploaded again.
+
+    :param str file_path: The path to the file on this host.
+    :return str: The path to the file on the unreal editor's host.
+    """
+    if file_path and os.environ.get('UNREAL_UPLOAD_FILES'):
+        return rpc_client.upload_file(file_path)
+    return file_path
+
+
+def cancel_pending_calls():
+    """
+    Cancels the calls that are still queued on the unreal RPC server, so they don't run after a push is aborted.
+    """
+    try:
+        rpc_client.cancel_pending_requests()
+    except (ConnectionError, ProtocolError, RemoteDisconnected):
+        pass
+
+
 def bootstrap_unreal_with_rpc_server():
     """
     Bootstraps the running unreal editor with the unreal rpc server if it doesn't already exist.
@@ -350,6 +576,35 @@ class Unreal:
         pose = unreal.AnimPoseExtensions.get_anim_pose_at_frame(anim_sequence, frame, pose_options)
         return unreal.AnimPoseExtensions.get_bone_pose(pose, bone_name)
 
+    @staticmethod
+    def get_bone_transforms_for_frame(anim_sequence, bone_name, frame):
+        """
+        Gets the local and world transforms of the bone at the specified frame in the anim sequence.
+
+        :param object anim_sequence: An unreal anim sequence object.
+        :param str bone_name: A bone name.
+        :param float frame: The frame number.
+        :return dict: A dictionary of transformation values.
+        """
+        path = unreal.AnimationLibrary.find_bone_path_to_root(anim_sequence, bone_name)
+        transform = Unreal.get_bone_pose_for_frame(anim_sequence, bone_name, frame, True)
+        world_rotation = unreal.Rotator()
+        world_location = unreal.Transform()
+
+        # this walks the bone hierarchy to get the world transforms
+        for bone in path:
+            bone_transform = Unreal.get_bone_pose_for_frame(anim_sequence, str(bone), frame, True)
+            world_rotation = world_rotation.combine(bone_transform.rotation.rotator())
+            world_location = world_location.multiply(bone_transform)
+
+        return {
+            'scale': transform.scale3d.to_tuple(),
+            'world_rotation': world_rotation.transform().rotation.euler().to_tuple(),
+            'local_rotation': transform.rotation.euler().to_tuple(),
+            'world_location': world_location.translation.to_tuple(),
+            'local_location': transform.translation.to_tuple()
+        }
+
     @staticmethod
     def set_settings(property_group, data_object):
         """
@@ -1073,6 +1328,7 @@ class UnrealRemoteCalls:
                     return index
 
     @staticmethod
+    @rpc.factory.thread_safe
     def get_enabled_plugins():
         """
         Checks to see if the current project has certain plugins enabled.
@@ -1087,6 +1343,7 @@ class UnrealRemoteCalls:
         return [plugin.get('Name') for plugin in project_data.get('Plugins', {}) if plugin.get('Enabled')]
 
     @staticmethod
+    @rpc.factory.thread_safe
     def get_project_settings_value(config_name, section_name, setting_name):
         """
         Gets a specified setting value from a project settings file. Note: method only works correctly
@@ -1499,24 +1756,22 @@ class UnrealRemoteCalls:
         :return dict: A dictionary of transformation values.
         """
         animation = Unreal.get_asset(asset_path)
-        path = unreal.AnimationLibrary.find_bone_path_to_root(animation, bone_name)
-        transform = Unreal.get_bone_pose_for_frame(animation, bone_name, frame, True)
-        world_rotation = unreal.Rotator()
-        world_location = unreal.Transform()
+        return Unreal.get_bone_transforms_for_frame(animation, bone_name, frame)
 
-        # this walks the bone hierarchy to get the world transforms
-        for bone in path:
-            bone_transform = Unreal.get_bone_pose_for_frame(animation, str(bone), frame, True)
-            world_rotation = world_rotation.combine(bone_transform.rotation.rotator())
-            world_location = world_location.multiply(bone_transform)
+    @staticmethod
+    def get_bone_transforms_for_frames(asset_path, bone_name, frames):
+        """
+        Gets the transformations of the given bone on each of the given frames. The transformations are streamed
+        back in chunks while they are iterated over.
 
-        return {
-            'scale': transform.scale3d.to_tuple(),
-            'world_rotation': world_rotation.transform().rotation.euler().to_tuple(),
-            'local_rotation': transform.rotation.euler().to_tuple(),
-            'world_location': world_location.translation.to_tuple(),
-            'local_location': transform.translation.to_tuple()
-        }
+        :param str asset_path: The project path to the asset.
+        :param str bone_name: The name of the bone to get the transforms of.
+        :param list[float] frames: The frame numbers.
+        :return Generator[dict]: A dictionary of transformation values for each frame.
+        """
+        animation = Unreal.get_asset(asset_path)
+        for frame in frames:
+            yield Unreal.get_bone_transforms_for_frame(animation, bone_name, frame)
 
     @staticmethod
     def get_bone_count(skeleton_path):
@@ -1575,6 +1830,35 @@ class UnrealRemoteCalls:
                         data[channel.get_name()] = key.get_value()
         return data
 
+    @staticmethod
+    def get_sequence_track_keyframes(asset_path, track_name, curve_name, frames):
+        """
+        Gets the keyframe values of the given track on each of the given frames. The values are streamed back in
+        chunks while they are iterated over.
+
+        :param str asset_path: The project path to the asset.
+        :param str track_name: The name of the track.
+        :param str curve_name: The curve name.
+        :param list[float] frames: The frame numbers.
+        :return Generator[dict]: A dictionary of keyframe values by channel name for each frame.
+        """
+        sequence = unreal.load_asset(asset_path)
+        bindings = {binding.get_name(): binding for binding in sequence.get_bindings()}
+        binding = bindings.get(track_name)
+        track = binding.get_tracks()[0]
+        section = track.get_sections()[0]
+
+        # collect the keys of the channels once rather than once per frame
+        keys_by_frame = {}
+        for channel in section.get_channels():
+            if channel.get_name().startswith(curve_name):
+                for key in channel.get_keys():
+                    frame_data = keys_by_frame.setdefault(key.get_time().frame_number.value, {})
+                    frame_data[channel.get_name()] = key.get_value()
+
+        for frame in frames:
+            yield keys_by_frame.get(frame, {})
+
     @staticmethod
     def import_animation_fcurves(asset_path, fcurve_file_path):
         """
@@ -2,20 +2,25 @@
 
 import os
 import bpy
+import time
 import queue
 import threading
 from .constants import ToolInfo, ExtensionTasks
-from .core import export, utilities, settings, validations, extension
+from .core import export, utilities, settings, validations, extension, pipeline, parallel, journal
 from .ui import file_browser, dialog
 from .dependencies import unreal
 from .dependencies.rpc import blender_server
 from .properties import register_scene_properties, unregister_scene_properties
 
+# the seconds between the progress bar and status text updates of a push
+PROGRESS_UPDATE_INTERVAL = 0.1
+
 
 class Send2Ue(bpy.types.Operator):
     """Push your assets to disk and/or an open unreal editor instance"""
     bl_idname = "wm.send2ue"
     bl_label = "Push Assets"
+    resume = False
 
     def __init__(self):
         self.timer = None
@@ -23,6 +28,11 @@ class Send2Ue(bpy.types.Operator):
         self.done = False
         self.max_step = 0
         self.state = {}
+        self.pipeline = None
+        self.parallel_export = None
+        self.journal = None
+        self.description = ''
+        self.last_progress_update = 0
 
         # add execution queue
         execution_queue = bpy.app.driver_namespace.get(ToolInfo.EXECUTION_QUEUE.value)
@@ -38,39 +48,38 @@ class Send2Ue(bpy.types.Operator):
         if not self.done:
             context.area.tag_redraw()
 
-        if self.execution_queue.empty():
+        if not self.get_pending_job_count() and not self.parallel_export:
             self.done = True
 
         if event.type == 'ESC':
             self.escape = True
+            # don't let unreal run the calls that are still queued for this push, before anything else can block
+            unreal.cancel_pending_calls()
             # clears the queue in a thread safe manner
             with self.execution_queue.mutex:
                 self.execution_queue.queue.clear()
+            # stop the import thread at its next call, the timer finishes once its job has stopped
+            if self.pipeline:
+                self.pipeline.close()
+            # stop the export workers
+            self.stop_parallel_export()
 
         if event.type == 'TIMER':
-            if not self.execution_queue.empty():
-                try:
-                    function, args, kwargs, message, asset_id, attribute = self.execution_queue.get()
-                    step = self.max_step - self.execution_queue.qsize()
-                    context.window_manager.send2ue.progress = abs(((step / self.max_step) * 100) - 1)
-                    utilities.refresh_all_areas()
-
-                    # set the current asset id
-                    context.window_manager.send2ue.asset_id = asset_id
-                    # run the function
-                    function(*args, **kwargs)
-
-                    # get the description
-                    file_name = context.window_manager.send2ue.asset_data[asset_id].get(attribute)
-                    description = message.format(
-                        attribute=utilities.get_asset_name_from_file_name(file_name)
-                    )
-                    bpy.context.workspace.status_text_set_internal(description)
-                except Exception as error:
-                    self.escape_operation(context)
-                    raise error
+            try:
+                if not self.done and not self.escape:
+                    self.run_jobs(context)
+            except Exception as error:
+                self.escape_operation(context)
+                raise error
 
             if self.escape:
+                self.stop_parallel_export()
+                # wait for the import thread without blocking blender, cancelling any calls it still makes
+                if self.pipeline and self.pipeline.is_running():
+                    unreal.cancel_pending_calls()
+                    self.pipeline.cancel_main_thread_calls()
+                    return {'RUNNING_MODAL'}
+                self.stop_pipeline()
                 bpy.types.STATUSBAR_HT_header.remove(self.draw_progress)
                 context.window_manager.event_timer_remove(self.timer)
                 bpy.context.workspace.status_text_set_internal(None)
@@ -78,12 +87,73 @@ class Send2Ue(bpy.types.Operator):
                 return {'FINISHED'}
 
             if self.done:
+                # the push finished, so there is nothing to resume
+                self.journal.finish()
                 context.window_manager.send2ue.progress = 100
                 bpy.context.workspace.status_text_set_internal('Finished!')
                 bpy.context.window_manager.progress_end()
                 self.escape = True
         return {'RUNNING_MODAL'}
 
+    def run_jobs(self, context):
+        """
+        Runs as many queued jobs as fit in the job time budget, then updates the progress. There is always at least
+        one job run, so a job that takes longer than the budget still runs.
+
+        :param object context: The context of this operator.
+        """
+        time_budget = utilities.get_job_time_budget()
+        start_time = time.perf_counter()
+        while True:
+            if self.pipeline:
+                # run the extension tasks the import thread is waiting on, and raise its errors
+                self.pipeline.execute_main_thread_calls()
+                self.pipeline.pop_finished()
+
+            if self.parallel_export:
+                self.complete_parallel_jobs()
+                # the queued imports wait till the workers have exported all the files
+                if not self.parallel_export.is_done():
+                    self.description = f'Exporting assets in {len(self.parallel_export.workers)} processes...'
+                    break
+                self.finish_parallel_export()
+
+            if self.execution_queue.empty():
+                break
+
+            job = self.execution_queue.get()
+            function, args, kwargs, message, asset_id, attribute = job
+            self.run_job(context, job)
+
+            # get the description
+            file_name = context.window_manager.send2ue.asset_data[asset_id].get(attribute)
+            self.description = message.format(
+                attribute=utilities.get_asset_name_from_file_name(file_name)
+            )
+
+            if time.perf_counter() - start_time >= time_budget:
+                break
+
+        self.update_progress(context)
+
+    def update_progress(self, context):
+        """
+        Updates the progress bar and the status text. Redrawing the ui is slow compared to small jobs, so this is
+        only done at a fixed rate.
+
+        :param object context: The context of this operator.
+        """
+        now = time.perf_counter()
+        if now - self.last_progress_update < PROGRESS_UPDATE_INTERVAL:
+            return
+        self.last_progress_update = now
+
+        step = self.max_step - self.get_pending_job_count()
+        context.window_manager.send2ue.progress = abs(((step / self.max_step) * 100) - 1)
+        if self.description:
+            bpy.context.workspace.status_text_set_internal(self.description)
+        utilities.refresh_all_areas()
+
     def invoke(self, context, event):
         if utilities.is_unreal_connected():
             properties = bpy.context.scene.send2ue
@@ -107,7 +177,14 @@ class Send2Ue(bpy.types.Operator):
                 self.report({'ERROR'}, str(error))
                 return {'FINISHED'}
 
-            self.max_step = self.execution_queue.qsize()
+            try:
+                self.start_journal(context)
+                self.max_step = self.execution_queue.qsize()
+                self.start_parallel_export(context)
+            except Exception as error:
+                self.escape_operation(context)
+                raise error
+            self.start_pipeline(context)
 
             # start a timer in the operators modal that processes the queued jobs
             context.window_manager.modal_handler_add(self)
@@ -127,17 +204,164 @@ class Send2Ue(bpy.types.Operator):
             export.send2ue(properties)
 
             # process the queued functions
-            while not self.execution_queue.empty():
-                function, args, kwargs, message, asset_id, attribute = self.execution_queue.get()
-                # set the current asset id
-                context.window_manager.send2ue.asset_id = asset_id
-                # run the function
-                function(*args, **kwargs)
+            try:
+                self.start_journal(context)
+
+                # export the assets with the workers first, since the queued imports need their files
+                self.start_parallel_export(context)
+                if self.parallel_export:
+                    self.parallel_export.wait()
+                    self.finish_parallel_export()
+
+                self.start_pipeline(context)
+                while not self.execution_queue.empty():
+                    self.run_job(context, self.execution_queue.get())
+                    if self.pipeline:
+                        self.pipeline.execute_main_thread_calls()
+                        self.pipeline.pop_finished()
+
+                # wait for the imports that are still running
+                if self.pipeline:
+                    self.pipeline.wait()
+
+                # the push finished, so there is nothing to resume
+                self.journal.finish()
+            finally:
+                self.stop_parallel_export()
+                self.stop_pipeline()
 
             self.post_operation()
         return {'FINISHED'}
 
+    def get_pending_job_count(self):
+        """
+        Gets the number of jobs that are not done yet, whether they are queued, on the import thread or in the export
+        workers.
+
+        :return int: The number of jobs.
+        """
+        count = self.execution_queue.qsize()
+        if self.pipeline:
+            count += self.pipeline.pending
+        if self.parallel_export:
+            count += self.parallel_export.pending
+        return count
+
+    def start_journal(self, context):
+        """
+        Starts the journal of this push. When resuming, the jobs that already finished in the last push are first
+        taken out of the queue, and are added to the new journal as finished.
+
+        :param object context: The context of this operator.
+        """
+        asset_data = context.window_manager.send2ue.asset_data
+        with self.execution_queue.mutex:
+            jobs = list(self.execution_queue.queue)
+            remaining_jobs = journal.resume_jobs(jobs, asset_data) if self.resume else jobs
+            self.execution_queue.queue.clear()
+            self.execution_queue.queue.extend(remaining_jobs)
+
+        self.journal = journal.PushJournal(asset_data)
+        self.journal.start(jobs)
+        remaining_job_ids = {id(job) for job in remaining_jobs}
+        for job in jobs:
+            if id(job) not in remaining_job_ids:
+                self.journal.complete(job)
+
+    def start_parallel_export(self, context):
+        """
+        Takes the export jobs out of the queue and starts the export workers, if the addon preferences have more than
+        one export worker and there is more than one asset to export.
+
+        :param object context: The context of this operator.
+        """
+        if parallel.is_parallel_export():
+            with self.execution_queue.mutex:
+                jobs = list(self.execution_queue.queue)
+                export_jobs = [job for job in jobs if getattr(job[0], 'parallel', False)]
+                if len({job[4] for job in export_jobs}) < 2:
+                    return
+                self.execution_queue.queue.clear()
+                self.execution_queue.queue.extend(job for job in jobs if not getattr(job[0], 'parallel', False))
+
+            self.parallel_export = parallel.ParallelExport(
+                export_jobs,
+                context.window_manager.send2ue.asset_data,
+                parallel.get_export_worker_count()
+            )
+            self.parallel_export.start()
+
+    def complete_parallel_jobs(self):
+        """
+        Adds the jobs that the export workers have finished to the journal.
+        """
+        for job in self.parallel_export.pop_done_jobs():
+            self.journal.complete(job)
+
+    def finish_parallel_export(self):
+        """
+        Adds the last jobs of the export workers to the journal and collects the asset data from them.
+        """
+        # the finished jobs are journaled first, so they are kept even if a worker failed
+        self.complete_parallel_jobs()
+        self.parallel_export.finish()
+        self.parallel_export = None
+
+    def stop_parallel_export(self):
+        """
+        Stops the export workers, if there are any. The jobs they finished before they stopped are still journaled.
+        """
+        if self.parallel_export:
+            self.parallel_export.terminate()
+            self.complete_parallel_jobs()
+            self.parallel_export = None
+
+    def start_pipeline(self, context):
+        """
+        Starts the import thread if the pipelined push preference is on. The queued jobs are ordered by asset, so
+        each asset is imported while the next one is exported.
+
+        :param object context: The context of this operator.
+        """
+        if pipeline.is_pipelined_push():
+            with self.execution_queue.mutex:
+                jobs = pipeline.order_jobs_by_asset(list(self.execution_queue.queue))
+                self.execution_queue.queue.clear()
+                self.execution_queue.queue.extend(jobs)
+            self.pipeline = pipeline.ImportPipeline(
+                context.window_manager.send2ue.asset_data,
+                on_job_done=self.journal.complete
+            )
+
+    def stop_pipeline(self):
+        """
+        Stops the import thread, if there is one.
+        """
+        if self.pipeline:
+            self.pipeline.shutdown()
+            self.pipeline = None
+
+    def run_job(self, context, job):
+        """
+        Runs a queued job. Pipelined jobs are handed to the import thread, the rest run on the main thread and are
+        added to the journal once they finish.
+
+        :param object context: The context of this operator.
+        :param tuple job: The queued job.
+        """
+        function, args, kwargs, message, asset_id, attribute = job
+        if self.pipeline and getattr(function, 'pipelined', False):
+            self.pipeline.submit(job)
+        else:
+            # set the current asset id
+            context.window_manager.send2ue.asset_id = asset_id
+            # run the function
+            function(*args, **kwargs)
+            self.journal.complete(job)
+
     def escape_operation(self, context):
+        self.stop_parallel_export()
+        self.stop_pipeline()
         if self.timer:
             bpy.types.STATUSBAR_HT_header.remove(self.draw_progress)
             context.window_manager.event_timer_remove(self.timer)
@@ -169,6 +393,17 @@ class Send2Ue(bpy.types.Operator):
         utilities.set_context(self.state.get('context', {}))
 
 
+class ResumeSend2Ue(Send2Ue):
+    """Resume the last push that failed or was stopped, skipping the jobs that finished and are still up to date"""
+    bl_idname = "wm.resume_send2ue"
+    bl_label = "Resume Last Push"
+    resume = True
+
+    @classmethod
+    def poll(cls, context):
+        return journal.has_journal()
+
+
 class SettingsDialog(bpy.types.Operator, dialog.Send2UnrealDialog):
     """Open the settings dialog to modify the tool properties"""
     bl_idname = "wm.settings_dialog"
@@ -306,6 +541,7 @@ class NullOperator(bpy.types.Operator):
 
 operator_classes = [
     Send2Ue,
+    ResumeSend2Ue,
     SettingsDialog,
     ImportAsset,
     CreatePredefinedCollections,
@@ -27,6 +27,43 @@ class Send2UeAddonProperties:
         set=settings.set_rpc_response_timeout,
         get=settings.get_rpc_response_timeout
     )
+    incremental_push: bpy.props.BoolProperty(
+        name="Incremental push",
+        default=False,
+        description=(
+            "Skips exporting and importing the assets that haven't changed since they were last pushed. Each asset's "
+            "mesh data, modifiers, materials, transforms, actions and the tool settings are compared to the last push"
+        )
+    )
+    pipelined_push: bpy.props.BoolProperty(
+        name="Pipelined push",
+        default=False,
+        description=(
+            "Imports each asset into unreal on a background thread while the next asset is exported, so blender and "
+            "unreal work at the same time. Import extension tasks still run on the main thread"
+        )
+    )
+    job_time_budget: bpy.props.IntProperty(
+        name="Job Time Budget",
+        default=50,
+        min=1,
+        max=1000,
+        description=(
+            "The milliseconds a push runs its queued jobs for before it lets blender handle events and redraw. Higher "
+            "values push faster, lower values keep the progress bar and escape key more responsive"
+        )
+    )
+    export_workers: bpy.props.IntProperty(
+        name="Export workers",
+        default=1,
+        min=1,
+        max=64,
+        description=(
+            "The number of headless blender processes that export the assets. With more than one, a copy of the "
+            "scene is saved and the meshes, animations and grooms are split between the processes and exported in "
+            "parallel"
+        )
+    )
     extensions_repo_path: bpy.props.StringProperty(
             name="Extensions Repo Path",
             default="",
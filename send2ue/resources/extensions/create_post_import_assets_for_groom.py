@@ -57,11 +57,15 @@ class CreatePostImportAssetsForGroom(ExtensionBase):
                 groom_asset_path = asset_data.get('asset_path', '')
                 mesh_asset_path = mesh_asset_data.get('asset_path', '')
 
-                if not UnrealRemoteCalls.asset_exists(groom_asset_path):
+                with UnrealRemoteCalls.batch():
+                    groom_asset_exists = UnrealRemoteCalls.asset_exists(groom_asset_path)
+                    mesh_asset_exists = UnrealRemoteCalls.asset_exists(mesh_asset_path)
+
+                if not groom_asset_exists.result():
                     return
 
                 # don't create a binding asset if the mesh doesn't exist. This happens in a groom only export
-                if not UnrealRemoteCalls.asset_exists(mesh_asset_path):
+                if not mesh_asset_exists.result():
                     return
 
                 if groom_asset_path and mesh_asset_path:
@@ -23,6 +23,16 @@ class SendToUnrealPreferences(Send2UeAddonProperties, bpy.types.AddonPreferences
         row.label(text='RPC Response Timeout')
         row.prop(self, 'rpc_response_timeout', text='')
         row = self.layout.row()
+        row.label(text='Job Time Budget')
+        row.prop(self, 'job_time_budget', text='')
+        row = self.layout.row()
+        row.prop(self, 'incremental_push')
+        row = self.layout.row()
+        row.prop(self, 'pipelined_push')
+        row = self.layout.row()
+        row.label(text='Export Workers')
+        row.prop(self, 'export_workers', text='')
+        row = self.layout.row()
         row.label(text='Extensions Repo Path:')
         row = self.layout.row()
         row = row.split(factor=0.95, align=True)
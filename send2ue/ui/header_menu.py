@@ -23,6 +23,7 @@ class TOPBAR_MT_Export(bpy.types.Menu):
 
     def draw(self, context):
         self.layout.operator('wm.send2ue')
+        self.layout.operator('wm.resume_send2ue')
         self.layout.operator('wm.settings_dialog')
 
 
@@ -0,0 +1,88 @@
+import json
+import socket
+import unittest
+# adds the remote execution module to the path
+from utils import local_rpc_server
+
+import remote_execution
+
+
+class FragmentedSocket:
+    def __init__(self, data, size=1):
+        """
+        A socket that receives the given data a few bytes at a time, like a slow connection would.
+
+        :param bytes data: The data to receive.
+        :param int size: The number of bytes each receive gets.
+        """
+        self.data = data
+        self.size = size
+
+    def recv_into(self, view):
+        size = min(self.size, len(view), len(self.data))
+        view[:size] = self.data[:size]
+        self.data = self.data[size:]
+        return size
+
+
+class TestMessageReader(unittest.TestCase):
+    """
+    Checks that the messages of the command connection are read whole, however the data is split up.
+    """
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+        self.addCleanup(self.sender.close)
+        self.addCleanup(self.receiver.close)
+        self.receiver.settimeout(5)
+
+    def test_reads_fragmented_messages(self):
+        message = {'type': 'command', 'data': {'command': 'print("}{\\\\")', 'name': 'café ✓'}}
+        data = json.dumps(message, ensure_ascii=False).encode('utf-8')
+
+        # every byte comes on its own, so escapes and characters are split across reads
+        reader = remote_execution._RemoteExecutionMessageReader(FragmentedSocket(data), buffer_size=4)
+        self.assertEqual(reader.read(), message)
+        self.assertEqual(reader.stats['reads'], len(data))
+        self.assertIsNone(reader.read())
+
+    def test_reads_messages_received_together(self):
+        messages = [{'index': index, 'data': '{"nested": "}"}'} for index in range(3)]
+        self.sender.sendall(b' \n'.join(json.dumps(message).encode('utf-8') for message in messages))
+        self.sender.close()
+
+        reader = remote_execution._RemoteExecutionMessageReader(self.receiver)
+        self.assertEqual([reader.read() for _ in messages], messages)
+        self.assertEqual(reader.stats['messages'], 3)
+        self.assertIsNone(reader.read())
+
+    def test_reads_large_messages(self):
+        message = {'data': 'x' * 100000}
+        self.sender.sendall(json.dumps(message).encode('utf-8'))
+
+        reader = remote_execution._RemoteExecutionMessageReader(self.receiver, buffer_size=16)
+        self.assertEqual(reader.read(), message)
+        self.assertGreater(reader.stats['max_message_size'], 100000)
+
+    def test_raises_on_invalid_data(self):
+        for data in (b'[1, 2]', b'{"data": value}', b'{"data"\\}', b'{}}'):
+            reader = remote_execution._RemoteExecutionMessageReader(FragmentedSocket(data, size=len(data)))
+            with self.assertRaises(RuntimeError, msg=data):
+                # the data after the first message is only checked once it is read
+                reader.read()
+                reader.read()
+
+    def test_returns_none_when_the_connection_closes(self):
+        self.sender.sendall(b'{"data": "partial')
+        self.sender.close()
+
+        reader = remote_execution._RemoteExecutionMessageReader(self.receiver)
+        self.assertIsNone(reader.read())
+
+    def test_times_out_waiting_for_data(self):
+        self.assertEqual(remote_execution.RemoteExecutionConfig().receive_timeout, remote_execution.DEFAULT_RECEIVE_TIMEOUT)
+        self.receiver.settimeout(0.1)
+        self.sender.sendall(b'{"data": ')
+
+        reader = remote_execution._RemoteExecutionMessageReader(self.receiver)
+        with self.assertRaises(socket.timeout):
+            reader.read()
@@ -0,0 +1,343 @@
+import os
+import asyncio
+import json
+import base64
+import hashlib
+import time
+import tempfile
+import threading
+import xmlrpc.client
+from utils import rpc_functions
+from utils.local_rpc_server import LocalRPCServerTestCase
+
+from rpc import client, base_server
+
+
+class TestKeepAliveConnections(LocalRPCServerTestCase):
+    """
+    Checks that the clients of a server share a transport that keeps its connections open between calls.
+    """
+    port = rpc_functions.PORT
+
+    def test_clients_share_a_transport(self):
+        self.assertIs(
+            client.RPCClient(self.port).proxy._ServerProxy__transport,
+            client.RPCClient(self.port).proxy._ServerProxy__transport
+        )
+
+    def test_reuses_the_connection(self):
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        transport = client.get_transport('127.0.0.1', self.port)
+        connection = transport._connection[1]
+        connection_count = len(self.local_server.server_thread.connections)
+
+        self.assertEqual(rpc_functions.add(3, 4), 7)
+        self.assertIs(transport._connection[1], connection)
+        self.assertEqual(len(self.local_server.server_thread.connections), connection_count)
+
+    def test_threads_have_their_own_connections(self):
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        transport = client.get_transport('127.0.0.1', self.port)
+        connections = [transport._connection[1]]
+
+        def call():
+            rpc_functions.add(1, 2)
+            connections.append(transport._connection[1])
+            transport.close()
+
+        thread = threading.Thread(target=call)
+        thread.start()
+        thread.join()
+        self.assertIsNotNone(connections[1])
+        self.assertIsNot(connections[0], connections[1])
+
+
+class TestConcurrentCalls(LocalRPCServerTestCase):
+    """
+    Checks that calls from many threads can wait on the server's main thread at the same time.
+    """
+    port = rpc_functions.PORT
+
+    def test_calls_wait_together(self):
+        self.assertEqual(rpc_functions.add(0, 0), 0)
+        results = {}
+
+        def call(index):
+            results[index] = rpc_functions.add(index, index)
+            client.get_transport('127.0.0.1', self.port).close()
+
+        # hold the calls in the queue till they have all been sent
+        self.local_server.pause()
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(5)]
+        try:
+            for thread in threads:
+                thread.start()
+            deadline = time.time() + 5
+            while base_server.EXECUTION_QUEUE.qsize() < len(threads) and time.time() < deadline:
+                time.sleep(0.001)
+            self.assertEqual(base_server.EXECUTION_QUEUE.qsize(), len(threads))
+        finally:
+            self.local_server.resume()
+
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, {index: index * 2 for index in range(5)})
+
+
+class TestCodecs(LocalRPCServerTestCase):
+    """
+    Checks that the client negotiates the json codec with the server and falls back to xml.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.codec = os.environ.get('RPC_CODEC')
+
+    def tearDown(self):
+        os.environ.pop('RPC_CODEC', None)
+        if self.codec is not None:
+            os.environ['RPC_CODEC'] = self.codec
+
+    def get_proxy(self):
+        proxy = client.RPCServerProxy(
+            f'http://127.0.0.1:{self.port}',
+            allow_none=True,
+            transport=client.RPCTransport()
+        )
+        self.addCleanup(proxy('close'))
+        return proxy
+
+    def test_negotiates_json(self):
+        proxy = self.get_proxy()
+        self.assertTrue(proxy.is_running())
+        self.assertEqual(proxy._ServerProxy__transport.codec, 'json')
+
+    def test_falls_back_to_xml(self):
+        os.environ['RPC_CODEC'] = 'xml'
+        proxy = self.get_proxy()
+        self.assertTrue(proxy.is_running())
+        self.assertEqual(proxy._ServerProxy__transport.codec, 'xml')
+
+    def test_raises_built_in_exceptions(self):
+        for codec in ('json', 'xml'):
+            os.environ['RPC_CODEC'] = codec
+            transport = client.get_transport('127.0.0.1', self.port)
+            transport.codec = None
+            with self.assertRaises(ValueError):
+                rpc_functions.raise_value_error('failed')
+            self.assertEqual(transport.codec, codec)
+        transport.codec = None
+
+    def test_encodes_objects_like_xml(self):
+        class Value:
+            def __init__(self):
+                self.number = 1
+
+        handler, request_body = client.RPCTransport.encode_request('/RPC2', 'method', (Value(),), 'json')
+        self.assertEqual(handler, client.JSON_RPC_PATH)
+        self.assertEqual(json.loads(request_body)['params'], [{'number': 1}])
+
+        handler, request_body = client.RPCTransport.encode_request('/RPC2', 'method', (Value(),), 'xml')
+        self.assertEqual(xmlrpc.client.loads(request_body)[0], ({'number': 1},))
+
+
+class TestAsyncCalls(LocalRPCServerTestCase):
+    """
+    Checks that remote functions can be awaited, so many calls can wait on the server at once.
+    """
+    port = rpc_functions.PORT
+
+    def test_gathers_calls(self):
+        async def gather():
+            return await asyncio.gather(rpc_functions.add.async_call(1, 2), rpc_functions.add.async_call(3, 4))
+
+        self.assertEqual(asyncio.run(gather()), [3, 7])
+
+    def test_calls_wait_together(self):
+        self.assertEqual(rpc_functions.add(0, 0), 0)
+
+        async def gather():
+            # each connection of the pool carries one call at a time
+            tasks = [
+                asyncio.ensure_future(rpc_functions.add.async_call(index, index))
+                for index in range(client.MAX_ASYNC_CONNECTIONS)
+            ]
+            # hold the calls in the queue till they have all been sent
+            deadline = time.time() + 5
+            while base_server.EXECUTION_QUEUE.qsize() < len(tasks) and time.time() < deadline:
+                await asyncio.sleep(0.001)
+            queued = base_server.EXECUTION_QUEUE.qsize()
+            self.local_server.resume()
+            return queued, await asyncio.gather(*tasks)
+
+        self.local_server.pause()
+        try:
+            queued, results = asyncio.run(gather())
+        finally:
+            self.local_server.resume()
+        self.assertEqual(queued, client.MAX_ASYNC_CONNECTIONS)
+        self.assertEqual(results, [index * 2 for index in range(client.MAX_ASYNC_CONNECTIONS)])
+
+    def test_passes_errors_back(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(rpc_functions.raise_value_error.async_call('failed'))
+
+    def test_registers_again_after_restart(self):
+        self.assertEqual(asyncio.run(rpc_functions.add.async_call(1, 2)), 3)
+        self.local_server.restart()
+        self.assertEqual(asyncio.run(rpc_functions.add.async_call(2, 2)), 4)
+
+
+class TestCancelledCalls(LocalRPCServerTestCase):
+    """
+    Checks that calls the client stopped waiting on are not run by the server.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        os.environ['RPC_TEST_CALLS'] = ''
+        rpc_functions.record_call('first')
+
+    def tearDown(self):
+        self.local_server.resume()
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+    def get_calls(self):
+        # the main thread runs the calls in order, so once this one has run, the others were run or skipped
+        rpc_functions.record_call('last')
+        return os.environ['RPC_TEST_CALLS'].split(',')[:-1]
+
+    def test_timed_out_calls_are_not_run(self):
+        os.environ['RPC_TIME_OUT'] = '1'
+        self.local_server.pause()
+        with self.assertRaises(TimeoutError):
+            rpc_functions.record_call('timed out')
+
+        self.local_server.resume()
+        self.assertEqual(self.get_calls(), ['first', 'last'])
+
+    def test_late_calls_of_a_batch_are_not_run(self):
+        os.environ['RPC_TIME_OUT'] = '1'
+        with self.assertRaises(TimeoutError):
+            with rpc_functions.remote_decorator.batch():
+                rpc_functions.wait(1.5)
+                rpc_functions.record_call('late')
+
+        self.assertEqual(self.get_calls(), ['first', 'last'])
+
+    def test_cancelled_calls_are_not_run(self):
+        outcome = {}
+
+        def call():
+            try:
+                rpc_functions.record_call('cancelled')
+            except Exception as error:
+                outcome['error'] = error
+            client.get_transport('127.0.0.1', self.port).close()
+
+        self.local_server.pause()
+        thread = threading.Thread(target=call)
+        thread.start()
+        deadline = time.time() + 5
+        while base_server.EXECUTION_QUEUE.qsize() < 1 and time.time() < deadline:
+            time.sleep(0.001)
+
+        client.RPCClient(self.port).cancel_pending_requests()
+        thread.join(5)
+        self.assertIsInstance(outcome['error'], RuntimeError)
+        self.assertIn('cancelled', str(outcome['error']))
+
+        self.local_server.resume()
+        self.assertEqual(self.get_calls(), ['first', 'last'])
+
+
+class TestUploads(LocalRPCServerTestCase):
+    """
+    Checks that files are uploaded in chunks, resumed where they stopped, and only uploaded once.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        os.environ['RPC_UPLOAD_CHUNK_SIZE'] = '4'
+        self.client_folder = tempfile.TemporaryDirectory()
+        self.server_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.client_folder.cleanup)
+        self.addCleanup(self.server_folder.cleanup)
+        self.local_server.server_thread.upload_folder = self.server_folder.name
+        self.rpc_client = client.RPCClient(self.port)
+
+        self.chunks = []
+        funcs = self.local_server.server_thread.server.funcs
+        upload_chunk = funcs['upload_chunk']
+
+        def record_chunk(file_name, digest, offset, data):
+            self.chunks.append(offset)
+            return upload_chunk(file_name, digest, offset, data)
+
+        funcs['upload_chunk'] = record_chunk
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+    def write_file(self, file_name, data):
+        file_path = os.path.join(self.client_folder.name, file_name)
+        with open(file_path, 'wb') as file:
+            file.write(data)
+        return file_path
+
+    def assert_uploaded(self, path, data):
+        self.assertTrue(path.startswith(self.server_folder.name))
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_uploads_in_chunks(self):
+        path = self.rpc_client.upload_file(self.write_file('cube.fbx', b'0123456789'))
+        self.assertEqual(os.path.basename(path), 'cube.fbx')
+        self.assert_uploaded(path, b'0123456789')
+        self.assertEqual(self.chunks, [0, 4, 8])
+
+    def test_uploads_once(self):
+        file_path = self.write_file('cube.fbx', b'0123456789')
+        path = self.rpc_client.upload_file(file_path)
+        self.chunks.clear()
+
+        self.assertEqual(self.rpc_client.upload_file(file_path), path)
+        self.assertEqual(self.chunks, [])
+
+    def test_copies_the_same_content_with_another_name(self):
+        first_path = self.rpc_client.upload_file(self.write_file('cube.fbx', b'0123456789'))
+        self.chunks.clear()
+
+        second_path = self.rpc_client.upload_file(self.write_file('sphere.fbx', b'0123456789'))
+        self.assertEqual(os.path.basename(second_path), 'sphere.fbx')
+        self.assertNotEqual(first_path, second_path)
+        self.assert_uploaded(second_path, b'0123456789')
+        self.assertEqual(self.chunks, [])
+
+    def test_resumes_partial_uploads(self):
+        file_path = self.write_file('cube.fbx', b'0123456789')
+        digest = hashlib.sha256(b'0123456789').hexdigest()
+        self.rpc_client.proxy.upload_chunk('cube.fbx', digest, 0, base64.b64encode(b'0123').decode('ascii'))
+        self.chunks.clear()
+
+        self.assert_uploaded(self.rpc_client.upload_file(file_path), b'0123456789')
+        self.assertEqual(self.chunks, [4, 8])
+
+    def test_rejects_content_that_does_not_match_its_digest(self):
+        digest = hashlib.sha256(b'0123456789').hexdigest()
+        self.assertEqual(self.rpc_client.proxy.start_upload('cube.fbx', digest, 10)['offset'], 0)
+        self.rpc_client.proxy.upload_chunk('cube.fbx', digest, 0, base64.b64encode(b'9876543210').decode('ascii'))
+        with self.assertRaises(ValueError):
+            self.rpc_client.proxy.finish_upload('cube.fbx', digest)
+
+        # the bad upload is removed, so it starts over
+        self.assertEqual(self.rpc_client.proxy.start_upload('cube.fbx', digest, 10)['offset'], 0)
+
+    def test_rejects_chunks_out_of_order(self):
+        digest = hashlib.sha256(b'0123456789').hexdigest()
+        with self.assertRaises(ValueError):
+            self.rpc_client.proxy.upload_chunk('cube.fbx', digest, 4, base64.b64encode(b'4567').decode('ascii'))
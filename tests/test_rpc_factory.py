@@ -0,0 +1,416 @@
+import os
+import json
+import asyncio
+import tempfile
+from utils import rpc_functions
+from utils.local_rpc_server import LocalRPCServerTestCase
+
+from rpc import factory, client, base_server
+from rpc.base_server import get_hashed_callable_name, STORED_ARGUMENT_KEY
+
+
+@rpc_functions.remote_decorator
+def get_name():
+    return 'second'
+
+
+def get_codec():
+    return str(codec)
+
+
+class JsonRemoteTestCase(factory.RPCTestCase):
+    port = rpc_functions.PORT
+    default_imports = ['import json as codec']
+
+
+class PickleRemoteTestCase(factory.RPCTestCase):
+    port = rpc_functions.PORT
+    default_imports = ['import pickle as codec']
+
+
+class TestRemoteCallRegistration(LocalRPCServerTestCase):
+    """
+    Checks that remote functions are registered once per server by the hash of their code.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        # start each test with a server and client that have nothing registered
+        self.local_server.restart()
+        factory.REGISTERED_CALLABLES.pop(('127.0.0.1', rpc_functions.PORT), None)
+        self.registrations = []
+        self.record_registrations()
+
+    def record_registrations(self):
+        funcs = self.local_server.server_thread.server.funcs
+        add_new_callable = funcs['add_new_callable']
+
+        def record_registration(callable_name, *args):
+            self.registrations.append(callable_name)
+            return add_new_callable(callable_name, *args)
+
+        funcs['add_new_callable'] = record_registration
+
+    def test_registers_once(self):
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.assertEqual(rpc_functions.add(3, 4), 7)
+        self.assertEqual(self.registrations, ['add'])
+
+        hashed_name = get_hashed_callable_name('add', rpc_functions.add.code_hash)
+        self.assertIn(hashed_name, self.local_server.server_thread.callables)
+
+    def test_registers_again_after_restart(self):
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+
+        # the new server doesn't have the function the client thinks is registered
+        self.local_server.restart()
+        self.record_registrations()
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.assertEqual(self.registrations, ['add', 'add'])
+
+    def test_same_name_with_different_code(self):
+        self.assertEqual(rpc_functions.get_name(), 'first')
+        self.assertEqual(get_name(), 'second')
+        self.assertEqual(rpc_functions.get_name(), 'first')
+        self.assertNotEqual(rpc_functions.get_name.code_hash, get_name.code_hash)
+
+        callables = self.local_server.server_thread.callables
+        self.assertIn(get_hashed_callable_name('get_name', rpc_functions.get_name.code_hash), callables)
+        self.assertIn(get_hashed_callable_name('get_name', get_name.code_hash), callables)
+
+
+class TestRemoteCallCodeGeneration(LocalRPCServerTestCase):
+    """
+    Checks that the code of a remote function is generated once and kept on its wrapper.
+    """
+    port = rpc_functions.PORT
+
+    def test_generates_code_once(self):
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        code = rpc_functions.add.code
+        code_hash = rpc_functions.add.code_hash
+
+        self.assertEqual(rpc_functions.add(2, 3), 5)
+        self.assertIs(rpc_functions.add.code, code)
+        self.assertIs(rpc_functions.add.code_hash, code_hash)
+
+    def test_code_has_no_decorators(self):
+        self.assertEqual(rpc_functions.get_name(), 'first')
+        self.assertEqual(rpc_functions.get_name.code[0], 'def get_name():')
+        self.assertFalse([line for line in rpc_functions.get_name.code if line.startswith('@')])
+
+    def test_test_cases_generate_their_own_code(self):
+        # the same method gets the default imports of each test case it is run by
+        self.assertIn("'json'", JsonRemoteTestCase.run_remotely(get_codec, []))
+        self.assertIn("'pickle'", PickleRemoteTestCase.run_remotely(get_codec, []))
+        self.assertIn("'json'", JsonRemoteTestCase.run_remotely(get_codec, []))
+
+
+class TestRemoteCallBatches(LocalRPCServerTestCase):
+    """
+    Checks that the calls made in a batch are sent in a single multicall and resolved as futures.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        # the tests restart the server, so register the functions again instead of retrying the calls
+        factory.REGISTERED_CALLABLES.pop(('127.0.0.1', rpc_functions.PORT), None)
+        self.multicalls = []
+        funcs = self.local_server.server_thread.server.funcs
+        multicall = funcs['system.multicall']
+
+        def record_multicall(calls):
+            self.multicalls.append([call['methodName'] for call in calls])
+            return multicall(calls)
+
+        funcs['system.multicall'] = record_multicall
+
+    def test_sends_calls_together(self):
+        with rpc_functions.remote_decorator.batch():
+            first = rpc_functions.add(1, 2)
+            second = rpc_functions.add(3, 4)
+
+        self.assertEqual((first.result(), second.result()), (3, 7))
+        hashed_name = get_hashed_callable_name('add', rpc_functions.add.code_hash)
+        self.assertEqual(self.multicalls, [[hashed_name, hashed_name]])
+
+    def test_raises_the_first_error(self):
+        with self.assertRaises(ValueError):
+            with rpc_functions.remote_decorator.batch():
+                first = rpc_functions.add(1, 2)
+                second = rpc_functions.raise_value_error('failed')
+
+        self.assertEqual(first.result(), 3)
+        self.assertIsInstance(second.exception(), ValueError)
+
+    def test_resolves_the_calls_when_the_round_trip_fails(self):
+        try:
+            with self.assertRaises(OSError):
+                with rpc_functions.remote_decorator.batch():
+                    first = rpc_functions.add(1, 2)
+                    second = rpc_functions.add(3, 4)
+                    self.local_server.stop()
+        finally:
+            self.local_server.start()
+
+        self.assertIsInstance(first.exception(timeout=0), OSError)
+        self.assertIsInstance(second.exception(timeout=0), OSError)
+
+    def test_registers_again_after_restart(self):
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.local_server.restart()
+
+        with rpc_functions.remote_decorator.batch():
+            result = rpc_functions.add(2, 2)
+        self.assertEqual(result.result(), 4)
+
+
+class TestArgumentStore(LocalRPCServerTestCase):
+    """
+    Checks that large arguments are stored on the server and sent by their hash after the first call.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        # start each test with a server and client that have no arguments stored
+        self.local_server.restart()
+        factory.STORED_ARGUMENTS.pop(('127.0.0.1', rpc_functions.PORT), None)
+        self.arguments = []
+        server_thread = self.local_server.server_thread
+        get_stored_argument = server_thread.get_stored_argument
+
+        def record_argument(arg):
+            self.arguments.append(arg)
+            return get_stored_argument(arg)
+
+        server_thread.get_stored_argument = record_argument
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+    def test_sends_small_arguments_by_value(self):
+        self.assertEqual(rpc_functions.get_length([1, 2]), 2)
+        self.assertEqual(self.arguments, [[1, 2]])
+        self.assertFalse(self.local_server.server_thread.stored_arguments)
+
+    def test_sends_large_arguments_by_hash(self):
+        data = list(range(2000))
+        self.assertEqual(rpc_functions.get_length(data), 2000)
+        self.assertEqual(rpc_functions.get_length(data), 2000)
+
+        first, second = self.arguments
+        self.assertEqual(first['value'], data)
+        self.assertEqual(second, {STORED_ARGUMENT_KEY: first[STORED_ARGUMENT_KEY]})
+        self.assertEqual(list(self.local_server.server_thread.stored_arguments), [first[STORED_ARGUMENT_KEY]])
+
+    def test_sends_evicted_arguments_again(self):
+        os.environ['RPC_ARGUMENT_STORE_SIZE'] = '1'
+        first_data = list(range(2000))
+        second_data = list(range(3000))
+        self.assertEqual(rpc_functions.get_length(first_data), 2000)
+        self.assertEqual(rpc_functions.get_length(second_data), 3000)
+
+        # the first argument was evicted, so the server asks for its value again
+        self.arguments.clear()
+        self.assertEqual(rpc_functions.get_length(first_data), 2000)
+        reference, value = self.arguments
+        self.assertNotIn('value', reference)
+        self.assertEqual(value['value'], first_data)
+        self.assertEqual(len(self.local_server.server_thread.stored_arguments), 1)
+
+    def test_sends_arguments_again_after_restart(self):
+        data = list(range(2000))
+        self.assertEqual(rpc_functions.get_length(data), 2000)
+        self.local_server.restart()
+        self.assertEqual(rpc_functions.get_length(data), 2000)
+
+
+class TestStreamedResults(LocalRPCServerTestCase):
+    """
+    Checks that the results of remote generators are streamed from the server in chunks.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        os.environ['RPC_STREAM_CHUNK_SIZE'] = '10'
+        self.chunks = []
+        funcs = self.local_server.server_thread.server.funcs
+        next_chunk = funcs['next_chunk']
+
+        def record_chunk(stream_id):
+            chunk = next_chunk(stream_id)
+            self.chunks.append(chunk['items'])
+            return chunk
+
+        funcs['next_chunk'] = record_chunk
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+    def test_streams_in_chunks(self):
+        self.assertEqual(list(rpc_functions.count(25)), list(range(25)))
+        self.assertEqual(self.chunks, [list(range(10, 20)), list(range(20, 25))])
+        self.assertFalse(self.local_server.server_thread.streams)
+
+    def test_returns_short_streams_at_once(self):
+        self.assertEqual(list(rpc_functions.count(5)), list(range(5)))
+        self.assertEqual(self.chunks, [])
+        self.assertFalse(self.local_server.server_thread.streams)
+
+    def test_closes_unfinished_streams(self):
+        items = rpc_functions.count(25)
+        self.assertEqual([next(items) for _ in range(3)], [0, 1, 2])
+        self.assertEqual(len(self.local_server.server_thread.streams), 1)
+
+        items.close()
+        self.assertFalse(self.local_server.server_thread.streams)
+
+    def test_streams_asynchronously(self):
+        async def collect():
+            return [item async for item in await rpc_functions.count.async_call(25)]
+
+        self.assertEqual(asyncio.run(collect()), list(range(25)))
+        self.assertFalse(self.local_server.server_thread.streams)
+
+    def test_unknown_stream(self):
+        with self.assertRaises(LookupError):
+            client.RPCClient(self.port).proxy.next_chunk('unknown')
+
+
+class TestTelemetry(LocalRPCServerTestCase):
+    """
+    Checks that the timings of the rpc calls are recorded and exported as a chrome trace.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        base_server.TELEMETRY.clear()
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+        base_server.TELEMETRY.clear()
+
+    def test_records_nothing_by_default(self):
+        os.environ.pop('RPC_TELEMETRY', None)
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.assertFalse(base_server.TELEMETRY)
+
+    def test_exports_a_trace(self):
+        os.environ['RPC_TELEMETRY'] = '1'
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'trace.json')
+            factory.export_telemetry(file_path, ports=[self.port], clear=True)
+            with open(file_path) as trace_file:
+                events = json.load(trace_file)['traceEvents']
+
+        process_names = [event['args']['name'] for event in events if event['ph'] == 'M']
+        self.assertEqual(process_names, ['rpc client', 'LocalRPCServer'])
+        # the client side of the call is recorded under its hashed name, and the server side under its name
+        hashed_name = get_hashed_callable_name('add', rpc_functions.add.code_hash)
+        phases = [(event['cat'], event['args']['function']) for event in events if event['ph'] == 'X']
+        for phase in [('call', 'add'), ('marshal', hashed_name), ('dispatch', hashed_name), ('execute', 'add')]:
+            self.assertIn(phase, phases)
+        # only the export's own requests are left
+        self.assertNotIn('add', [event['args']['function'] for event in base_server.TELEMETRY])
+
+
+class TestProfiler(LocalRPCServerTestCase):
+    """
+    Checks that the remote functions named by RPC_PROFILE are profiled on the server.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        self.proxy = client.RPCClient(self.port).proxy
+        self.proxy.clear_profile_stats()
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+    def test_profiles_nothing_by_default(self):
+        os.environ.pop('RPC_PROFILE', None)
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.assertEqual(self.proxy.get_profile_stats(), {})
+
+    def test_profiles_named_functions(self):
+        os.environ['RPC_PROFILE'] = 'add'
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.assertEqual(rpc_functions.add(3, 4), 7)
+        self.assertEqual(rpc_functions.get_name(), 'first')
+
+        profile_stats = self.proxy.get_profile_stats()
+        self.assertEqual(list(profile_stats), ['add'])
+        self.assertEqual(profile_stats['add']['calls'], 2)
+        self.assertIn('function calls', profile_stats['add']['report'])
+
+        self.proxy.clear_profile_stats()
+        self.assertEqual(self.proxy.get_profile_stats(), {})
+
+
+class TestExecutionHistory(LocalRPCServerTestCase):
+    """
+    Checks that the remote calls are written to the execution history file by a background thread.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+    def read_history(self, file_name):
+        factory.ExecutionHistoryWriter.get().flush()
+        with open(os.path.join(self.folder.name, file_name)) as history_file:
+            return history_file.read().splitlines()
+
+    def test_writes_code_once(self):
+        os.environ['RPC_EXECUTION_HISTORY_FILE'] = os.path.join(self.folder.name, 'history.py')
+        self.assertEqual(rpc_functions.add(1, 2), 3)
+        self.assertEqual(rpc_functions.add(3, 4), 7)
+
+        lines = self.read_history('history.py')
+        self.assertEqual(lines[0], 'from importlib.machinery import SourceFileLoader')
+        self.assertEqual(lines.count('def add(a, b):'), 1)
+        self.assertEqual(lines[-2:], ['add(1, 2)', 'add(3, 4)'])
+
+    def test_writes_code_to_each_file(self):
+        for file_name in ('first.py', 'second.py'):
+            os.environ['RPC_EXECUTION_HISTORY_FILE'] = os.path.join(self.folder.name, file_name)
+            self.assertEqual(rpc_functions.get_name(), 'first')
+
+        for file_name in ('first.py', 'second.py'):
+            lines = self.read_history(file_name)
+            self.assertEqual(lines.count('def get_name():'), 1)
+            self.assertEqual(lines[-1], 'get_name()')
+
+
+class TestThreadSafeCalls(LocalRPCServerTestCase):
+    """
+    Checks that thread safe functions are run on the thread that handles the request instead of the main thread.
+    """
+    port = rpc_functions.PORT
+
+    def test_runs_other_calls_on_the_main_thread(self):
+        self.assertEqual(rpc_functions.get_thread_name(), 'LocalRPCMainThread')
+
+    def test_runs_without_waiting_on_the_main_thread(self):
+        self.local_server.pause()
+        try:
+            thread_name = rpc_functions.get_request_thread_name()
+        finally:
+            self.local_server.resume()
+        self.assertNotEqual(thread_name, 'LocalRPCMainThread')
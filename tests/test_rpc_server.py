@@ -0,0 +1,132 @@
+import os
+import time
+import queue
+import unittest
+import threading
+# adds the rpc module to the path
+from utils import local_rpc_server
+
+from rpc import base_server
+
+
+def call_in_thread(function, *args):
+    """
+    Runs a function on the main thread from another thread, like a request handler does.
+
+    :param callable function: The function.
+    :return tuple(threading.Thread, dict): The thread, and a dictionary that gets its result or error.
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = base_server.run_in_main_thread(function, *args)
+        except Exception as error:
+            outcome['error'] = error
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def wait_for_queued_calls(count, timeout=5):
+    """
+    Waits till the given number of calls are queued for the main thread.
+
+    :param int count: The number of calls.
+    :param float timeout: The number of seconds to wait.
+    """
+    deadline = time.time() + timeout
+    while base_server.EXECUTION_QUEUE.qsize() < count:
+        if time.time() > deadline:
+            raise TimeoutError(f'{count} calls were not queued')
+        time.sleep(0.001)
+
+
+class MainThreadTestCase(unittest.TestCase):
+    """
+    Runs the queued calls on the test's thread, which stands in for the main thread.
+    """
+    def setUp(self):
+        self.environment = dict(os.environ)
+        while True:
+            try:
+                base_server.EXECUTION_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+
+class TestMainThreadDispatch(MainThreadTestCase):
+    """
+    Checks that calls are resolved with a future as soon as the main thread has run them.
+    """
+    def test_runs_on_the_main_thread(self):
+        def get_thread_name():
+            return threading.current_thread().name
+
+        thread, outcome = call_in_thread(get_thread_name)
+        wait_for_queued_calls(1)
+        self.assertEqual(base_server.execute_queued_calls(), 1)
+        thread.join(5)
+        self.assertEqual(outcome, {'result': threading.current_thread().name})
+
+    def test_passes_errors_back(self):
+        def raise_error():
+            raise ValueError('failed')
+
+        thread, outcome = call_in_thread(raise_error)
+        wait_for_queued_calls(1)
+        with self.assertRaises(ValueError):
+            base_server.execute_queued_calls()
+        thread.join(5)
+        self.assertIsInstance(outcome['error'], ValueError)
+
+    def test_timed_out_calls_are_not_run(self):
+        os.environ['RPC_TIME_OUT'] = '1'
+        calls = []
+        thread, outcome = call_in_thread(calls.append, 'called')
+        thread.join(5)
+
+        self.assertIsInstance(outcome['error'], TimeoutError)
+        self.assertEqual(base_server.execute_queued_calls(), 0)
+        self.assertEqual(calls, [])
+
+
+class TestConcurrentCalls(MainThreadTestCase):
+    """
+    Checks that many requests can wait on the main thread at once, and each gets its own result.
+    """
+    def test_each_call_gets_its_result(self):
+        calls = [call_in_thread(str, index) for index in range(3)]
+        wait_for_queued_calls(3)
+        self.assertEqual(base_server.execute_queued_calls(), 3)
+
+        for index, (thread, outcome) in enumerate(calls):
+            thread.join(5)
+            self.assertEqual(outcome, {'result': str(index)})
+
+
+class TestExecutionBudget(MainThreadTestCase):
+    """
+    Checks that the queued calls are run till the time budget of the tick is used up.
+    """
+    def test_runs_all_calls_within_the_budget(self):
+        os.environ['RPC_EXECUTION_BUDGET'] = '1000'
+        calls = [call_in_thread(str, index) for index in range(3)]
+        wait_for_queued_calls(3)
+        self.assertEqual(base_server.execute_queued_calls(), 3)
+        for thread, outcome in calls:
+            thread.join(5)
+
+    def test_runs_one_call_per_tick_without_a_budget(self):
+        os.environ['RPC_EXECUTION_BUDGET'] = '0'
+        calls = [call_in_thread(str, index) for index in range(3)]
+        wait_for_queued_calls(3)
+        self.assertEqual([base_server.execute_queued_calls() for _ in range(4)], [1, 1, 1, 0])
+        for thread, outcome in calls:
+            thread.join(5)
+            self.assertIn('result', outcome)
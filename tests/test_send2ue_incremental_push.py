@@ -0,0 +1,75 @@
+from utils.base_test_case import BaseSend2ueTestCase
+
+
+class TestSend2UeIncrementalPush(BaseSend2ueTestCase):
+    """
+    Runs several test cases with the incremental push preference on the static cube meshes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestSend2UeIncrementalPush, self).__init__(*args, **kwargs)
+        self.file_name = 'cubes.blend'
+
+    def setUp(self):
+        super(TestSend2UeIncrementalPush, self).setUp()
+        self.blender.set_addon_property('preferences', 'send2ue', 'incremental_push', True)
+        self.move_to_collection(['Cube1', 'Cube2'], 'Export')
+
+    def tearDown(self):
+        self.blender.set_addon_property('preferences', 'send2ue', 'incremental_push', False)
+        super(TestSend2UeIncrementalPush, self).tearDown()
+
+    def test_fingerprint_is_stable(self):
+        """
+        Checks that the fingerprint of an unchanged asset is the same each time, and is saved once it is pushed.
+        """
+        self.send2ue_operation()
+        fingerprints = self.blender.get_asset_fingerprints()
+        self.assertEqual(self.blender.get_asset_fingerprints(), fingerprints)
+        self.assertEqual(sorted(self.blender.get_manifest().values()), sorted(fingerprints.values()))
+
+    def test_fingerprint_changes_with_the_asset(self):
+        """
+        Checks that the fingerprint of an asset changes when its vertex weights or transforms change.
+        """
+        self.send2ue_operation()
+        fingerprints = self.blender.get_asset_fingerprints()
+
+        self.blender.set_vertex_weight('Cube1', 'Group', 0, 0.5)
+        weighted_fingerprints = self.blender.get_asset_fingerprints()
+        self.assertNotEqual(weighted_fingerprints['Cube1'], fingerprints['Cube1'])
+        self.assertEqual(weighted_fingerprints['Cube2'], fingerprints['Cube2'])
+
+        self.blender.set_vertex_weight('Cube1', 'Group', 0, 0.25)
+        self.assertNotEqual(self.blender.get_asset_fingerprints()['Cube1'], weighted_fingerprints['Cube1'])
+
+        self.set_object_transforms('Cube2', location=[0, 0, 1])
+        self.assertNotEqual(self.blender.get_asset_fingerprints()['Cube2'], fingerprints['Cube2'])
+
+    def test_skips_unchanged_assets(self):
+        """
+        Checks that the assets that haven't changed since the last push are skipped.
+        """
+        self.send2ue_operation()
+        self.assertEqual(self.blender.get_skipped_assets(), [])
+
+        self.send2ue_operation()
+        self.assertEqual(self.blender.get_skipped_assets(), ['Cube1', 'Cube2'])
+        self.assert_mesh_import('Cube1')
+        self.assert_mesh_import('Cube2')
+
+    def test_pushes_changed_assets(self):
+        """
+        Checks that an asset is pushed again once it changes, while the unchanged assets are still skipped.
+        """
+        self.send2ue_operation()
+        manifest = self.blender.get_manifest()
+
+        self.blender.set_vertex_weight('Cube1', 'Group', 0, 0.5)
+        self.send2ue_operation()
+        self.assertEqual(self.blender.get_skipped_assets(), ['Cube2'])
+        self.assertNotEqual(self.blender.get_manifest(), manifest)
+        self.assert_mesh_import('Cube1')
+
+        self.send2ue_operation()
+        self.assertEqual(self.blender.get_skipped_assets(), ['Cube1', 'Cube2'])
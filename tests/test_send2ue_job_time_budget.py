@@ -0,0 +1,44 @@
+from utils.base_test_case import BaseSend2ueTestCaseCore
+
+
+class TestSend2UeJobTimeBudget(BaseSend2ueTestCaseCore):
+    """
+    Checks that the push operator runs its queued jobs within the job time budget.
+    """
+
+    def tearDown(self):
+        self.blender.set_addon_property('preferences', 'send2ue', 'job_time_budget', 50)
+
+    def test_runs_jobs_till_the_budget_is_spent(self):
+        """
+        Checks that several jobs run in one tick, and the jobs after the budget is spent stay queued.
+        """
+        self.blender.set_addon_property('preferences', 'send2ue', 'job_time_budget', 100)
+        result = self.blender.run_push_jobs(50, 0.01)
+        self.assertEqual(result['time_budget'], 0.1)
+        self.assertGreater(result['ran'], 1)
+        self.assertLess(result['ran'], 50)
+        self.assertEqual(result['ran'] + result['queued'], 50)
+        self.assertEqual(result['description'], 'Exporting "Cube"...')
+
+    def test_runs_a_job_longer_than_the_budget(self):
+        """
+        Checks that a job that takes longer than the budget still runs, on its own.
+        """
+        self.blender.set_addon_property('preferences', 'send2ue', 'job_time_budget', 1)
+        result = self.blender.run_push_jobs(3, 0.05)
+        self.assertEqual(result['ran'], 1)
+        self.assertEqual(result['queued'], 2)
+
+    def test_stops_when_the_queue_is_empty(self):
+        """
+        Checks that the tick ends once the queue is empty, before the budget is spent.
+        """
+        self.blender.set_addon_property('preferences', 'send2ue', 'job_time_budget', 1000)
+        result = self.blender.run_push_jobs(3, 0)
+        self.assertEqual(result['ran'], 3)
+        self.assertEqual(result['queued'], 0)
+
+        result = self.blender.run_push_jobs(0, 0)
+        self.assertEqual(result['ran'], 0)
+        self.assertEqual(result['description'], '')
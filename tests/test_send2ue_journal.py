@@ -0,0 +1,88 @@
+from utils.base_test_case import BaseSend2ueTestCaseCore
+
+
+class TestSend2UeJournal(BaseSend2ueTestCaseCore):
+    """
+    Checks that a push that failed or was stopped is resumed from its journal.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestSend2UeJournal, self).__init__(*args, **kwargs)
+        self.jobs = [
+            ['export_cube1', 'cube1', True],
+            ['import_cube1', 'cube1', False],
+            ['export_cube2', 'cube2', True],
+            ['import_cube2', 'cube2', False]
+        ]
+
+    def test_is_same_asset(self):
+        """
+        Checks that an asset is compared by its asset data and fingerprint, leaving out the keys set while pushing.
+        """
+        asset_data = {'file_path': 'Cube.fbx', '_fingerprint': 'a'}
+        self.assertTrue(self.blender.is_same_asset(asset_data, dict(asset_data)))
+        self.assertTrue(self.blender.is_same_asset(
+            {**asset_data, 'skip': True, 'fcurve_file_path': 'Cube_fcurves.fbx'},
+            asset_data
+        ))
+        self.assertFalse(self.blender.is_same_asset({**asset_data, '_fingerprint': 'b'}, asset_data))
+        self.assertFalse(self.blender.is_same_asset({**asset_data, 'file_path': 'Cube2.fbx'}, asset_data))
+
+        # without a fingerprint on both sides only the asset data is compared
+        self.assertTrue(self.blender.is_same_asset({'file_path': 'Cube.fbx'}, asset_data))
+
+    def test_resumes_the_jobs_that_did_not_finish(self):
+        """
+        Checks that the jobs that finished are skipped, and the asset data they set is restored.
+        """
+        result = self.blender.resume_push(self.jobs, ['export_cube1', 'import_cube1', 'export_cube2'])
+        self.assertEqual(result['remaining'], ['import_cube2'])
+        self.assertEqual(result['fcurve_file_paths'], {
+            'cube1': 'import_cube1_fcurves.fbx',
+            'cube2': 'export_cube2_fcurves.fbx'
+        })
+
+        result = self.blender.resume_push(self.jobs, [])
+        self.assertEqual(result['remaining'], [job[0] for job in self.jobs])
+        self.assertEqual(result['fcurve_file_paths'], {'cube1': None, 'cube2': None})
+
+    def test_reruns_the_jobs_of_a_changed_asset(self):
+        """
+        Checks that all the jobs of an asset run again when its asset data changed.
+        """
+        result = self.blender.resume_push(
+            self.jobs,
+            ['export_cube1', 'import_cube1', 'export_cube2'],
+            changed_asset_data={'cube1': {'import_lods': True}}
+        )
+        self.assertEqual(result['remaining'], ['export_cube1', 'import_cube1', 'import_cube2'])
+
+    def test_reruns_the_jobs_of_a_changed_file(self):
+        """
+        Checks that the export of an asset and the jobs after it run again when its exported file changed.
+        """
+        result = self.blender.resume_push(
+            self.jobs,
+            ['export_cube1', 'import_cube1', 'export_cube2'],
+            changed_file_asset_ids=['cube1']
+        )
+        self.assertEqual(result['remaining'], ['export_cube1', 'import_cube1', 'import_cube2'])
+
+    def test_reruns_the_jobs_after_an_unfinished_job(self):
+        """
+        Checks that once a job of an asset has to run again, the jobs after it for that asset run again too.
+        """
+        result = self.blender.resume_push(self.jobs, ['import_cube1', 'export_cube2', 'import_cube2'])
+        self.assertEqual(result['remaining'], ['export_cube1', 'import_cube1'])
+
+    def test_collects_the_jobs_of_an_export_worker(self):
+        """
+        Checks that the jobs an export worker finished are collected with their asset data as it prints them.
+        """
+        result = self.blender.run_export_worker(['cube1', 'cube2'])
+        self.assertEqual(result['done_jobs'], [
+            ['cube1', {'file_path': 'cube1.fbx'}],
+            ['cube2', {'file_path': 'cube2.fbx'}]
+        ])
+        self.assertEqual(result['finished_jobs'], 2)
+        self.assertEqual(result['output'], ['Exporting...', 'Done!'])
@@ -0,0 +1,68 @@
+from utils.base_test_case import BaseSend2ueTestCase
+
+
+class TestSend2UeParallelExport(BaseSend2ueTestCase):
+    """
+    Runs several test cases with more than one export worker on the static cube meshes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestSend2UeParallelExport, self).__init__(*args, **kwargs)
+        self.file_name = 'cubes.blend'
+
+    def setUp(self):
+        super(TestSend2UeParallelExport, self).setUp()
+        self.blender.set_addon_property('preferences', 'send2ue', 'export_workers', 2)
+
+    def tearDown(self):
+        self.blender.set_addon_property('preferences', 'send2ue', 'export_workers', 1)
+        super(TestSend2UeParallelExport, self).tearDown()
+
+    def test_parallel_export(self):
+        """
+        Checks that the assets exported by the export workers are imported.
+        """
+        self.move_to_collection(['Cube1', 'Cube2', 'Cube3'], 'Export')
+        self.send2ue_operation()
+        self.assert_mesh_import('Cube1')
+        self.assert_mesh_import('Cube2')
+        self.assert_mesh_import('Cube3')
+
+    def test_partition_jobs(self):
+        """
+        Checks that each asset's jobs go to the same worker in order, and the assets are balanced between the workers.
+        """
+        jobs = [
+            ['export_cube1', 'cube1'],
+            ['export_cube2', 'cube2'],
+            ['export_cube1_lod1', 'cube1'],
+            ['export_cube3', 'cube3'],
+            ['export_cube1_lod2', 'cube1'],
+        ]
+        self.assertEqual(self.blender.partition_jobs(jobs, 2), [
+            ['export_cube1', 'export_cube1_lod1', 'export_cube1_lod2'],
+            ['export_cube2', 'export_cube3']
+        ])
+        self.assertEqual(self.blender.partition_jobs(jobs, 1), [[job[0] for job in jobs]])
+
+        # the workers without jobs are left out
+        self.assertEqual(self.blender.partition_jobs(jobs, 4), [
+            ['export_cube1', 'export_cube1_lod1', 'export_cube1_lod2'],
+            ['export_cube2'],
+            ['export_cube3']
+        ])
+
+    def test_serialize_job_arguments(self):
+        """
+        Checks that the arguments of an export job are the same after they are passed to a worker.
+        """
+        result = self.blender.serialize_job_arguments('Cube1')
+        self.assertEqual(result['serialized'], [
+            {'_object_name': 'Cube1'},
+            {'_properties': True},
+            'file_path',
+            1,
+            {'lod': 1},
+            None
+        ])
+        self.assertEqual(result['same'], [True] * 6)
@@ -0,0 +1,98 @@
+from utils.base_test_case import BaseSend2ueTestCase
+
+
+class TestSend2UePipelinedPush(BaseSend2ueTestCase):
+    """
+    Runs several test cases with the pipelined push preference on the static cube meshes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TestSend2UePipelinedPush, self).__init__(*args, **kwargs)
+        self.file_name = 'cubes.blend'
+
+    def setUp(self):
+        super(TestSend2UePipelinedPush, self).setUp()
+        self.blender.set_addon_property('preferences', 'send2ue', 'pipelined_push', True)
+
+    def tearDown(self):
+        self.blender.set_addon_property('preferences', 'send2ue', 'pipelined_push', False)
+        super(TestSend2UePipelinedPush, self).tearDown()
+
+    def test_pipelined_push(self):
+        """
+        Checks that the assets are imported when the imports run on the import thread.
+        """
+        self.move_to_collection(['Cube1', 'Cube2', 'Cube3'], 'Export')
+        self.send2ue_operation()
+        self.assert_mesh_import('Cube1')
+        self.assert_mesh_import('Cube2')
+        self.assert_mesh_import('Cube3')
+
+    def test_order_jobs_by_asset(self):
+        """
+        Checks that each asset's jobs run together and in order, and the assets keep the order they were queued in.
+        """
+        jobs = [
+            ['export_cube1', 'cube1'],
+            ['export_cube2', 'cube2'],
+            ['export_cube1_lod', 'cube1'],
+            ['import_cube1', 'cube1'],
+            ['import_cube2', 'cube2'],
+            ['import_cube1_lod', 'cube1'],
+        ]
+        self.assertEqual(self.blender.order_jobs_by_asset(jobs), [
+            'export_cube1',
+            'export_cube1_lod',
+            'import_cube1',
+            'import_cube1_lod',
+            'export_cube2',
+            'import_cube2'
+        ])
+        self.assertEqual(self.blender.order_jobs_by_asset([]), [])
+
+    def test_runs_jobs_in_order_on_the_import_thread(self):
+        """
+        Checks that the jobs run one after another on the import thread, and their main thread calls see their asset
+        id.
+        """
+        asset_ids = ['cube1', 'cube2', 'cube3']
+        result = self.blender.run_import_pipeline(asset_ids)
+        self.assertIsNone(result['error'])
+        self.assertEqual([call['asset_id'] for call in result['calls']], asset_ids)
+        for call in result['calls']:
+            self.assertTrue(call['thread_name'].startswith('Send2UeImport'))
+            self.assertEqual(call['main_thread_state'], [call['asset_id'], True])
+        self.assertEqual(result['done_asset_ids'], asset_ids)
+        self.assertEqual(result['pending'], 0)
+
+    def test_raises_the_error_of_a_failed_job(self):
+        """
+        Checks that the error of a failed job is raised once the job before it is done.
+        """
+        result = self.blender.run_import_pipeline(['cube1', 'cube2'], 'cube2')
+        self.assertEqual(result['error'], 'Failed to import "cube2"')
+        self.assertEqual(result['done_asset_ids'], ['cube1'])
+        self.assertEqual(result['pending'], 0)
+
+    def test_shutdown_waits_for_the_running_job(self):
+        """
+        Checks that shutting down the pipeline stops the running job at its main thread call, and the queued job
+        never runs.
+        """
+        result = self.blender.stop_import_pipeline(True)
+        self.assertFalse(result['running'])
+        self.assertEqual(result['finished'], [])
+        self.assertEqual(len(result['errors']), 1)
+        self.assertIn(result['errors'][0], ['CancelledError', 'RuntimeError'])
+        self.assertEqual(result['pending'], 0)
+
+    def test_close_does_not_wait_for_the_running_job(self):
+        """
+        Checks that closing the pipeline returns while its job is still running, and the job then stops at its main
+        thread call.
+        """
+        result = self.blender.stop_import_pipeline(False)
+        self.assertTrue(result['running'])
+        self.assertEqual(result['finished'], [])
+        self.assertEqual(result['errors'], ['RuntimeError'])
+        self.assertEqual(result['pending'], 0)
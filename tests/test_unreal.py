@@ -0,0 +1,278 @@
+import os
+import time
+import threading
+import unittest
+from utils import rpc_functions
+from utils.local_rpc_server import LocalRPCServerTestCase
+
+import unreal
+from rpc import client, base_server
+
+
+class UnrealTestCase(LocalRPCServerTestCase):
+    """
+    Points the unreal module's rpc client at the local rpc server.
+    """
+    port = rpc_functions.PORT
+
+    def setUp(self):
+        self.environment = dict(os.environ)
+        self.rpc_client = unreal.rpc_client
+        unreal.rpc_client = client.RPCClient(self.port)
+
+    def tearDown(self):
+        self.local_server.resume()
+        unreal.rpc_client = self.rpc_client
+        os.environ.clear()
+        os.environ.update(self.environment)
+
+
+class TestCancelPendingCalls(UnrealTestCase):
+    """
+    Checks that the calls of an aborted push that are still queued in unreal are not run.
+    """
+    def test_queued_calls_are_skipped(self):
+        os.environ['RPC_TEST_CALLS'] = ''
+        rpc_functions.record_call('first')
+        outcome = {}
+
+        def call():
+            try:
+                rpc_functions.record_call('aborted')
+            except Exception as error:
+                outcome['error'] = error
+            client.get_transport('127.0.0.1', self.port).close()
+
+        # the import thread is waiting on a call that unreal hasn't got to yet
+        self.local_server.pause()
+        thread = threading.Thread(target=call)
+        thread.start()
+        deadline = time.time() + 5
+        while base_server.EXECUTION_QUEUE.qsize() < 1 and time.time() < deadline:
+            time.sleep(0.001)
+
+        unreal.cancel_pending_calls()
+        thread.join(5)
+        self.assertIsInstance(outcome['error'], RuntimeError)
+
+        self.local_server.resume()
+        rpc_functions.record_call('last')
+        self.assertEqual(os.environ['RPC_TEST_CALLS'], 'first,last,')
+
+
+
+class TestConnectionHeartbeat(UnrealTestCase):
+    """
+    Checks that the heartbeat keeps the connection state up to date, so the UI can read it without waiting on the
+    network.
+    """
+    def setUp(self):
+        super(TestConnectionHeartbeat, self).setUp()
+        self.checks = []
+        funcs = self.local_server.server_thread.server.funcs
+        is_running = funcs['is_running']
+
+        def record_check():
+            self.checks.append(time.time())
+            return is_running()
+
+        funcs['is_running'] = record_check
+
+    def tearDown(self):
+        unreal.ConnectionHeartbeat.stop()
+        super(TestConnectionHeartbeat, self).tearDown()
+
+    @staticmethod
+    def wait_for(condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                raise TimeoutError('The heartbeat did not update the connection state')
+            time.sleep(0.01)
+
+    def test_checks_the_connection(self):
+        heartbeat = unreal.ConnectionHeartbeat.get()
+        self.wait_for(lambda: heartbeat.checked_time is not None)
+        self.assertEqual(unreal.get_connection_state()[0], True)
+
+        self.local_server.stop()
+        try:
+            heartbeat.wake.set()
+            self.wait_for(lambda: not heartbeat.connected)
+        finally:
+            self.local_server.start()
+
+    def test_keeps_running_after_errors(self):
+        heartbeat = unreal.ConnectionHeartbeat.get()
+        self.wait_for(lambda: heartbeat.connected)
+
+        # a client that fails in any other way is also not connected
+        unreal.rpc_client = None
+        heartbeat.wake.set()
+        self.wait_for(lambda: not heartbeat.connected)
+
+        unreal.rpc_client = client.RPCClient(self.port)
+        heartbeat.wake.set()
+        self.wait_for(lambda: heartbeat.connected)
+
+    def test_cached_state_is_not_checked_on_the_caller_thread(self):
+        # a heartbeat that hasn't checked yet, like one stuck on a slow connection
+        heartbeat = unreal.ConnectionHeartbeat.instance = unreal.ConnectionHeartbeat()
+        self.assertFalse(unreal.is_connected(cached=True))
+        self.assertTrue(heartbeat.wake.is_set())
+
+        heartbeat.wake.clear()
+        heartbeat.set_state(True)
+        heartbeat.checked_time -= unreal.HEARTBEAT_STALE_TIME
+        self.assertTrue(unreal.is_connected(cached=True))
+        self.assertTrue(heartbeat.wake.is_set())
+        self.assertEqual(self.checks, [])
+
+    def test_fresh_cached_state_does_not_wake_the_heartbeat(self):
+        heartbeat = unreal.ConnectionHeartbeat.instance = unreal.ConnectionHeartbeat()
+        heartbeat.set_state(True)
+        self.assertTrue(unreal.is_connected(cached=True))
+        self.assertFalse(heartbeat.wake.is_set())
+
+    def test_live_check_updates_the_heartbeat(self):
+        heartbeat = unreal.ConnectionHeartbeat.instance = unreal.ConnectionHeartbeat()
+        self.assertTrue(unreal.is_connected())
+        self.assertEqual(heartbeat.connected, True)
+        self.assertEqual(len(self.checks), 1)
+
+
+class StubRemoteExecution:
+    def __init__(self, node_ids=None):
+        """
+        Stands in for the remote execution of unreal editors, so the session can be tested without them.
+
+        :param list[str] node_ids: The ids of the discovered editors.
+        """
+        self.node_ids = node_ids or []
+        # the editors that a command connection can't be opened to, and whether the connection is lost on a command
+        self.failing_node_ids = set()
+        self.lose_connection = False
+        self.connected_node_id = None
+        self.discovery_times = []
+        self.opened_node_ids = []
+        self.commands = []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.connected_node_id = None
+
+    def wait_for_remote_nodes(self, timeout=None):
+        self.discovery_times.append(time.time())
+        return [{'node_id': node_id} for node_id in self.node_ids]
+
+    def has_command_connection(self):
+        return self.connected_node_id is not None
+
+    def open_command_connection(self, node_id):
+        self.opened_node_ids.append(node_id)
+        if node_id in self.failing_node_ids:
+            raise RuntimeError('Remote party failed to attempt the command socket connection!')
+        self.connected_node_id = node_id
+
+    def close_command_connection(self):
+        self.connected_node_id = None
+
+    def run_command(self, command, unattended=True):
+        self.commands.append((self.connected_node_id, command))
+        if self.lose_connection:
+            raise ConnectionResetError('The connection was reset')
+        return {'success': True, 'result': 'None', 'output': []}
+
+
+class TestRemoteExecutionSession(unittest.TestCase):
+    """
+    Checks that the session reconnects to the editors with a backoff, and never sends a command twice.
+    """
+    def setUp(self):
+        self.settings = (
+            unreal.REMOTE_EXECUTION_TIMEOUT,
+            unreal.REMOTE_EXECUTION_RETRY_DELAY,
+            unreal.REMOTE_EXECUTION_NODE_RETRY_DELAY
+        )
+        unreal.REMOTE_EXECUTION_TIMEOUT = 0.5
+        unreal.REMOTE_EXECUTION_RETRY_DELAY = 0.05
+        unreal.REMOTE_EXECUTION_NODE_RETRY_DELAY = 0.2
+        self.remote_exec = StubRemoteExecution()
+        self.session = unreal.RemoteExecutionSession()
+        self.session.remote_exec = self.remote_exec
+
+    def tearDown(self):
+        (
+            unreal.REMOTE_EXECUTION_TIMEOUT,
+            unreal.REMOTE_EXECUTION_RETRY_DELAY,
+            unreal.REMOTE_EXECUTION_NODE_RETRY_DELAY
+        ) = self.settings
+
+    def test_backs_off_till_the_deadline(self):
+        start = time.time()
+        with self.assertRaises(ConnectionError):
+            self.session.run_command('print(1)')
+
+        # the attempts are at 0, 0.05, 0.15 and 0.35 seconds, and the next one would be past the deadline
+        self.assertLess(time.time() - start, unreal.REMOTE_EXECUTION_TIMEOUT)
+        discovery_times = self.remote_exec.discovery_times
+        self.assertEqual(len(discovery_times), 4)
+        delays = [end - start for start, end in zip(discovery_times, discovery_times[1:])]
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(self.remote_exec.commands, [])
+
+    def test_connects_once_an_editor_is_discovered(self):
+        def discover_later(timeout=None):
+            self.remote_exec.discovery_times.append(time.time())
+            if len(self.remote_exec.discovery_times) > 2:
+                self.remote_exec.node_ids = ['editor']
+            return [{'node_id': node_id} for node_id in self.remote_exec.node_ids]
+
+        self.remote_exec.wait_for_remote_nodes = discover_later
+        self.assertTrue(self.session.run_command('print(1)')['success'])
+        self.assertEqual(self.remote_exec.commands, [('editor', 'print(1)')])
+
+    def test_skips_a_failed_editor_till_its_retry_delay_passes(self):
+        self.remote_exec.node_ids = ['closed', 'open']
+        self.remote_exec.failing_node_ids = {'closed'}
+        self.session.run_command('print(1)')
+        self.assertEqual(self.remote_exec.opened_node_ids, ['closed', 'open'])
+        self.assertEqual(self.remote_exec.commands, [('open', 'print(1)')])
+
+        # the failed editor is skipped while its retry delay hasn't passed
+        self.session.disconnect()
+        self.session.run_command('print(2)')
+        self.assertEqual(self.remote_exec.opened_node_ids, ['closed', 'open', 'open'])
+
+        # and then tried again, doubling its delay when it fails again
+        self.session.disconnect()
+        time.sleep(unreal.REMOTE_EXECUTION_NODE_RETRY_DELAY)
+        self.session.run_command('print(3)')
+        self.assertEqual(self.remote_exec.opened_node_ids, ['closed', 'open', 'open', 'closed', 'open'])
+        self.assertEqual(self.session.failed_nodes['closed'][1], unreal.REMOTE_EXECUTION_NODE_RETRY_DELAY * 2)
+
+        # once it can be connected to, it is no longer skipped
+        self.remote_exec.failing_node_ids.clear()
+        self.session.disconnect()
+        time.sleep(unreal.REMOTE_EXECUTION_NODE_RETRY_DELAY * 2)
+        self.session.run_command('print(4)')
+        self.assertEqual(self.remote_exec.commands[-1], ('closed', 'print(4)'))
+        self.assertNotIn('closed', self.session.failed_nodes)
+
+    def test_reuses_the_connection(self):
+        self.remote_exec.node_ids = ['editor']
+        self.session.run_command('print(1)')
+        self.session.run_command('print(2)')
+        self.assertEqual(self.remote_exec.opened_node_ids, ['editor'])
+
+    def test_never_resends_a_command(self):
+        self.remote_exec.node_ids = ['editor']
+        self.remote_exec.lose_connection = True
+        with self.assertRaisesRegex(ConnectionError, 'it may have already run'):
+            self.session.run_command('print(1)')
+
+        self.assertEqual(self.remote_exec.commands, [('editor', 'print(1)')])
+        self.assertIn('editor', self.session.failed_nodes)
+        self.assertFalse(self.remote_exec.has_command_connection())
@@ -706,35 +706,48 @@ class BaseSend2ueTestCase(BaseTestCase):
         )
 
     def assert_animation_translation(self, rig_name, animation_name, bone_name, frame, offset_amount=None):
-        self.log(f'Checking "{animation_name}" to see if "{bone_name}" is in the same world location at frame {frame}')
+        self.assert_animation_translations(rig_name, animation_name, bone_name, [frame], offset_amount)
+
+    def assert_animation_translations(self, rig_name, animation_name, bone_name, frames, offset_amount=None):
+        self.log(
+            f'Checking "{animation_name}" to see if "{bone_name}" is in the same world location at frames {frames}'
+        )
         folder_path = self.blender.get_addon_property('scene', 'send2ue', 'unreal_animation_folder_path')
         asset_path = f'{folder_path}{animation_name}'
 
-        unreal_result = self.unreal.get_bone_transform_for_frame(asset_path, bone_name, frame - 1)
-        unreal_result['location'] = unreal_result.get('world_location')
-        unreal_world_location = self.convert_unreal_to_blender_transforms(unreal_result).get('location')
-        blender_world_location = self.blender.get_world_bone_translation_for_frame(
-            rig_name,
+        # the transforms of all the frames are streamed back from unreal instead of asking for each frame, the stream
+        # comes first in the zip so it is read till it is done
+        unreal_results = self.unreal.get_bone_transforms_for_frames(
+            asset_path,
             bone_name,
-            animation_name,
-            frame
+            [frame - 1 for frame in frames]
         )
-        # apply the offset to the comparison
-        if offset_amount:
-            blender_world_location = [
-                round(blender_value-offset_value, 2) for blender_value, offset_value in zip(
-                    blender_world_location,
-                    offset_amount
-                )
-            ]
+        for unreal_result, frame in zip(unreal_results, frames):
+            unreal_result['location'] = unreal_result.get('world_location')
+            unreal_world_location = self.convert_unreal_to_blender_transforms(unreal_result).get('location')
+            blender_world_location = self.blender.get_world_bone_translation_for_frame(
+                rig_name,
+                bone_name,
+                animation_name,
+                frame
+            )
+            # apply the offset to the comparison
+            if offset_amount:
+                blender_world_location = [
+                    round(blender_value-offset_value, 2) for blender_value, offset_value in zip(
+                        blender_world_location,
+                        offset_amount
+                    )
+                ]
 
-        self.assertTrue(
-            collections.Counter(unreal_world_location) == collections.Counter(blender_world_location),
-            (
-                f'The unreal translation {unreal_world_location} of bone "{bone_name}" does not match the translation '
-                f'{blender_world_location} of bone "{bone_name}" at frame {frame} in animation "{animation_name}".'
+            self.assertTrue(
+                collections.Counter(unreal_world_location) == collections.Counter(blender_world_location),
+                (
+                    f'The unreal translation {unreal_world_location} of bone "{bone_name}" does not match the '
+                    f'translation {blender_world_location} of bone "{bone_name}" at frame {frame} in animation '
+                    f'"{animation_name}".'
+                )
             )
-        )
 
     def send2ue_operation(self):
         self.log('Running the Send to Unreal operation...')
@@ -921,8 +934,7 @@ class BaseSend2ueTestCase(BaseTestCase):
             for animation_name in animation_names:
                 for bone in bones:
                     self.assert_animation_hierarchy(rig_name, animation_name, bone, include_object=True)
-                    for frame in frames:
-                        self.assert_animation_translation(rig_name, animation_name, bone, frame)
+                    self.assert_animation_translations(rig_name, animation_name, bone, frames)
 
             mesh_folder = '/Game/mesh_test/'
             animation_folder = '/Game/animation_test/'
@@ -1078,8 +1090,7 @@ class BaseSend2ueTestCase(BaseTestCase):
             for animation_name in animation_names:
                 for bone_name in bone_names:
                     self.assert_animation_hierarchy(rig_name, animation_name, bone_name, include_object=False)
-                    for frame in frames:
-                        self.assert_animation_translation(rig_name, animation_name, bone_name, frame)
+                    self.assert_animation_translations(rig_name, animation_name, bone_name, frames)
 
     def run_export_custom_property_fcurves_option_tests(self, objects_and_animations):
         self.blender.set_addon_property('scene', 'send2ue', 'export_all_actions', True)
@@ -475,6 +475,362 @@ class BlenderRemoteCalls:
             *sub_path
         ))
 
+    @staticmethod
+    def set_vertex_weight(object_name, vertex_group_name, vertex_index, weight):
+        """
+        Sets the weight of a vertex in a vertex group, adding the vertex group if it doesn't exist.
+
+        :param str object_name: The name of the mesh object.
+        :param str vertex_group_name: The name of the vertex group.
+        :param int vertex_index: The index of the vertex.
+        :param float weight: The weight.
+        """
+        scene_object = bpy.data.objects.get(object_name)
+        vertex_group = scene_object.vertex_groups.get(vertex_group_name)
+        if not vertex_group:
+            vertex_group = scene_object.vertex_groups.new(name=vertex_group_name)
+        vertex_group.add([vertex_index], weight, 'REPLACE')
+
+    @staticmethod
+    def get_asset_fingerprints():
+        """
+        Gets the fingerprint of each mesh asset of the last push, from the current state of the scene.
+
+        :return dict: The fingerprints keyed by mesh object name.
+        """
+        from send2ue.core import manifest
+        properties = bpy.context.scene.send2ue
+        settings_fingerprint = manifest.get_settings_fingerprint(properties)
+        return {
+            asset_data['_mesh_object_name']: manifest.get_fingerprint(asset_data, properties, settings_fingerprint)
+            for asset_data in bpy.context.window_manager.send2ue.asset_data.values()
+            if asset_data.get('_mesh_object_name')
+        }
+
+    @staticmethod
+    def get_skipped_assets():
+        """
+        Gets the mesh assets that were skipped by the last push, since they hadn't changed.
+
+        :return list[str]: The mesh object names of the skipped assets.
+        """
+        return sorted(
+            asset_data['_mesh_object_name']
+            for asset_data in bpy.context.window_manager.send2ue.asset_data.values()
+            if asset_data.get('_mesh_object_name') and asset_data.get('skip')
+        )
+
+    @staticmethod
+    def get_manifest():
+        """
+        Gets the fingerprints of the pushed assets that are kept in the scene.
+
+        :return dict: The fingerprints keyed by asset id.
+        """
+        from send2ue.core import manifest
+        return manifest.read_manifest()
+
+    @staticmethod
+    def order_jobs_by_asset(jobs):
+        """
+        Orders queued jobs like the pipelined push does.
+
+        :param list[list] jobs: The name and asset id of each job.
+        :return list[str]: The names of the jobs in the order they run.
+        """
+        from send2ue.core import pipeline
+        queued_jobs = [(name, (), {}, '', asset_id, 'file_path') for name, asset_id in jobs]
+        return [job[0] for job in pipeline.order_jobs_by_asset(queued_jobs)]
+
+    @staticmethod
+    def run_import_pipeline(asset_ids, failing_asset_id=None):
+        """
+        Runs an import job for each asset on an import pipeline and waits for them. Each job calls back to the main
+        thread for the current asset id.
+
+        :param list[str] asset_ids: The asset ids.
+        :param str failing_asset_id: The asset id of a job that raises an error.
+        :return dict: The calls the jobs made, the asset ids of the jobs that were done, the error that was raised
+        and the number of pending jobs.
+        """
+        import threading
+        from send2ue.core import pipeline
+
+        calls = []
+        done_asset_ids = []
+
+        def get_main_thread_state():
+            return [bpy.context.window_manager.send2ue.asset_id, pipeline.is_main_thread()]
+
+        def import_asset(asset_id):
+            if asset_id == failing_asset_id:
+                raise RuntimeError(f'Failed to import "{asset_id}"')
+            calls.append({
+                'asset_id': asset_id,
+                'thread_name': threading.current_thread().name,
+                'main_thread_state': pipeline.run_in_main_thread(get_main_thread_state)
+            })
+
+        import_pipeline = pipeline.ImportPipeline(
+            {asset_id: {} for asset_id in asset_ids},
+            on_job_done=lambda job: done_asset_ids.append(job[4])
+        )
+        for asset_id in asset_ids:
+            import_pipeline.submit((import_asset, (asset_id,), {}, '', asset_id, 'file_path'))
+
+        error = None
+        try:
+            import_pipeline.wait()
+        except RuntimeError as exception:
+            error = str(exception)
+        finally:
+            import_pipeline.shutdown()
+
+        return {
+            'calls': calls,
+            'done_asset_ids': done_asset_ids,
+            'error': error,
+            'pending': import_pipeline.pending
+        }
+
+    @staticmethod
+    def stop_import_pipeline(wait):
+        """
+        Stops an import pipeline while its first job is running and its second job is queued.
+
+        :param bool wait: Whether the pipeline is shut down and waited for, or only closed.
+        :return dict: Whether a job was running right after the pipeline was stopped, the jobs that finished, the
+        errors the jobs raised and the number of pending jobs.
+        """
+        import time
+        import threading
+        from send2ue.core import pipeline
+
+        started = threading.Event()
+        released = threading.Event()
+        finished = []
+        errors = []
+
+        def import_asset(asset_id):
+            started.set()
+            released.wait(5)
+            try:
+                pipeline.run_in_main_thread(finished.append, asset_id)
+            except BaseException as error:
+                errors.append(type(error).__name__)
+                raise
+
+        import_pipeline = pipeline.ImportPipeline({'first': {}, 'second': {}})
+        for asset_id in ['first', 'second']:
+            import_pipeline.submit((import_asset, (asset_id,), {}, '', asset_id, 'file_path'))
+        started.wait(5)
+
+        if wait:
+            released.set()
+            import_pipeline.shutdown()
+            running = import_pipeline.is_running()
+        else:
+            # closing doesn't wait for the running job, which stops at its next main thread call
+            import_pipeline.close()
+            running = import_pipeline.is_running()
+            released.set()
+            start_time = time.time()
+            while import_pipeline.is_running() and time.time() - start_time < 5:
+                time.sleep(0.01)
+            import_pipeline.shutdown()
+
+        return {
+            'running': running,
+            'finished': finished,
+            'errors': errors,
+            'pending': import_pipeline.pending
+        }
+
+    @staticmethod
+    def partition_jobs(jobs, count):
+        """
+        Splits queued export jobs between the given number of export workers.
+
+        :param list[list] jobs: The name and asset id of each job.
+        :param int count: The number of workers.
+        :return list[list[str]]: The names of the jobs of each worker.
+        """
+        from send2ue.core import parallel
+        queued_jobs = [(name, (), {}, '', asset_id, 'file_path') for name, asset_id in jobs]
+        return [[job[0] for job in partition] for partition in parallel.partition_jobs(queued_jobs, count)]
+
+    @staticmethod
+    def serialize_job_arguments(object_name):
+        """
+        Serializes the arguments of an export job like they are passed to an export worker, and then gets them back.
+
+        :param str object_name: The name of the object that is passed as an argument.
+        :return dict: The serialized arguments, and whether each argument is the same after it was deserialized.
+        """
+        import json
+        from send2ue.core import parallel
+
+        arguments = [bpy.data.objects[object_name], bpy.context.scene.send2ue, 'file_path', 1, {'lod': 1}, None]
+        serialized_arguments = json.loads(json.dumps([parallel.serialize_argument(arg) for arg in arguments]))
+        deserialized_arguments = [parallel.deserialize_argument(arg) for arg in serialized_arguments]
+        return {
+            'serialized': serialized_arguments,
+            'same': [arg == deserialized_arg for arg, deserialized_arg in zip(arguments, deserialized_arguments)]
+        }
+
+    @staticmethod
+    def run_push_jobs(job_count, job_time):
+        """
+        Queues jobs that each take the given time, and runs them for one timer tick of the push operator.
+
+        :param int job_count: The number of jobs.
+        :param float job_time: The seconds each job takes.
+        :return dict: The time budget, the number of jobs that ran and the number of jobs still queued.
+        """
+        import time
+        import queue
+        import types
+        from send2ue.core import utilities
+        from send2ue.operators import Send2Ue
+
+        ran_jobs = []
+
+        def run_job(context, job):
+            time.sleep(job_time)
+            ran_jobs.append(job)
+
+        asset_data = bpy.context.window_manager.send2ue.asset_data
+        asset_data.clear()
+        asset_data['cube'] = {'file_path': 'Cube.fbx'}
+        execution_queue = queue.Queue()
+        for _ in range(job_count):
+            execution_queue.put((None, (), {}, 'Exporting "{attribute}"...', 'cube', 'file_path'))
+
+        # runs the operator's job loop without the operator, which blender only creates to run it
+        operator = types.SimpleNamespace(
+            pipeline=None,
+            parallel_export=None,
+            execution_queue=execution_queue,
+            description='',
+            run_job=run_job,
+            update_progress=lambda context: None
+        )
+        Send2Ue.run_jobs(operator, bpy.context)
+        return {
+            'time_budget': utilities.get_job_time_budget(),
+            'ran': len(ran_jobs),
+            'queued': execution_queue.qsize(),
+            'description': operator.description
+        }
+
+    @staticmethod
+    def run_export_worker(asset_ids):
+        """
+        Runs an export worker with a process that prints the job done lines of a worker, with other output in between.
+
+        :param list[str] asset_ids: The asset id of each job.
+        :return dict: The asset ids and asset data of the jobs the worker finished, and the rest of its output.
+        """
+        import sys
+        import json
+        from send2ue.core import parallel
+
+        lines = ['Exporting...']
+        for asset_id in asset_ids:
+            lines.append(f'{parallel.JOB_DONE_TOKEN} {json.dumps({"file_path": f"{asset_id}.fbx"})}')
+        lines.append('Done!')
+        script = '\n'.join(f'print({line!r})' for line in lines)
+
+        jobs = [(None, (), {}, '', asset_id, 'file_path') for asset_id in asset_ids]
+        worker = parallel.ExportWorker(0, [sys.executable, '-c', script], jobs)
+        worker.process.wait()
+        worker.reader.join()
+        return {
+            'done_jobs': [[job[4], asset_data] for job, asset_data in worker.done_jobs],
+            'finished_jobs': worker.finished_jobs,
+            'output': list(worker.output)
+        }
+
+    @staticmethod
+    def is_same_asset(asset_data, journaled_asset_data):
+        """
+        Checks if an asset is the same as it was when it was journaled.
+
+        :param dict asset_data: The asset data of the asset.
+        :param dict journaled_asset_data: The journaled asset data of the asset.
+        :return bool: Whether it is the same asset.
+        """
+        from send2ue.core import journal
+        return journal.is_same_asset(asset_data, journaled_asset_data)
+
+    @staticmethod
+    def resume_push(jobs, finished_job_names, changed_asset_data=None, changed_file_asset_ids=None):
+        """
+        Journals a push in which only some of the jobs finished, and then resumes it. Each finished job sets the
+        fcurve file path of its asset, and each export job writes the file of its asset.
+
+        :param list[list] jobs: The name, asset id and whether it is an export job, of each queued job.
+        :param list[str] finished_job_names: The names of the jobs that finished before the push stopped.
+        :param dict changed_asset_data: The asset data that changed before the push is resumed, keyed by asset id.
+        :param list[str] changed_file_asset_ids: The asset ids whose exported file changed before the push is resumed.
+        :return dict: The names of the jobs that still need to run, and the asset data after resuming.
+        """
+        import os
+        import copy
+        import shutil
+        import tempfile
+        from send2ue.core import journal
+
+        def export_asset(name):
+            pass
+
+        def import_asset(name):
+            pass
+
+        export_asset.parallel = True
+        temp_folder = tempfile.mkdtemp()
+        asset_data = {
+            asset_id: {'file_path': os.path.join(temp_folder, f'{asset_id}.fbx')}
+            for asset_id in dict.fromkeys(asset_id for name, asset_id, is_export in jobs)
+        }
+
+        def get_queued_jobs():
+            return [
+                (export_asset if is_export else import_asset, (name,), {}, '', asset_id, 'file_path')
+                for name, asset_id, is_export in jobs
+            ]
+
+        try:
+            queued_jobs = get_queued_jobs()
+            push_journal = journal.PushJournal(copy.deepcopy(asset_data))
+            push_journal.start(queued_jobs)
+            for job in queued_jobs:
+                name, asset_id = job[1][0], job[4]
+                if name in finished_job_names:
+                    if job[0] is export_asset:
+                        with open(asset_data[asset_id]['file_path'], 'w') as asset_file:
+                            asset_file.write(name)
+                    push_journal.asset_data[asset_id]['fcurve_file_path'] = f'{name}_fcurves.fbx'
+                    push_journal.complete(job)
+
+            for asset_id in changed_file_asset_ids or []:
+                with open(asset_data[asset_id]['file_path'], 'a') as asset_file:
+                    asset_file.write('changed')
+            for asset_id, data in (changed_asset_data or {}).items():
+                asset_data[asset_id].update(data)
+
+            remaining_jobs = journal.resume_jobs(get_queued_jobs(), asset_data)
+        finally:
+            journal.remove_journal()
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+        return {
+            'remaining': [job[1][0] for job in remaining_jobs],
+            'fcurve_file_paths': {
+                asset_id: data.get('fcurve_file_path') for asset_id, data in asset_data.items()
+            }
+        }
+
     @staticmethod
     def open_file(test_folder, file_name):
         # load in the file you will run tests on
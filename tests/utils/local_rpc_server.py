@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import socket
+import threading
+import unittest
+
+# adds the rpc module to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir, 'send2ue', 'dependencies'))
+
+from rpc import base_server
+
+
+def get_free_port():
+    """
+    Gets a port that nothing is listening on.
+
+    :return int: A port number.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as free_socket:
+        free_socket.bind(('127.0.0.1', 0))
+        return free_socket.getsockname()[1]
+
+
+class LocalRPCServerThread(base_server.BaseRPCServerThread):
+    def __init__(self, name, port):
+        """
+        A rpc server thread that keeps track of its connections, so they can be closed when it is stopped.
+
+        :param str name: The name of the server.
+        :param int port: The number of the server port.
+        """
+        super(LocalRPCServerThread, self).__init__(name, port)
+        self.connections = []
+        get_request = self.server.get_request
+
+        def get_tracked_request():
+            connection, address = get_request()
+            self.connections.append(connection)
+            return connection, address
+
+        self.server.get_request = get_tracked_request
+
+    def thread_safe_call(self, callable_instance, *args):
+        """
+        Implementation of a thread safe call, the same as in the integrations.
+        """
+        return lambda *args: base_server.run_in_main_thread(callable_instance, *args)
+
+
+class LocalRPCServer:
+    def __init__(self, port):
+        """
+        Runs a rpc server in this process, with a thread that stands in for the main thread of an integration and
+        runs the queued calls like a timer would.
+
+        :param int port: The number of the server port.
+        """
+        self.port = port
+        self.server_thread = None
+        self.main_thread = None
+        self.stopped = threading.Event()
+        self.running = threading.Event()
+
+    def run_main_thread(self):
+        """
+        Runs the queued calls till the server is stopped. Nothing is run while the main thread is paused.
+        """
+        while not self.stopped.is_set():
+            if self.running.wait(0.01):
+                try:
+                    base_server.execute_queued_calls()
+                except Exception:
+                    # the error was already passed to the waiting request
+                    pass
+            time.sleep(0.001)
+
+    def start(self):
+        """
+        Starts the server and its main thread.
+        """
+        self.stopped.clear()
+        self.running.set()
+        self.server_thread = LocalRPCServerThread('LocalRPCServer', self.port)
+        self.server_thread.start()
+        self.main_thread = threading.Thread(target=self.run_main_thread, name='LocalRPCMainThread', daemon=True)
+        self.main_thread.start()
+
+    def stop(self):
+        """
+        Stops the server and closes its connections, like the process that runs it was closed.
+        """
+        self.server_thread.server.shutdown()
+        self.server_thread.server.server_close()
+        for connection in self.server_thread.connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.server_thread.join()
+        self.stopped.set()
+        self.main_thread.join()
+
+    def restart(self):
+        """
+        Stops the server and starts a new one on the same port, which has none of the old one's state.
+        """
+        self.stop()
+        self.start()
+
+    def pause(self):
+        """
+        Stops running the queued calls, like the main thread is busy.
+        """
+        self.running.clear()
+
+    def resume(self):
+        """
+        Starts running the queued calls again.
+        """
+        self.running.set()
+
+
+class LocalRPCServerTestCase(unittest.TestCase):
+    """
+    Runs a local rpc server on the test case's port while its tests run.
+    """
+    port = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.local_server = LocalRPCServer(cls.port)
+        cls.local_server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.local_server.stop()
@@ -0,0 +1,58 @@
+from utils.local_rpc_server import get_free_port
+
+import rpc
+
+# the functions are sent to a rpc server that runs in the test process, so they must only use what they import
+PORT = get_free_port()
+remote_decorator = rpc.factory.remote_call(port=PORT)
+
+
+@remote_decorator
+def add(a, b):
+    return a + b
+
+
+@remote_decorator
+def get_name():
+    return 'first'
+
+
+@remote_decorator
+def raise_value_error(message):
+    raise ValueError(message)
+
+
+@remote_decorator
+def get_length(data):
+    return len(data)
+
+
+@remote_decorator
+def count(total):
+    for index in range(total):
+        yield index
+
+
+@remote_decorator
+def get_thread_name():
+    import threading
+    return threading.current_thread().name
+
+
+@remote_decorator
+@rpc.factory.thread_safe
+def get_request_thread_name():
+    import threading
+    return threading.current_thread().name
+
+
+@remote_decorator
+def record_call(value):
+    import os
+    os.environ['RPC_TEST_CALLS'] = os.environ.get('RPC_TEST_CALLS', '') + f'{value},'
+
+
+@remote_decorator
+def wait(seconds):
+    import time
+    time.sleep(seconds)